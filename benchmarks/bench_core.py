@@ -0,0 +1,233 @@
+import tempfile
+
+from benchmarks.harness import BenchmarkCase
+from src.func import crossover, ensemble, models, noise, spectra, streaming, suspension, sweep
+
+# Same schema as MainUI.create_default_curve_data, with fixed values
+PARAMETERS = {"buffer_perm": 78,
+              "buffer_cond": 0.01,
+              "core_perm": 60,
+              "core_cond": 0.1,
+              "core_radius": 10.0,
+              "1st_shell_perm": 10,
+              "1st_shell_cond": 0.00001,
+              "1st_shell_thick": 6.0,
+              "2nd_shell_perm": 40,
+              "2nd_shell_cond": 0.00001,
+              "2nd_shell_thick": 6.0,
+              "electric_field": 1.0,
+              "aspect_ratio": 1.0,
+              "wavelength": 100.0,
+              "volume_fraction": 0.1,
+              "cell_constant": 100.0,
+              "1st_cross_over": {"homogenous": 0.0,
+                                 "single_shell": 0.0,
+                                 "two_shell": 0.0},
+              "2nd_cross_over": {"homogenous": 0.0,
+                                 "single_shell": 0.0,
+                                 "two_shell": 0.0}
+              }
+
+GRID_SIZES = [100, 1000, 10000, 100000]
+QUICK_GRID_SIZES = [100, 10000]
+# Curves in a parameter sweep, on a grid of SWEEP_POINTS frequencies
+SWEEP_SIZES = [10, 100, 1000]
+QUICK_SWEEP_SIZES = [100]
+SWEEP_POINTS = 1000
+# Samples of a heterogeneous population, on a grid of SWEEP_POINTS frequencies
+ENSEMBLE_SIZES = [1000, 10000, 100000]
+QUICK_ENSEMBLE_SIZES = [1000]
+DISTRIBUTIONS = {"core_radius": {"distribution": "normal", "mean": 10.0, "std": 1.0},
+                 "1st_shell_perm": {"distribution": "lognormal", "mean": 10.0, "std": 2.0}}
+
+
+def get_frequencies(no_points):
+    return spectra.generate_frequencies(1000, 100000000, no_points)
+
+
+def get_single_shell_recm(freq):
+    p = PARAMETERS
+    recm, _, _ = models.single_shell_all(
+        freq, p["electric_field"], p["core_radius"], p["1st_shell_thick"], p["1st_shell_perm"],
+        p["1st_shell_cond"], p["core_perm"], p["core_cond"], p["buffer_perm"], p["buffer_cond"])
+    return recm
+
+
+def model_cases(grid_sizes):
+    cases = []
+    p = PARAMETERS
+    for size in grid_sizes:
+        freq = get_frequencies(size)
+
+        cases.append(BenchmarkCase(
+            "models.homogenous_particle_all",
+            lambda freq=freq: models.homogenous_particle_all(
+                freq, p["electric_field"], p["core_radius"], p["core_perm"], p["core_cond"],
+                p["buffer_perm"], p["buffer_cond"]),
+            params={"points": size}))
+
+        cases.append(BenchmarkCase(
+            "models.single_shell_all",
+            lambda freq=freq: models.single_shell_all(
+                freq, p["electric_field"], p["core_radius"], p["1st_shell_thick"],
+                p["1st_shell_perm"], p["1st_shell_cond"], p["core_perm"], p["core_cond"],
+                p["buffer_perm"], p["buffer_cond"]),
+            params={"points": size}))
+
+        cases.append(BenchmarkCase(
+            "models.two_shell_all",
+            lambda freq=freq: models.two_shell_all(
+                freq, p["electric_field"], p["core_radius"], p["1st_shell_thick"],
+                p["2nd_shell_thick"], p["core_perm"], p["core_cond"], p["1st_shell_perm"],
+                p["1st_shell_cond"], p["2nd_shell_perm"], p["2nd_shell_cond"],
+                p["buffer_perm"], p["buffer_cond"]),
+            params={"points": size}))
+
+        # Rod-shaped single-shell particle, the three axes at once
+        semi_axes = models.spheroid_semi_axes(p["core_radius"], 3.0)
+        cases.append(BenchmarkCase(
+            "models.ellipsoid_multi_shell_all",
+            lambda freq=freq: models.ellipsoid_multi_shell_all(
+                freq, p["electric_field"], semi_axes, p["core_perm"], p["core_cond"],
+                [(p["1st_shell_thick"], p["1st_shell_perm"], p["1st_shell_cond"])],
+                p["buffer_perm"], p["buffer_cond"]),
+            params={"points": size}))
+
+    return cases
+
+
+def spectra_cases(grid_sizes):
+    cases = []
+    for size in grid_sizes:
+        freq = get_frequencies(size)
+        cases.append(BenchmarkCase(
+            "spectra.generate_curve_data",
+            lambda freq=freq: spectra.generate_curve_data(PARAMETERS, freq),
+            params={"points": size}))
+
+        curve_data = spectra.generate_curve_data(PARAMETERS, freq)
+        cases.append(BenchmarkCase(
+            "spectra.get_cross_over_freq",
+            lambda curve_data=curve_data: spectra.get_cross_over_freq(curve_data["frequencies"],
+                                                                      curve_data["recm_single_shell"]),
+            params={"points": size}))
+
+        # Maxwell-Wagner mixture of the single-shell particles, from their complex CM factor
+        cm_factor = curve_data["recm_single_shell"] + 1j * curve_data["imcm_single_shell"]
+        cases.append(BenchmarkCase(
+            "suspension.get_suspension_spectra",
+            lambda freq=freq, cm_factor=cm_factor: suspension.get_suspension_spectra(
+                freq, cm_factor, PARAMETERS["buffer_perm"], PARAMETERS["buffer_cond"],
+                PARAMETERS["volume_fraction"], PARAMETERS["cell_constant"]),
+            params={"points": size}))
+
+    return cases
+
+
+def get_sweep_loop(frequencies, values):
+    # The family evaluated one curve at a time, as when creating the curves by hand
+    results = []
+    for value in values:
+        parameters = dict(PARAMETERS, buffer_cond=value)
+        recm, imcm, depforce = spectra.evaluate_model(parameters, "single_shell", frequencies)
+        results.append(spectra.get_cross_over_freq(frequencies, recm))
+    return results
+
+
+def get_sweep_stream(frequencies, values):
+    # The family written to a temporary stream on disk
+    with tempfile.TemporaryDirectory() as directory:
+        streaming.stream_sweep(directory, PARAMETERS, "single_shell", frequencies, [("buffer_cond", values)])
+
+
+def get_sweep_float32(frequencies, values):
+    # Screening sweep, in the float32 precision of the models
+    with models.precision_mode("float32"):
+        return sweep.sweep_model(PARAMETERS, "single_shell", frequencies, [("buffer_cond", values)])
+
+
+def sweep_cases(sweep_sizes):
+    cases = []
+    freq = get_frequencies(SWEEP_POINTS)
+    for size in sweep_sizes:
+        values = sweep.get_sweep_values(1e-4, 1, size, log_scale=True)
+        cases.append(BenchmarkCase(
+            "sweep.sweep_model",
+            lambda values=values: sweep.sweep_model(PARAMETERS, "single_shell", freq, [("buffer_cond", values)]),
+            params={"curves": size, "points": SWEEP_POINTS}))
+        cases.append(BenchmarkCase(
+            "sweep.sweep_model_float32",
+            lambda values=values: get_sweep_float32(freq, values),
+            params={"curves": size, "points": SWEEP_POINTS}))
+        cases.append(BenchmarkCase(
+            "streaming.stream_sweep",
+            lambda values=values: get_sweep_stream(freq, values),
+            params={"curves": size, "points": SWEEP_POINTS}))
+        cases.append(BenchmarkCase(
+            "sweep.loop",
+            lambda values=values: get_sweep_loop(freq, values),
+            params={"curves": size, "points": SWEEP_POINTS}))
+
+    # 2-D sweep, a crossover map of size x size
+    size = sweep_sizes[0]
+    first = sweep.get_sweep_values(1e-4, 1, size, log_scale=True)
+    second = sweep.get_sweep_values(5, 50, size)
+    cases.append(BenchmarkCase(
+        "sweep.sweep_model_2d",
+        lambda: sweep.sweep_model(PARAMETERS, "single_shell", freq, [("buffer_cond", first), ("1st_shell_perm", second)]),
+        params={"curves": size * size, "points": SWEEP_POINTS}))
+
+    # Cross-overs versus medium conductivity, the graph mode of the same name
+    for size in sweep_sizes:
+        values = crossover.get_conductivities(no_values=size)
+        cases.append(BenchmarkCase(
+            "crossover.solve_cross_overs",
+            lambda values=values: crossover.solve_cross_overs(PARAMETERS, "single_shell", values),
+            params={"curves": size, "points": crossover.SEARCH_POINTS}))
+    return cases
+
+
+def ensemble_cases(ensemble_sizes):
+    cases = []
+    freq = get_frequencies(SWEEP_POINTS)
+    for size in ensemble_sizes:
+        cases.append(BenchmarkCase(
+            "ensemble.ensemble_model",
+            lambda size=size: ensemble.ensemble_model(PARAMETERS, "single_shell", freq, DISTRIBUTIONS,
+                                                      no_samples=size, seed=0),
+            params={"samples": size, "points": SWEEP_POINTS}))
+    return cases
+
+
+def noise_cases(grid_sizes):
+    cases = []
+    for size in grid_sizes:
+        freq = get_frequencies(size).astype(float)
+        signal = get_single_shell_recm(freq)
+
+        cases.append(BenchmarkCase("noise.generate_awgn",
+                                   lambda signal=signal: noise.generate_awgn(signal, std_dev=0.05),
+                                   params={"points": size}))
+        cases.append(BenchmarkCase("noise.generate_pink_noise",
+                                   lambda signal=signal: noise.generate_pink_noise(signal, std_dev=0.05),
+                                   params={"points": size}))
+        cases.append(BenchmarkCase("noise.generate_poisson_noise",
+                                   lambda signal=signal: noise.generate_poisson_noise(signal, scale=1000),
+                                   params={"points": size}))
+        cases.append(BenchmarkCase("noise.generate_speckle_noise",
+                                   lambda signal=signal: noise.generate_speckle_noise(signal, std_dev=0.05),
+                                   params={"points": size}))
+        cases.append(BenchmarkCase("noise.generate_frequency_dependent_noise",
+                                   lambda signal=signal, freq=freq: noise.generate_frequency_dependent_noise(
+                                       signal, freqs=freq, scale=0.01),
+                                   params={"points": size}))
+
+    return cases
+
+
+def get_cases(quick=False):
+    grid_sizes = QUICK_GRID_SIZES if quick else GRID_SIZES
+    sweep_sizes = QUICK_SWEEP_SIZES if quick else SWEEP_SIZES
+    ensemble_sizes = QUICK_ENSEMBLE_SIZES if quick else ENSEMBLE_SIZES
+    return (model_cases(grid_sizes) + spectra_cases(grid_sizes) + noise_cases(grid_sizes) +
+            sweep_cases(sweep_sizes) + ensemble_cases(ensemble_sizes))
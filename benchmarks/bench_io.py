@@ -0,0 +1,69 @@
+import atexit
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from benchmarks.bench_core import PARAMETERS, get_frequencies
+from benchmarks.harness import BenchmarkCase
+from src.func import excel, files, spectra
+
+SCATTER_SIZES = [100, 1000, 10000]
+QUICK_SCATTER_SIZES = [100, 1000]
+CURVE_SIZES = [100, 1000, 10000]
+QUICK_CURVE_SIZES = [100, 1000]
+
+
+def get_scatter_data(no_points):
+    rng = np.random.default_rng(0)
+    frequencies = get_frequencies(no_points).astype(float)
+    return {"frequencies": frequencies.tolist(),
+            "recm_values": rng.uniform(-0.5, 1.0, no_points).tolist(),
+            "recm_errors": rng.uniform(0.0, 0.05, no_points).tolist()}
+
+
+def get_curve_file_data(no_points):
+    # Same content MainUI.save_curve writes to an .odc file
+    return {"name": "Curve 1",
+            "color": "#1f77b4",
+            "line_style": "-",
+            "line_width": 1.5,
+            "visibility": True,
+            "model": 1,
+            "parameters": PARAMETERS,
+            "curves": spectra.generate_curve_data(PARAMETERS, get_frequencies(no_points)),
+            "widget": None}
+
+
+def get_cases(quick=False):
+    folder = tempfile.mkdtemp(prefix="opendep_bench_")
+    atexit.register(shutil.rmtree, folder, ignore_errors=True)
+    cases = []
+
+    for size in QUICK_SCATTER_SIZES if quick else SCATTER_SIZES:
+        scatter_data = get_scatter_data(size)
+        file_path = os.path.join(folder, f"scatter_{size}.xlsx")
+        excel.save_scatter_to_excel(file_path, scatter_data)
+
+        cases.append(BenchmarkCase("excel.save_scatter_to_excel",
+                                   lambda file_path=file_path, data=scatter_data:
+                                   excel.save_scatter_to_excel(file_path, data),
+                                   params={"points": size}, group="io"))
+        cases.append(BenchmarkCase("excel.load_scatter_from_excel",
+                                   lambda file_path=file_path: excel.load_scatter_from_excel(file_path),
+                                   params={"points": size}, group="io"))
+
+    for size in QUICK_CURVE_SIZES if quick else CURVE_SIZES:
+        curve_data = get_curve_file_data(size)
+        file_path = os.path.join(folder, f"curve_{size}.odc")
+        files.save_to_json(file_path, curve_data)
+
+        cases.append(BenchmarkCase("files.save_to_json",
+                                   lambda file_path=file_path, data=curve_data: files.save_to_json(file_path, data),
+                                   params={"points": size}, group="io"))
+        cases.append(BenchmarkCase("files.load_from_json",
+                                   lambda file_path=file_path: files.load_from_json(file_path),
+                                   params={"points": size}, group="io"))
+
+    return cases
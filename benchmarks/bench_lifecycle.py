@@ -0,0 +1,195 @@
+"""
+Memory-leak regression check of the curve and scatter lifecycle.
+
+Usage (from the root of the program):
+    python -m benchmarks.bench_lifecycle                    # 10,000 curves, 100 scatters
+    python -m benchmarks.bench_lifecycle --curves 1000 --scatters 20 --draw-every 1
+
+Curves are created and deleted in batches on an offscreen main window, the way a long session
+adds and removes them. Every few batches the graph is drawn with all the curves of the batch (the
+slow part, mostly under tracemalloc). After every batch the deferred deletes are handled, then the
+live widgets, the artists of the graph, the rows of the curve store and the Python memory
+(tracemalloc) are measured. The check fails when anything still grows once the first batch has
+warmed up the caches and the widget pool.
+"""
+
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+import warnings
+
+# Run from the root of the program, like main.py - the .ui files are loaded with relative paths
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.chdir(ROOT)
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks.bench_io import get_scatter_data
+from benchmarks.bench_render import get_application, create_main_ui, clear_session, add_scatter
+from src.classes.stores import INITIAL_CAPACITY
+from src.func.general import format_size
+
+NO_CURVES = 10000
+CURVE_BATCH_SIZE = 100
+# Batches of curves drawn on the graph before they are deleted
+DRAW_EVERY = 10
+NO_SCATTERS = 100
+SCATTER_BATCH_SIZE = 10
+SCATTER_SIZE = 1000
+SCATTER_STYLE_INDEX = 1
+# Python memory the session may still gain after the first batch, e.g. for interned strings
+MEMORY_TOLERANCE = 2 * 1024 ** 2
+
+
+def flush(app):
+    # Widgets released with deleteLater are only freed by the event loop
+    from PyQt5.QtCore import QCoreApplication, QEvent
+
+    app.processEvents()
+    QCoreApplication.sendPostedEvents(None, QEvent.DeferredDelete)
+    app.processEvents()
+    gc.collect()
+
+
+def get_snapshot(main_ui):
+    from ui.helpers.curve_widget_ui import CurveWidgetUI
+    from ui.helpers.scatter_widget_ui import ScatterWidgetUI
+
+    graph = main_ui.pyqt5_graph_widget
+    axes = graph.canvas.axes
+    curve_list = main_ui.curve_list
+    return {"curve_widgets": len(main_ui.findChildren(CurveWidgetUI)),
+            "scatter_widgets": len(main_ui.findChildren(ScatterWidgetUI)),
+            "artists": len(axes.lines) + len(axes.collections) + len(axes.patches),
+            "graph_plots": len(graph.decimated_plots) + len(graph.analytic_plots),
+            "curve_records": len(main_ui.curves_dict),
+            "curve_rows": main_ui.curves_dict.capacity,
+            "scatter_records": len(main_ui.scatter_dict),
+            "list_rows": curve_list.model.rowCount(),
+            "list_state": len(curve_list.open_widgets) + len(curve_list.expanded_ids) + len(curve_list.row_heights),
+            "memory": tracemalloc.get_traced_memory()[0]}
+
+
+def run_curve_cycles(app, main_ui, no_curves, batch_size, draw_every):
+    snapshots = []
+    for index, start in enumerate(range(0, no_curves, batch_size)):
+        for _ in range(min(batch_size, no_curves - start)):
+            main_ui.generate_new_curve(refresh=False)
+        if index % draw_every == 0:
+            main_ui.refresh_graph()
+        flush(app)
+
+        for key in list(main_ui.curves_dict.keys()):
+            main_ui.delete_curve(key, refresh=False)
+        main_ui.refresh_graph()
+        flush(app)
+        snapshots.append(get_snapshot(main_ui))
+    return snapshots
+
+
+def run_scatter_cycles(app, main_ui, no_scatters, batch_size):
+    # Every new scatter refreshes the graph, the points are drawn faster than the error areas
+    main_ui.pyqt5_experimentaldisplay_buttons[SCATTER_STYLE_INDEX].click()
+    snapshots = []
+    for start in range(0, no_scatters, batch_size):
+        for _ in range(min(batch_size, no_scatters - start)):
+            add_scatter(main_ui, get_scatter_data(SCATTER_SIZE))
+        main_ui.refresh_graph()
+        flush(app)
+
+        for key in list(main_ui.scatter_dict.keys()):
+            main_ui.delete_scatter(key, refresh=False)
+        main_ui.refresh_graph()
+        flush(app)
+        snapshots.append(get_snapshot(main_ui))
+    return snapshots
+
+
+def get_leaks(snapshots, baseline):
+    """
+    Compares the state left by the batches with the empty session.
+
+    Args:
+        snapshots (list): Snapshots taken after each batch was deleted.
+        baseline (dict): Snapshot of the empty session, before the first batch.
+
+    Returns:
+        list: Messages describing what was not released, empty when nothing leaks.
+    """
+    leaks = []
+    if not snapshots:
+        return leaks
+
+    first, last = snapshots[0], snapshots[-1]
+    for key in ["artists", "graph_plots", "curve_records", "scatter_records", "list_rows", "list_state",
+                "scatter_widgets"]:
+        if last[key] > baseline[key]:
+            leaks.append(f"{key}: {baseline[key]} before, {last[key]} after")
+
+    # The spectra arrays of the store shrink back to their initial capacity
+    if last["curve_rows"] > max(baseline["curve_rows"], INITIAL_CAPACITY):
+        leaks.append(f"curve_rows: {last['curve_rows']} rows still allocated")
+
+    # The curve list keeps a bounded pool of widgets, it must not grow from batch to batch
+    if last["curve_widgets"] > first["curve_widgets"]:
+        leaks.append(f"curve_widgets: {first['curve_widgets']} after the first batch, {last['curve_widgets']} after the last")
+
+    growth = last["memory"] - first["memory"]
+    if growth > MEMORY_TOLERANCE:
+        leaks.append(f"memory: grew by {format_size(growth)} after the first batch")
+    return leaks
+
+
+def print_snapshots(title, snapshots):
+    print(f"\n{title}")
+    print(f"{'batch':>6} {'memory':>12} {'curve widgets':>14} {'scatter widgets':>16} {'artists':>8} {'store rows':>11}")
+    for index, snapshot in enumerate(snapshots):
+        print(f"{index + 1:>6} {format_size(snapshot['memory']):>12} {snapshot['curve_widgets']:>14} "
+              f"{snapshot['scatter_widgets']:>16} {snapshot['artists']:>8} {snapshot['curve_rows']:>11}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check that deleted curves and scatters are released.")
+    parser.add_argument("--curves", type=int, default=NO_CURVES, help="Number of curves created and deleted.")
+    parser.add_argument("--curve-batch", type=int, default=CURVE_BATCH_SIZE, help="Curves alive at once.")
+    parser.add_argument("--draw-every", type=int, default=DRAW_EVERY,
+                        help="Draw the curves on the graph every this many batches.")
+    parser.add_argument("--scatters", type=int, default=NO_SCATTERS, help="Number of scatters created and deleted.")
+    parser.add_argument("--scatter-batch", type=int, default=SCATTER_BATCH_SIZE, help="Scatters alive at once.")
+    args = parser.parse_args(argv)
+
+    # Matplotlib and Qt warnings of the measured code would drown the report
+    warnings.simplefilter("ignore")
+    app = get_application()
+    main_ui = create_main_ui()
+    clear_session(main_ui)
+    flush(app)
+
+    tracemalloc.start()
+    baseline = get_snapshot(main_ui)
+    leaks = []
+
+    snapshots = run_curve_cycles(app, main_ui, args.curves, args.curve_batch, args.draw_every)
+    print_snapshots(f"{args.curves} curves, {args.curve_batch} per batch", snapshots)
+    leaks += get_leaks(snapshots, baseline)
+
+    baseline = get_snapshot(main_ui)
+    snapshots = run_scatter_cycles(app, main_ui, args.scatters, args.scatter_batch)
+    print_snapshots(f"{args.scatters} scatters, {args.scatter_batch} per batch", snapshots)
+    leaks += get_leaks(snapshots, baseline)
+    tracemalloc.stop()
+
+    if leaks:
+        print("\nLEAKS")
+        for leak in leaks:
+            print(f"  {leak}")
+        return 1
+
+    print("\nNo leaks")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
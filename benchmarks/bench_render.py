@@ -0,0 +1,141 @@
+import atexit
+import os
+import random
+import shutil
+import tempfile
+
+import numpy as np
+
+from benchmarks.bench_io import get_scatter_data
+from benchmarks.harness import BenchmarkCase
+from src.func import batch_render
+
+CURVE_COUNTS = [1, 10, 50]
+QUICK_CURVE_COUNTS = [1, 10]
+SCATTER_SIZES = [100, 10000, 1000000]
+QUICK_SCATTER_SIZES = [100]
+# Replicate measurements overlaid on the same graph
+REPLICATE_COUNT = 20
+REPLICATE_SIZES = [200, 2000]
+QUICK_REPLICATE_SIZES = [200]
+
+
+def get_application():
+    # Render without a display, unless the caller picked a platform
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtCore import qInstallMessageHandler
+    from PyQt5.QtWidgets import QApplication
+
+    # Silence the style sheet and font warnings printed for every loaded widget
+    qInstallMessageHandler(lambda *args: None)
+    return QApplication.instance() or QApplication([])
+
+
+def create_main_ui():
+    from ui.helpers.pyqt import DEFAULT_FONT
+    from ui.main_ui import MainUI
+
+    main_ui = MainUI()
+    main_ui.resize(1280, 800)
+    main_ui.show()
+
+    # The graphs use the font shipped with matplotlib, the same on every machine
+    font_combo = main_ui.graph_settings.pyqt5_combo_font_family
+    if font_combo.findText(DEFAULT_FONT) < 0:
+        font_combo.addItem(DEFAULT_FONT)
+    font_combo.setCurrentText(DEFAULT_FONT)
+    main_ui.update_graph_styling()
+    return main_ui
+
+
+def clear_session(main_ui):
+    for key in list(main_ui.curves_dict.keys()):
+        main_ui.delete_curve(key, refresh=False)
+    for key in list(main_ui.scatter_dict.keys()):
+        main_ui.delete_scatter(key, refresh=False)
+    main_ui.refresh_graph()
+
+
+def add_scatter(main_ui, scatter_data):
+    main_ui.generate_new_scatter(type="new")
+    key = list(main_ui.scatter_dict.keys())[-1]
+    main_ui.scatter_dict[key]["scatter"] = scatter_data
+
+
+def get_cases(quick=False):
+    app = get_application()
+    main_ui = create_main_ui()
+    graph = main_ui.pyqt5_graph_widget
+    cases = []
+
+    def setup_curves(count):
+        random.seed(0)
+        np.random.seed(0)
+        clear_session(main_ui)
+        for _ in range(count):
+            main_ui.generate_new_curve()
+        app.processEvents()
+
+    def setup_scatters(size, style_index):
+        clear_session(main_ui)
+        add_scatter(main_ui, get_scatter_data(size))
+        main_ui.pyqt5_experimentaldisplay_buttons[style_index].click()
+        app.processEvents()
+
+    def setup_replicates(size, style_index):
+        clear_session(main_ui)
+        for _ in range(REPLICATE_COUNT):
+            add_scatter(main_ui, get_scatter_data(size))
+        main_ui.pyqt5_experimentaldisplay_buttons[style_index].click()
+        app.processEvents()
+
+    def with_setup(setup, func):
+        # The session is rebuilt lazily, right before the case is measured
+        state = {"ready": False}
+
+        def run():
+            if not state["ready"]:
+                setup()
+                state["ready"] = True
+            func()
+
+        return run
+
+    for count in QUICK_CURVE_COUNTS if quick else CURVE_COUNTS:
+        cases.append(BenchmarkCase("main_ui.refresh_graph",
+                                   with_setup(lambda count=count: setup_curves(count), main_ui.refresh_graph),
+                                   params={"curves": count}, group="render"))
+        cases.append(BenchmarkCase("graph_widget.canvas.draw",
+                                   with_setup(lambda count=count: setup_curves(count), graph.canvas.draw),
+                                   params={"curves": count}, group="render"))
+
+    # Headless rendering of the same session, as done for the reports
+    folder = tempfile.mkdtemp(prefix="opendep_bench_")
+    atexit.register(shutil.rmtree, folder, ignore_errors=True)
+    figure_specs = {}
+
+    def setup_figure_spec(count):
+        setup_curves(count)
+        figure_specs[count] = main_ui.get_figure_spec(file_path=os.path.join(folder, f"figure_{count}.png"),
+                                                      width=800, height=600, dpi=300)
+
+    for count in QUICK_CURVE_COUNTS if quick else CURVE_COUNTS:
+        cases.append(BenchmarkCase("batch_render.render_figure",
+                                   with_setup(lambda count=count: setup_figure_spec(count),
+                                              lambda count=count: batch_render.render_figure(figure_specs[count])),
+                                   params={"curves": count}, group="render"))
+
+    for size in QUICK_SCATTER_SIZES if quick else SCATTER_SIZES:
+        for style_index, style in enumerate(["area", "scatter"]):
+            cases.append(BenchmarkCase("main_ui.refresh_graph",
+                                       with_setup(lambda size=size, index=style_index: setup_scatters(size, index),
+                                                  main_ui.refresh_graph),
+                                       params={"scatter_points": size, "style": style}, group="render"))
+
+    for size in QUICK_REPLICATE_SIZES if quick else REPLICATE_SIZES:
+        cases.append(BenchmarkCase("main_ui.refresh_graph",
+                                   with_setup(lambda size=size: setup_replicates(size, 1), main_ui.refresh_graph),
+                                   params={"scatters": REPLICATE_COUNT, "scatter_points": size, "style": "scatter"},
+                                   group="render"))
+
+    return cases
@@ -0,0 +1,262 @@
+"""
+Accuracy check of the multi-shell kernel of src/func/models.py.
+
+Usage (from the root of the program):
+    python -m benchmarks.check_accuracy                     # 1000 random particles
+    python -m benchmarks.check_accuracy --particles 10000 --seed 1
+
+The homogenous, single-shell and two-shell models are evaluated through the shell recursion of
+models.multi_shell_all, for batches of random parameters at once, and compared with the closed
+forms written out below term by term. A multi-shell particle is also checked against itself: two
+adjacent shells of the same material must give the same spectra as one shell of their summed
+thickness, and an ellipsoid of equal semi-axes the same spectra as the sphere along each axis.
+
+The float32 precision of the models (models.set_precision) is then checked against float64 on
+the same particles: the CM factors, the forces relative to their peak, and the cross-over
+frequencies. A cross-over moves by the error of Re[CM] divided by the slope of Re[CM], so that
+it is only checked where Re[CM] changes by at least MIN_CROSS_OVER_SLOPE per decade: flatter
+crossings are undetermined in any precision, a change of 0.1 % of a single parameter moving
+them by decades. Such crossings must still be found, or not, in both precisions.
+The check fails when any difference exceeds the tolerance.
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+
+# Run from the root of the program, like main.py
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.chdir(ROOT)
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from src.func import models, spectra
+
+NO_PARTICLES = 1000
+NO_POINTS = 200
+# Largest difference allowed on the CM factor (dimensionless) and, relative to its peak, on the DEP force
+TOLERANCE = 1e-9
+# Largest differences allowed between the float32 and float64 precisions: on the CM factor, on the
+# forces relative to their peak, larger for the particles of small CM factors, and relative on the
+# cross-over frequencies
+FLOAT32_TOLERANCE = 1e-5
+FLOAT32_FORCE_TOLERANCE = 1e-4
+CROSS_OVER_TOLERANCE = 1e-3
+# Slope of Re[CM] (per decade) below which a crossing is too flat for its frequency to be checked
+MIN_CROSS_OVER_SLOPE = 1e-3
+VACUUM_PERM = 8.854e-12
+
+
+def get_random_parameters(no_particles, rng):
+    # Log-uniform values over the ranges of biological particles, as column arrays
+    def log_uniform(low, high):
+        return 10 ** rng.uniform(np.log10(low), np.log10(high), (no_particles, 1))
+
+    return {"buffer_perm": rng.uniform(60, 80, (no_particles, 1)),
+            "buffer_cond": log_uniform(1e-4, 1),
+            "core_perm": rng.uniform(40, 80, (no_particles, 1)),
+            "core_cond": log_uniform(1e-2, 1),
+            "core_radius": log_uniform(0.5, 20),
+            "1st_shell_perm": rng.uniform(2, 20, (no_particles, 1)),
+            "1st_shell_cond": log_uniform(1e-8, 1e-3),
+            "1st_shell_thick": rng.uniform(3, 10, (no_particles, 1)),
+            "2nd_shell_perm": rng.uniform(10, 80, (no_particles, 1)),
+            "2nd_shell_cond": log_uniform(1e-4, 1),
+            "2nd_shell_thick": rng.uniform(10, 200, (no_particles, 1)),
+            "electric_field": rng.uniform(0.5, 2, (no_particles, 1))}
+
+
+def get_complex_perm(freq, perm, cond):
+    return perm * VACUUM_PERM - 1j * cond / (2 * np.pi * freq)
+
+
+def get_reference_cm(particle_perm, buffer_perm):
+    return (particle_perm - buffer_perm) / (particle_perm + 2 * buffer_perm)
+
+
+def get_reference_force(cm, radius, p):
+    return 2 * np.pi * p["buffer_perm"] * 8.854e-6 * radius ** 3 * cm.real * p["electric_field"]
+
+
+def get_reference_homogenous(freq, p):
+    cm = get_reference_cm(get_complex_perm(freq, p["core_perm"], p["core_cond"]),
+                          get_complex_perm(freq, p["buffer_perm"], p["buffer_cond"]))
+    return cm, get_reference_force(cm, p["core_radius"], p)
+
+
+def get_reference_single_shell(freq, p):
+    # Closed form of the cytoplasm (c) covered by the membrane (m), outer radius R
+    core = get_complex_perm(freq, p["core_perm"], p["core_cond"])
+    membrane = get_complex_perm(freq, p["1st_shell_perm"], p["1st_shell_cond"])
+    gamma = (p["core_radius"] / (p["core_radius"] - 0.001 * p["1st_shell_thick"])) ** 3
+    particle = membrane * ((gamma + 2 * (core - membrane) / (core + 2 * membrane)) /
+                           (gamma - (core - membrane) / (core + 2 * membrane)))
+
+    cm = get_reference_cm(particle, get_complex_perm(freq, p["buffer_perm"], p["buffer_cond"]))
+    return cm, get_reference_force(cm, p["core_radius"], p)
+
+
+def get_reference_two_shell(freq, p):
+    # Closed form of the core (c) covered by an inner (i) and an outer (o) shell, core radius r
+    core = get_complex_perm(freq, p["core_perm"], p["core_cond"])
+    inner = get_complex_perm(freq, p["1st_shell_perm"], p["1st_shell_cond"])
+    outer = get_complex_perm(freq, p["2nd_shell_perm"], p["2nd_shell_cond"])
+    inner_radius = p["core_radius"] + 0.001 * p["1st_shell_thick"]
+    outer_radius = inner_radius + 0.001 * p["2nd_shell_thick"]
+    gamma_inner = (inner_radius / p["core_radius"]) ** 3
+    gamma_outer = (outer_radius / inner_radius) ** 3
+
+    k_inner = (core - inner) / (core + 2 * inner)
+    inner_particle = inner * (gamma_inner + 2 * k_inner) / (gamma_inner - k_inner)
+    k_outer = (inner_particle - outer) / (inner_particle + 2 * outer)
+    particle = outer * (gamma_outer + 2 * k_outer) / (gamma_outer - k_outer)
+
+    cm = get_reference_cm(particle, get_complex_perm(freq, p["buffer_perm"], p["buffer_cond"]))
+    return cm, get_reference_force(cm, outer_radius, p)
+
+
+def get_errors(result, reference):
+    recm, imcm, force = result
+    cm, reference_force = reference
+    return {"recm": np.max(np.abs(recm - cm.real)),
+            "imcm": np.max(np.abs(imcm - cm.imag)),
+            # Relative to the largest force of every particle, the force crossing zero
+            "force": np.max(np.abs(force - reference_force) / np.max(np.abs(reference_force), axis=-1, keepdims=True))}
+
+
+def get_checks(freq, p):
+    checks = {}
+    checks["homogenous_particle_all"] = get_errors(
+        models.homogenous_particle_all(freq, p["electric_field"], p["core_radius"], p["core_perm"],
+                                       p["core_cond"], p["buffer_perm"], p["buffer_cond"]),
+        get_reference_homogenous(freq, p))
+
+    checks["single_shell_all"] = get_errors(
+        models.single_shell_all(freq, p["electric_field"], p["core_radius"], p["1st_shell_thick"],
+                                p["1st_shell_perm"], p["1st_shell_cond"], p["core_perm"], p["core_cond"],
+                                p["buffer_perm"], p["buffer_cond"]),
+        get_reference_single_shell(freq, p))
+
+    checks["two_shell_all"] = get_errors(
+        models.two_shell_all(freq, p["electric_field"], p["core_radius"], p["1st_shell_thick"],
+                             p["2nd_shell_thick"], p["core_perm"], p["core_cond"], p["1st_shell_perm"],
+                             p["1st_shell_cond"], p["2nd_shell_perm"], p["2nd_shell_cond"],
+                             p["buffer_perm"], p["buffer_cond"]),
+        get_reference_two_shell(freq, p))
+
+    # The inner shell split in two halves of the same material, under the outer shell
+    split_shells = [(p["1st_shell_thick"] / 2, p["1st_shell_perm"], p["1st_shell_cond"])] * 2
+    outer_shell = [(p["2nd_shell_thick"], p["2nd_shell_perm"], p["2nd_shell_cond"])]
+    recm, imcm, force = models.multi_shell_all(freq, p["electric_field"], p["core_radius"], p["core_perm"],
+                                               p["core_cond"], split_shells + outer_shell,
+                                               p["buffer_perm"], p["buffer_cond"])
+    checks["multi_shell_all (split shell)"] = get_errors((recm, imcm, force), get_reference_two_shell(freq, p))
+
+    # Spherical ellipsoids, every axis like the sphere
+    spectra = models.ellipsoid_multi_shell_all(freq, p["electric_field"], models.spheroid_semi_axes(p["core_radius"], 1.0),
+                                               p["core_perm"], p["core_cond"], split_shells + outer_shell,
+                                               p["buffer_perm"], p["buffer_cond"])
+    for axis in range(3):
+        checks[f"ellipsoid_multi_shell_all (axis {axis})"] = get_errors([spectrum[axis] for spectrum in spectra],
+                                                                       get_reference_two_shell(freq, p))
+    return checks
+
+
+def get_cross_over_error(freq, recm, reference_recm):
+    # Largest relative difference of the well-conditioned cross-overs, and the number of
+    # cross-overs found in a single precision
+    error, missing = 0.0, 0
+    log_step = np.diff(np.log10(freq))
+    cross_overs = zip(spectra.get_cross_over_brackets(reference_recm),
+                      spectra.get_cross_over_freqs(freq, reference_recm),
+                      spectra.get_cross_over_freqs(freq, recm))
+    for (found, index), reference, cross_over in cross_overs:
+        before = np.take_along_axis(reference_recm, index[..., np.newaxis], axis=-1)[..., 0]
+        after = np.take_along_axis(reference_recm, index[..., np.newaxis] + 1, axis=-1)[..., 0]
+        checked = found & (np.abs(after - before) / log_step[index] >= MIN_CROSS_OVER_SLOPE)
+
+        missing += np.count_nonzero(np.isnan(cross_over[checked]))
+        both = checked & ~np.isnan(cross_over)
+        if both.any():
+            error = max(error, np.max(np.abs(cross_over[both] / reference[both] - 1)))
+    return error, missing
+
+
+def get_precision_checks(freq, p):
+    # Every model, and a rod of three times its radius, in both precisions
+    shells = {"homogenous_particle": [],
+              "single_shell": [(p["1st_shell_thick"], p["1st_shell_perm"], p["1st_shell_cond"])],
+              "two_shell": [(p["1st_shell_thick"], p["1st_shell_perm"], p["1st_shell_cond"]),
+                            (p["2nd_shell_thick"], p["2nd_shell_perm"], p["2nd_shell_cond"])]}
+    particle = (p["core_perm"], p["core_cond"])
+    buffer = (p["buffer_perm"], p["buffer_cond"])
+    evaluations = {f"{name} (sphere)": lambda shells=shells[name]: models.multi_shell_spectra(
+                       freq, p["electric_field"], p["core_radius"], *particle, shells, *buffer)
+                   for name in shells}
+    evaluations["two_shell (rod, long axis)"] = lambda: {key: spectrum[0] for key, spectrum in
+                                                         models.ellipsoid_multi_shell_spectra(
+                                                             freq, p["electric_field"],
+                                                             models.spheroid_semi_axes(p["core_radius"], 3.0),
+                                                             *particle, shells["two_shell"], *buffer).items()}
+
+    checks = {}
+    for name, evaluate in evaluations.items():
+        reference = evaluate()
+        with models.precision_mode("float32"):
+            result = evaluate()
+        if result["recm"].dtype != np.float32:
+            raise TypeError(f"{name} is evaluated in {result['recm'].dtype}, not float32")
+
+        cross_over_error, missing = get_cross_over_error(freq, result["recm"], reference["recm"])
+        checks[name] = {"recm": np.max(np.abs(result["recm"] - reference["recm"])),
+                        "imcm": np.max(np.abs(result["imcm"] - reference["imcm"])),
+                        "force": np.max(np.abs(result["depforce"] - reference["depforce"]) /
+                                        np.max(np.abs(reference["depforce"]), axis=-1, keepdims=True)),
+                        "cross_over": cross_over_error,
+                        "missing": missing}
+    return checks
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the multi-shell kernel against the closed-form models.")
+    parser.add_argument("--particles", type=int, default=NO_PARTICLES, help="random particles checked at once")
+    parser.add_argument("--points", type=int, default=NO_POINTS, help="frequencies per particle")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the random parameters")
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    freq = np.logspace(2, 10, args.points)
+    checks = get_checks(freq, get_random_parameters(args.particles, rng))
+
+    print(f"{args.particles} particles x {args.points} frequencies, largest differences")
+    print(f"{'model':<40} {'Re[CM]':>10} {'Im[CM]':>10} {'DEP force':>10}")
+    failures = []
+    for name, errors in checks.items():
+        print(f"{name:<40} {errors['recm']:>10.2e} {errors['imcm']:>10.2e} {errors['force']:>10.2e}")
+        failures += [f"{name} {key}" for key, error in errors.items() if not error <= TOLERANCE]
+
+    print(f"\nfloat32 against float64, largest differences, cross-overs of slope above {MIN_CROSS_OVER_SLOPE}/decade")
+    print(f"{'model':<40} {'Re[CM]':>10} {'Im[CM]':>10} {'DEP force':>10} {'cross-over':>10} {'missing':>8}")
+    for name, errors in get_precision_checks(freq, get_random_parameters(args.particles, rng)).items():
+        print(f"{name:<40} {errors['recm']:>10.2e} {errors['imcm']:>10.2e} {errors['force']:>10.2e} "
+              f"{errors['cross_over']:>10.2e} {errors['missing']:>8}")
+        failures += [f"{name} {key} (float32)" for key in ["recm", "imcm"] if not errors[key] <= FLOAT32_TOLERANCE]
+        if not errors["force"] <= FLOAT32_FORCE_TOLERANCE:
+            failures.append(f"{name} force (float32)")
+        if not errors["cross_over"] <= CROSS_OVER_TOLERANCE or errors["missing"]:
+            failures.append(f"{name} cross-over (float32)")
+
+    if failures:
+        print("\nFAILED")
+        for failure in failures:
+            print(f"  {failure}")
+        return 1
+
+    print("\nAll models within tolerance")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
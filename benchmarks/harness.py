@@ -0,0 +1,176 @@
+import contextlib
+import io
+import json
+import platform
+import statistics
+import subprocess
+import time
+import timeit
+import tracemalloc
+
+from src.func.general import format_size
+
+
+class BenchmarkCase:
+    """
+    A single benchmark: a callable timed repeatedly, plus the parameters it was run with.
+
+    Args:
+        name (str): Unique name of the case, e.g. "models.single_shell_all".
+        func (callable): The code to measure, called without arguments.
+        params (dict): Parameters of the case (grid size, number of curves...).
+        group (str): Group the case belongs to (core, io, render).
+        teardown (callable): Optional function called once after the measurements.
+    """
+
+    def __init__(self, name, func, params=None, group="core", teardown=None):
+        self.name = name
+        self.func = func
+        self.params = params or {}
+        self.group = group
+        self.teardown = teardown
+
+    @property
+    def key(self):
+        # Name and parameters identify a case between two result files
+        if not self.params:
+            return self.name
+        params = ",".join(f"{key}={value}" for key, value in self.params.items())
+        return f"{self.name}[{params}]"
+
+
+def measure_time(func, repeat=5, min_time=0.2):
+    """
+    Times a callable the same way timeit does: the number of loops is picked so that
+    one repeat takes at least min_time seconds, and the per-call time of each repeat is kept.
+
+    Returns:
+        dict: min, median, mean and stdev of the per-call time (seconds), and the loops used.
+    """
+    timer = timeit.Timer(func)
+
+    # Calibrate the number of loops per repeat
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time or number >= 1_000_000:
+            break
+        number *= 10 if elapsed < min_time / 10 else 2
+
+    runs = [timer.timeit(number) / number for _ in range(repeat)]
+
+    return {"min": min(runs),
+            "median": statistics.median(runs),
+            "mean": statistics.mean(runs),
+            "stdev": statistics.stdev(runs) if len(runs) > 1 else 0.0,
+            "loops": number,
+            "repeat": repeat}
+
+
+def measure_memory(func):
+    """
+    Runs a callable once under tracemalloc. NumPy reports its buffers to tracemalloc,
+    so the peak includes the arrays allocated by the models.
+
+    Returns:
+        dict: peak and retained memory in bytes.
+    """
+    tracemalloc.start()
+    try:
+        func()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {"peak_bytes": peak, "retained_bytes": current}
+
+
+def run_cases(cases, repeat=5, min_time=0.2, memory=True, verbose=True):
+    results = {}
+    for case in cases:
+        result = {"name": case.name, "group": case.group, "params": case.params}
+        try:
+            # Keep the debug prints of the measured code out of the report
+            with contextlib.redirect_stdout(io.StringIO()):
+                result["time"] = measure_time(case.func, repeat=repeat, min_time=min_time)
+                if memory:
+                    result["memory"] = measure_memory(case.func)
+        finally:
+            if case.teardown is not None:
+                case.teardown()
+
+        results[case.key] = result
+        if verbose:
+            print(format_result(case.key, result))
+
+    return results
+
+
+def get_metadata():
+    import numpy as np
+    import matplotlib
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                                capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = "unknown"
+
+    return {"commit": commit,
+            "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+            "numpy": np.__version__,
+            "matplotlib": matplotlib.__version__}
+
+
+def save_results(file_path, results, metadata):
+    with open(file_path, 'w') as file:
+        json.dump({"metadata": metadata, "results": results}, file, indent=2)
+
+
+def load_results(file_path):
+    with open(file_path, 'r') as file:
+        return json.load(file)
+
+
+def compare_results(old, new, threshold=1.2):
+    """
+    Compares the median times of two result files, case by case.
+
+    Args:
+        old (dict): Baseline results, as loaded by load_results.
+        new (dict): Current results.
+        threshold (float): Ratio new/old above which a case counts as a regression.
+
+    Returns:
+        list: (key, old median, new median, ratio, regressed) for every case present in both.
+    """
+    rows = []
+    for key, new_result in new["results"].items():
+        old_result = old["results"].get(key)
+        if old_result is None:
+            continue
+        old_time = old_result["time"]["median"]
+        new_time = new_result["time"]["median"]
+        ratio = new_time / old_time if old_time > 0 else float("inf")
+        rows.append((key, old_time, new_time, ratio, ratio > threshold))
+
+    return rows
+
+
+def format_time(seconds):
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.1f} us"
+    elif seconds < 1:
+        return f"{seconds * 1e3:.2f} ms"
+    else:
+        return f"{seconds:.3f} s"
+
+
+def format_result(key, result):
+    line = f"{key:<60} {format_time(result['time']['median']):>12}"
+    if "memory" in result:
+        line += f"  peak {format_size(result['memory']['peak_bytes']):>10}"
+    return line
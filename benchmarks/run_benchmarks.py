@@ -0,0 +1,98 @@
+"""
+Benchmark suite of OpenDEP View.
+
+Usage (from the root of the program):
+    python -m benchmarks.run_benchmarks                     # all groups, results/<commit>.json
+    python -m benchmarks.run_benchmarks --quick --group core
+    python -m benchmarks.run_benchmarks --compare benchmarks/results/<old commit>.json
+
+Every case is timed (median of the repeats, loops calibrated like timeit) and run once
+under tracemalloc for its peak memory. Results are stored as JSON next to the commit they
+were measured on, so that two commits can be compared with --compare.
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import warnings
+
+# Run from the root of the program, like main.py - the .ui files are loaded with relative paths
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.chdir(ROOT)
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks import harness
+
+GROUPS = ["core", "io", "render"]
+
+
+def get_cases(groups, quick=False):
+    cases = []
+    if "core" in groups:
+        from benchmarks import bench_core
+        cases += bench_core.get_cases(quick=quick)
+    if "io" in groups:
+        from benchmarks import bench_io
+        cases += bench_io.get_cases(quick=quick)
+    if "render" in groups:
+        from benchmarks import bench_render
+        cases += bench_render.get_cases(quick=quick)
+    return cases
+
+
+def print_comparison(rows, threshold):
+    print(f"\n{'case':<60} {'old':>12} {'new':>12} {'ratio':>8}")
+    for key, old_time, new_time, ratio, regressed in rows:
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{key:<60} {harness.format_time(old_time):>12} {harness.format_time(new_time):>12} "
+              f"{ratio:>7.2f}x{flag}")
+    print(f"\n{sum(row[4] for row in rows)} regression(s) above {threshold:.2f}x")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the OpenDEP View benchmarks.")
+    parser.add_argument("--group", action="append", choices=GROUPS,
+                        help="Group of benchmarks to run, can be repeated (default: all).")
+    parser.add_argument("--filter", default=None, help="Only run the cases whose name contains this text.")
+    parser.add_argument("--quick", action="store_true", help="Use smaller grids and fewer sizes.")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of timed repeats per case.")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc run.")
+    parser.add_argument("--output", default=None,
+                        help="Result file (default: benchmarks/results/<commit>.json).")
+    parser.add_argument("--compare", default=None, help="Result file to compare the new results with.")
+    parser.add_argument("--threshold", type=float, default=1.2,
+                        help="Slowdown ratio reported as a regression (default: 1.2).")
+    args = parser.parse_args(argv)
+
+    # Matplotlib and Qt warnings of the measured code would drown the report
+    warnings.simplefilter("ignore")
+    with contextlib.redirect_stdout(io.StringIO()):
+        cases = get_cases(args.group or GROUPS, quick=args.quick)
+    if args.filter:
+        cases = [case for case in cases if args.filter in case.name]
+
+    metadata = harness.get_metadata()
+    metadata["quick"] = args.quick
+    results = harness.run_cases(cases, repeat=args.repeat, memory=not args.no_memory)
+
+    output = args.output or os.path.join("benchmarks", "results", f"{metadata['commit']}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    harness.save_results(output, results, metadata)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        rows = harness.compare_results(harness.load_results(args.compare),
+                                       harness.load_results(output),
+                                       threshold=args.threshold)
+        print_comparison(rows, args.threshold)
+        if any(row[4] for row in rows):
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,17 @@
+import multiprocessing
+
 from PyQt5.QtWidgets import QApplication
 from ui.main_ui import MainUI
+from src.func import tracing
+
+if __name__ == "__main__":
+    # Needed by the worker processes of the batch renderer in the frozen executable
+    multiprocessing.freeze_support()
+
+    # Set OPENDEP_TRACE=<file.json> to record a Chrome trace of the session
+    tracing.enable_from_environment()
 
-app = QApplication([])
-widget = MainUI()
-widget.show()
-app.exec_()
+    app = QApplication([])
+    widget = MainUI()
+    widget.show()
+    app.exec_()
@@ -10,7 +10,7 @@ a = Analysis(
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    excludes=["ui.resources.graphical_resources"],
     noarchive=False,
     optimize=0,
 )
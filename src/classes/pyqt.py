@@ -1,3 +1,5 @@
+import numpy as np
+from PyQt5.QtCore import Qt, QAbstractListModel, QAbstractTableModel, QModelIndex, QObject, QRunnable, pyqtSignal
 from PyQt5.QtGui import QDoubleValidator
 from PyQt5.QtWidgets import QStyledItemDelegate, QLineEdit
 
@@ -11,3 +13,177 @@ class FloatDelegate(QStyledItemDelegate):
         editor.setMaxLength(12)
         editor.setValidator(validator)
         return editor
+
+
+class WorkerSignals(QObject):
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+
+class FunctionWorker(QRunnable):
+    """
+    Runs a function in a QThreadPool thread. The result is sent back with the finished signal,
+    which Qt delivers in the thread of the connected object (the GUI thread for widgets).
+    """
+
+    def __init__(self, function, *args, **kwargs):
+        QRunnable.__init__(self)
+        self.function = function
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = WorkerSignals()
+
+    def run(self):
+        try:
+            result = self.function(*self.args, **self.kwargs)
+        except Exception as error:
+            self.signals.failed.emit(f"{type(error).__name__}: {error}")
+        else:
+            self.signals.finished.emit(result)
+
+
+class ScatterTableModel(QAbstractTableModel):
+    """
+    Table model reading and editing the arrays of a scatter directly (frequencies, Re[CM] values
+    and errors). The view only asks for the visible cells, and an edit changes a single element.
+    """
+
+    columns = ["frequencies", "recm_values", "recm_errors"]
+    headers = ["Frequency (Hz)", "Re[CM(f)]", "Re[CM(f)] errors"]
+
+    def __init__(self, scatter_data=None, parent=None):
+        QAbstractTableModel.__init__(self, parent)
+        self.scatter_data = None
+        self.set_scatter_data(scatter_data or {key: [] for key in self.columns})
+
+    def set_scatter_data(self, scatter_data):
+        # The lists are converted to arrays in the scatter dictionary itself, so the edits
+        # made in the table are seen by the graph without copying
+        self.beginResetModel()
+        for key in self.columns:
+            scatter_data[key] = np.asarray(scatter_data[key], dtype=np.float64)
+        self.scatter_data = scatter_data
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.scatter_data["frequencies"])
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.columns)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role not in (Qt.DisplayRole, Qt.EditRole):
+            return None
+        return str(float(self.scatter_data[self.columns[index.column()]][index.row()]))
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid() or role != Qt.EditRole:
+            return False
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            return False
+
+        self.scatter_data[self.columns[index.column()]][index.row()] = value
+        self.dataChanged.emit(index, index, [Qt.DisplayRole, Qt.EditRole])
+        return True
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.headers[section]
+        return str(section + 1)
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsSelectable | Qt.ItemIsEnabled | Qt.ItemIsEditable
+
+    def append_row(self, values):
+        row = self.rowCount()
+        self.beginInsertRows(QModelIndex(), row, row)
+        for key, value in zip(self.columns, values):
+            self.scatter_data[key] = np.append(self.scatter_data[key], value)
+        self.endInsertRows()
+
+    def remove_row(self, row):
+        if not 0 <= row < self.rowCount():
+            return
+        self.beginRemoveRows(QModelIndex(), row, row)
+        for key in self.columns:
+            self.scatter_data[key] = np.delete(self.scatter_data[key], row)
+        self.endRemoveRows()
+
+
+class CurveListModel(QAbstractListModel):
+    """
+    List model over the IDs of the curves, newest first. The data of a curve is read from the
+    curves dictionary of the main window, so the model only stores the order of the rows. The IDs
+    are kept oldest first, so that new curves are appended, with the position of every ID, so that
+    the row of a curve is found without searching the list.
+    """
+
+    CurveIdRole = Qt.UserRole
+
+    def __init__(self, curves_dict, parent=None):
+        QAbstractListModel.__init__(self, parent)
+        self.curves_dict = curves_dict
+        self.curve_ids = []
+        self.positions = {}
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.curve_ids)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        curve_id = self.get_curve_id(index.row())
+        if role == self.CurveIdRole:
+            return curve_id
+        if role == Qt.DisplayRole:
+            return self.curves_dict[curve_id]["name"]
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsEditable
+
+    def get_curve_id(self, row):
+        return self.curve_ids[len(self.curve_ids) - 1 - row]
+
+    def get_row(self, curve_id):
+        position = self.positions.get(curve_id)
+        if position is None:
+            return -1
+        return len(self.curve_ids) - 1 - position
+
+    def add_curve(self, curve_id):
+        self.beginInsertRows(QModelIndex(), 0, 0)
+        self.positions[curve_id] = len(self.curve_ids)
+        self.curve_ids.append(curve_id)
+        self.endInsertRows()
+
+    def remove_curve(self, curve_id):
+        row = self.get_row(curve_id)
+        if row < 0:
+            return
+        self.beginRemoveRows(QModelIndex(), row, row)
+        position = self.positions.pop(curve_id)
+        del self.curve_ids[position]
+        # Only the curves added after it move
+        for moved_id in self.curve_ids[position:]:
+            self.positions[moved_id] -= 1
+        self.endRemoveRows()
+
+    def curve_changed(self, curve_id):
+        row = self.get_row(curve_id)
+        if row >= 0:
+            self.dataChanged.emit(self.index(row), self.index(row))
@@ -0,0 +1,240 @@
+import itertools
+
+import numpy as np
+
+from src.func import general
+
+# Containers of the curves and scatters of a session. They are used like the dicts they replace,
+# store[id]["name"], but the IDs are allocated in increasing order (never reused), the metadata of
+# each entry lives in a record with __slots__, and the spectra of all curves are kept in one 2D array
+# per spectrum (one row per curve) over the frequency grid all curves share.
+
+# Rows allocated at once when the spectra arrays are full, the capacity then doubles,
+# and it is halved again once no more than a quarter of the rows are in use
+INITIAL_CAPACITY = 16
+
+
+class _Record:
+    __slots__ = ["id", "_store"]
+    fields = []
+
+    def __init__(self, id, store, data):
+        self.id = id
+        self._store = store
+        for key in self.fields:
+            self[key] = data.get(key)
+
+    def __getitem__(self, key):
+        if key not in self.fields:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        if key not in self.fields:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key):
+        return key in self.fields
+
+    def get(self, key, default=None):
+        return self[key] if key in self.fields else default
+
+    def keys(self):
+        return list(self.fields)
+
+    def copy(self):
+        # Plain dict of the entry, e.g. to be saved as JSON or added again to a store
+        return {key: self[key] for key in self.fields}
+
+
+class CurveRecord(_Record):
+    __slots__ = ["name", "color", "line_style", "line_width", "visibility", "model", "parameters", "widget"]
+    fields = ["name", "color", "line_style", "line_width", "visibility", "model", "parameters", "curves", "widget"]
+
+    def __getitem__(self, key):
+        if key == "curves":
+            return self._store.get_curves(self.id)
+        return _Record.__getitem__(self, key)
+
+    def __setitem__(self, key, value):
+        if key == "curves":
+            self._store.set_curves(self.id, value)
+        else:
+            _Record.__setitem__(self, key, value)
+
+
+class ScatterRecord(_Record):
+    __slots__ = ["name", "color", "point_size", "point_style", "visibility", "scatter", "widget"]
+    fields = ["name", "color", "point_size", "point_style", "visibility", "scatter", "widget"]
+
+
+class _Store:
+    record_class = _Record
+
+    def __init__(self):
+        self.records = {}
+        self._ids = itertools.count()
+
+    def __len__(self):
+        return len(self.records)
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def __contains__(self, id):
+        return id in self.records
+
+    def __getitem__(self, id):
+        return self.records[id]
+
+    def __delitem__(self, id):
+        del self.records[id]
+
+    def keys(self):
+        return self.records.keys()
+
+    def values(self):
+        return self.records.values()
+
+    def items(self):
+        return self.records.items()
+
+    def add(self, data):
+        """
+        Adds an entry to the store.
+
+        Args:
+            data (dict): The fields of the entry, e.g. a dict loaded from a file or the copy() of
+                another record. Missing fields are set to None, unknown ones are ignored.
+
+        Returns:
+            int: The ID of the new entry.
+        """
+        id = next(self._ids)
+        self.records[id] = self.record_class(id, self, data)
+        return id
+
+
+class CurveStore(_Store):
+    """
+    Curves of the session. The spectra returned by store[id]["curves"] are copies of the rows of
+    the shared arrays, as the rows move when curves are deleted, and setting them copies the data
+    into the row of the curve.
+    """
+
+    record_class = CurveRecord
+
+    def __init__(self):
+        _Store.__init__(self)
+        self.frequencies = None
+        self.spectra = {}
+        self.rows = {}
+        self.row_ids = []
+        self.capacity = 0
+
+    def __delitem__(self, id):
+        _Store.__delitem__(self, id)
+        row = self.rows.pop(id, None)
+        if row is None:
+            return
+
+        # The last row is moved into the freed one, so the rows in use stay contiguous
+        moved_id = self.row_ids.pop()
+        if moved_id != id:
+            for spectrum in self.spectra.values():
+                spectrum[row] = spectrum[len(self.row_ids)]
+            self.rows[moved_id] = row
+            self.row_ids[row] = moved_id
+
+        self.shrink()
+
+    def set_frequencies(self, frequencies):
+        """
+        Changes the frequency grid shared by the curves. The spectra of the other curves are no
+        longer valid on the new grid, they are reset to NaN and must be computed again (see
+        MainUI.modify_all_curves).
+        """
+        frequencies = np.array(frequencies, dtype=np.float64)
+        if self.frequencies is not None and frequencies.shape == self.frequencies.shape \
+                and np.array_equal(frequencies, self.frequencies):
+            return
+
+        self.spectra = {key: np.full((self.capacity, len(frequencies)), np.nan)
+                        for key in self.spectra}
+        self.frequencies = frequencies
+
+    def get_curves(self, id):
+        row = self.rows.get(id)
+        if row is None:
+            return None
+
+        # The frequencies are replaced, never modified in place, and can be shared
+        curves = {"frequencies": self.frequencies}
+        for key, spectrum in self.spectra.items():
+            curves[key] = spectrum[row].copy()
+        return curves
+
+    def set_curves(self, id, curves):
+        if curves is None:
+            return
+
+        self.set_frequencies(curves["frequencies"])
+
+        row = self.rows.get(id)
+        if row is None:
+            row = len(self.rows)
+            self.reserve(row + 1)
+            self.rows[id] = row
+            self.row_ids.append(id)
+
+        for key, values in curves.items():
+            if key == "frequencies":
+                continue
+            if key not in self.spectra:
+                self.spectra[key] = np.full((self.capacity, len(self.frequencies)), np.nan)
+            self.spectra[key][row] = values
+
+    def reserve(self, no_curves):
+        # Grows the spectra arrays, the new capacity is at least twice the previous one
+        if no_curves <= self.capacity:
+            return
+
+        capacity = max(no_curves, 2 * self.capacity, INITIAL_CAPACITY)
+        no_points = len(self.frequencies)
+        for key, spectrum in self.spectra.items():
+            grown = np.full((capacity, no_points), np.nan)
+            grown[:self.capacity] = spectrum
+            self.spectra[key] = grown
+        self.capacity = capacity
+
+    def shrink(self):
+        # Gives back the memory of the deleted curves, the rows in use are at the start of the arrays
+        if self.capacity <= INITIAL_CAPACITY or len(self.rows) > self.capacity // 4:
+            return
+
+        capacity = max(self.capacity // 2, INITIAL_CAPACITY)
+        for key, spectrum in self.spectra.items():
+            self.spectra[key] = spectrum[:capacity].copy()
+        self.capacity = capacity
+
+    def get_data_size(self):
+        size = self.frequencies.nbytes if self.frequencies is not None else 0
+        return size + sum(spectrum.nbytes for spectrum in self.spectra.values())
+
+    def get_no_points(self):
+        return len(self.rows) * (len(self.frequencies) if self.frequencies is not None else 0)
+
+
+class ScatterStore(_Store):
+    """
+    Scatters of the session. Each scatter keeps its own arrays, as they do not share frequencies.
+    """
+
+    record_class = ScatterRecord
+
+    def get_data_size(self):
+        return sum(general.get_data_size(record["scatter"]) for record in self.values())
+
+    def get_no_points(self):
+        return sum(len(record["scatter"]["frequencies"]) for record in self.values())
@@ -0,0 +1,127 @@
+import atexit
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from src.func import tracing
+
+# Headless rendering of many figures in worker processes, e.g. one figure per sample for a report.
+# A figure is described by a spec, the dict returned by MainUI.get_figure_spec:
+#   {"file_path": "report/sample_1.png",
+#    "width": 800, "height": 600, "dpi": 300, "grayscale": False,
+#    "y_index": 0, "scatter_style": "area", "style_params": MainUI.get_graph_styling(),
+#    "curves": [{"name", "color", "x_data", "y_data", "line_width", "line_style"}, ...],
+#    "scatters": [{"name", "color", "x_data", "y_data", "y_errors", "point_style", "point_size"}, ...]}
+# The format of the file (png, jpg, tiff, svg, pdf) is given by the extension of file_path.
+
+# DPI the figures are laid out at, the one of a standard screen
+RENDER_DPI = 100
+
+_pool = None
+_pool_workers = None
+
+
+def _initialize_worker():
+    # Runs once per worker process, the imports and the Agg backend stay warm between figures
+    import matplotlib
+    matplotlib.use("Agg")
+
+    from src.func import figure_export, plotting
+
+
+def render_figure(spec):
+    """
+    Renders a single figure spec to its file, without Qt or pyplot.
+
+    Args:
+        spec (dict): The figure spec, see the top of this module.
+
+    Returns:
+        str: The path of the written file.
+    """
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    from src.func import figure_export, plotting
+
+    # Created at its final size, so that the layout is computed only once
+    width, height = spec.get("width", 800), spec.get("height", 600)
+    figure = Figure(figsize=(figure_export.get_size_inches(width, RENDER_DPI),
+                             figure_export.get_size_inches(height, RENDER_DPI)),
+                    dpi=RENDER_DPI)
+    FigureCanvasAgg(figure)
+    axes = figure.add_subplot(111)
+    plotting.setup_axes(axes)
+
+    for curve in spec.get("curves", []):
+        # The evaluator is only used by the interactive graph, when zooming
+        curve = {key: value for key, value in curve.items() if key != "evaluator"}
+        plotting.plot_curve(axes, **curve)
+    for scatter in spec.get("scatters", []):
+        plotting.plot_scatter(axes, scatter_style=spec.get("scatter_style", "area"), **scatter)
+
+    plotting.format_axes(axes, y_index=spec.get("y_index", 0), style_params=spec["style_params"])
+
+    figure_export.export_figure(figure,
+                                spec["file_path"],
+                                width=width,
+                                height=height,
+                                dpi=spec.get("dpi", RENDER_DPI),
+                                grayscale=spec.get("grayscale", False),
+                                render_dpi=RENDER_DPI)
+    return spec["file_path"]
+
+
+def get_pool(max_workers=None):
+    """
+    Returns the pool of worker processes, created on first use and kept alive for the next batches.
+    Workers are spawned rather than forked, which is safe from a running Qt application.
+    """
+    global _pool, _pool_workers
+
+    max_workers = max_workers or os.cpu_count() or 1
+    if _pool is not None and _pool_workers != max_workers:
+        shutdown_pool()
+
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=max_workers,
+                                    mp_context=multiprocessing.get_context("spawn"),
+                                    initializer=_initialize_worker)
+        _pool_workers = max_workers
+
+    return _pool
+
+
+def shutdown_pool():
+    global _pool, _pool_workers
+
+    if _pool is not None:
+        _pool.shutdown(wait=True)
+    _pool = None
+    _pool_workers = None
+
+
+atexit.register(shutdown_pool)
+
+
+@tracing.traced(category="render")
+def render_figures(specs, max_workers=None):
+    """
+    Renders a list of figure specs in parallel.
+
+    Args:
+        specs (list): Figure specs, see the top of this module.
+        max_workers (int): Number of worker processes, one per CPU by default.
+            With a single worker the figures are rendered in the calling process.
+
+    Returns:
+        list: The paths of the written files, in the order of the specs.
+    """
+    specs = list(specs)
+    if max_workers == 1 or len(specs) <= 1:
+        return [render_figure(spec) for spec in specs]
+
+    pool = get_pool(max_workers)
+    # Several figures per task, so that the inter-process overhead is paid less often
+    chunksize = max(1, len(specs) // (_pool_workers * 4))
+    return list(pool.map(render_figure, specs, chunksize=chunksize))
@@ -0,0 +1,181 @@
+import numpy as np
+
+from src.func import spectra, sweep, tracing
+
+# Cross-over frequencies versus the conductivity of the medium, the standard DEP characterization
+# plot. For every conductivity the Re[CM] spectrum is sampled on a coarse log-frequency grid, the
+# sign changes bracket the cross-overs, and each bracket is refined with the Illinois variant of
+# regula falsi. All conductivities are solved together, as arrays, not one root at a time.
+
+# Conductivities of the medium (S/m) of the graph mode and of the exported tables
+CONDUCTIVITY_RANGE = (1e-4, 10.0)
+NO_CONDUCTIVITIES = 1000
+# Frequencies (Hz) searched for cross-overs, and the points of the coarse grid bracketing them
+FREQUENCY_RANGE = (1e2, 1e10)
+SEARCH_POINTS = 200
+# Width of the brackets (in decades of frequency) at which the refinement stops
+TOLERANCE = 1e-12
+MAX_ITERATIONS = 100
+# Conductivities sampled per round when locating the conductivity above which no cross-over exists
+CUT_OFF_POINTS = 64
+CUT_OFF_ROUNDS = 4
+
+
+def get_conductivities(start=CONDUCTIVITY_RANGE[0], stop=CONDUCTIVITY_RANGE[1], no_values=NO_CONDUCTIVITIES):
+    return sweep.get_sweep_values(start, stop, no_values, log_scale=True)
+
+
+def get_recm_function(parameters, model_name, parameter, values):
+    """
+    Re[CM] of the members of a family, each at its own frequency.
+
+    Returns:
+        callable: function(indices, log_frequencies), the Re[CM] of the members at the given
+            indices of values, at the given log10 frequencies (one per index).
+    """
+    values = np.asarray(values, dtype=np.float64)
+
+    def get_recm(indices, log_frequencies):
+        member_parameters = dict(parameters)
+        member_parameters[parameter] = values[indices]
+        recm, _, _ = spectra.evaluate_model(member_parameters, model_name, 10 ** log_frequencies)
+        return np.broadcast_to(recm, np.shape(indices))
+
+    return get_recm
+
+
+def solve_brackets(function, lower, upper, f_lower, f_upper, tolerance=TOLERANCE, max_iterations=MAX_ITERATIONS):
+    """
+    Refines many brackets of roots at once with the Illinois method: regula falsi, halving the
+    value kept at the end of the bracket that does not move, so that both ends converge.
+
+    Args:
+        function (callable): function(indices, x), the function of each bracket at x.
+        lower (np.array): Lower ends of the brackets.
+        upper (np.array): Upper ends of the brackets.
+        f_lower (np.array): Function at the lower ends.
+        f_upper (np.array): Function at the upper ends, of opposite sign.
+        tolerance (float): Width of the brackets at which they are solved.
+        max_iterations (int): Iterations after which the remaining brackets are left as they are.
+
+    Returns:
+        np.array: The roots, one per bracket.
+    """
+    a, b = np.array(lower, dtype=np.float64), np.array(upper, dtype=np.float64)
+    fa, fb = np.array(f_lower, dtype=np.float64), np.array(f_upper, dtype=np.float64)
+    active = np.flatnonzero((fa != 0) & (fb != 0))
+
+    for _ in range(max_iterations):
+        if active.size == 0:
+            break
+
+        # Only the brackets not solved yet are evaluated
+        c = b[active] - fb[active] * (b[active] - a[active]) / (fb[active] - fa[active])
+        fc = function(active, c)
+
+        # The root is now between b and c: b becomes the other end. Otherwise the kept end
+        # has its value halved, which pulls the next secant towards it
+        crossed = fc * fb[active] < 0
+        a[active[crossed]] = b[active[crossed]]
+        fa[active[crossed]] = fb[active[crossed]]
+        fa[active[~crossed]] *= 0.5
+        b[active], fb[active] = c, fc
+
+        solved = (np.abs(b[active] - a[active]) <= tolerance) | (fc == 0) | ~np.isfinite(c)
+        active = active[~solved]
+
+    # Roots found exactly at the ends of the brackets
+    return np.where(np.asarray(f_lower) == 0, lower, np.where(np.asarray(f_upper) == 0, upper, b))
+
+
+@tracing.traced("solve_cross_overs", category="compute")
+def solve_cross_overs(parameters, model_name, values=None, parameter="buffer_cond",
+                      frequency_range=FREQUENCY_RANGE, no_points=SEARCH_POINTS, tolerance=TOLERANCE):
+    """
+    Solves the first and second cross-over frequencies for many values of a parameter, by
+    default the conductivity of the medium.
+
+    Args:
+        parameters (dict): Curve parameters, see MainUI.create_default_curve_data.
+        model_name (str): "homogenous_particle", "single_shell" or "two_shell".
+        values (np.array): Values of the parameter, increasing. By default get_conductivities().
+        parameter (str): Swept parameter, one of sweep.SWEEP_PARAMETERS.
+        frequency_range (tuple): Frequencies (Hz) searched for cross-overs.
+        no_points (int): Points of the coarse grid bracketing the cross-overs. Two cross-overs
+            closer than one step of the grid are missed.
+        tolerance (float): Precision of the cross-overs, in decades of frequency.
+
+    Returns:
+        dict: The parameter and its values, the "1st_cross_over" and "2nd_cross_over"
+            frequencies (NaN when missing), and the "cut_off" value, above which neither
+            cross-over exists (NaN when the cross-overs exist up to the last value, or never).
+    """
+    values = get_conductivities() if values is None else np.asarray(values, dtype=np.float64)
+    frequencies = np.logspace(np.log10(frequency_range[0]), np.log10(frequency_range[1]), no_points)
+    log_frequencies = np.log10(frequencies)
+
+    recm = sweep.sweep_model(parameters, model_name, frequencies, [(parameter, values)])["recm"]
+    get_recm = get_recm_function(parameters, model_name, parameter, values)
+
+    result = {"parameter": parameter, "values": values}
+    for key, (found, index) in zip(["1st_cross_over", "2nd_cross_over"], spectra.get_cross_over_brackets(recm)):
+        rows = np.flatnonzero(found)
+        columns = index[rows]
+        roots = solve_brackets(lambda active, x: get_recm(rows[active], x),
+                               log_frequencies[columns], log_frequencies[columns + 1],
+                               recm[rows, columns], recm[rows, columns + 1],
+                               tolerance=tolerance)
+
+        cross_overs = np.full(len(values), np.nan)
+        cross_overs[rows] = 10 ** roots
+        result[key] = cross_overs
+
+    result["cut_off"] = get_cut_off(parameters, model_name, parameter, values, frequencies, result)
+    return result
+
+
+def has_cross_over(parameters, model_name, parameter, values, frequencies):
+    recm = sweep.sweep_model(parameters, model_name, frequencies, [(parameter, values)])["recm"]
+    return np.any(recm[:, :-1] * recm[:, 1:] <= 0, axis=1)
+
+
+def get_cut_off(parameters, model_name, parameter, values, frequencies, cross_overs):
+    """
+    Value of the parameter above which no cross-over exists, between the last value with a
+    cross-over and the next one. The interval is sampled again CUT_OFF_ROUNDS times, every
+    round CUT_OFF_POINTS values at once, in log scale for positive values.
+    """
+    exists = ~(np.isnan(cross_overs["1st_cross_over"]) & np.isnan(cross_overs["2nd_cross_over"]))
+    if not exists.any() or exists[-1]:
+        return np.nan
+
+    last = np.flatnonzero(exists)[-1]
+    lower, upper = values[last], values[last + 1]
+    log_scale = lower > 0
+    for _ in range(CUT_OFF_ROUNDS):
+        if log_scale:
+            candidates = np.logspace(np.log10(lower), np.log10(upper), CUT_OFF_POINTS)
+        else:
+            candidates = np.linspace(lower, upper, CUT_OFF_POINTS)
+
+        candidates_exist = has_cross_over(parameters, model_name, parameter, candidates, frequencies)
+        if not candidates_exist.any():
+            break
+        index = np.flatnonzero(candidates_exist)[-1]
+        if index == len(candidates) - 1:
+            break
+        lower, upper = candidates[index], candidates[index + 1]
+
+    return np.sqrt(lower * upper) if log_scale else (lower + upper) / 2
+
+
+def get_cross_over_table(result):
+    """
+    Rows of the cross-over table: parameter value, first and second cross-over (None when missing).
+    """
+    table = []
+    for value, first, second in zip(result["values"], result["1st_cross_over"], result["2nd_cross_over"]):
+        table.append([float(value),
+                      None if np.isnan(first) else float(first),
+                      None if np.isnan(second) else float(second)])
+    return table
@@ -0,0 +1,92 @@
+import numpy as np
+
+# Display-side level of detail: a dense trace is reduced to the points that can be told apart
+# on screen. The view is split in one column per pixel (in log-frequency for the DEP spectra),
+# and only the first, last, lowest and highest point of every column are kept, so that the
+# drawn envelope is the same as with the full data. The full data is never modified.
+
+# Data with fewer points than this many per pixel column is drawn as is
+POINTS_PER_COLUMN = 4
+
+
+def needs_decimation(no_points, no_columns):
+    return no_points > POINTS_PER_COLUMN * no_columns
+
+
+def is_sorted(x):
+    x = np.asarray(x)
+    return x.size < 2 or bool(np.all(x[1:] >= x[:-1]))
+
+
+def get_columns(x, x_min, x_max, no_columns, log_x=True):
+    """
+    Computes the pixel column of every point, -1 left of the view and no_columns right of it.
+
+    Args:
+        x (np.ndarray): Sorted x values.
+        x_min (float): Left limit of the view.
+        x_max (float): Right limit of the view.
+        no_columns (int): Number of pixel columns of the view.
+        log_x (bool): The x axis is logarithmic.
+
+    Returns:
+        np.ndarray: Column index of every point, dtype int64.
+    """
+    if log_x:
+        tiny = np.finfo(float).tiny
+        x = np.log10(np.maximum(x, tiny))
+        x_min, x_max = np.log10(max(x_min, tiny)), np.log10(max(x_max, tiny))
+
+    span = x_max - x_min
+    if span <= 0:
+        return np.zeros(len(x), dtype=np.int64)
+
+    columns = np.floor((x - x_min) / span * no_columns)
+    return np.clip(columns, -1, no_columns).astype(np.int64)
+
+
+def get_decimation_indices(x, y_arrays, x_min, x_max, no_columns, log_x=True):
+    """
+    Selects the points to draw for the current view, with min/max per pixel column.
+
+    Args:
+        x (np.ndarray): Sorted x values.
+        y_arrays (list): y arrays sharing x, e.g. [values] or [values - errors, values + errors].
+            The extremes of each of them are kept.
+        x_min (float): Left limit of the view.
+        x_max (float): Right limit of the view.
+        no_columns (int): Width of the view in pixels.
+        log_x (bool): The x axis is logarithmic.
+
+    Returns:
+        np.ndarray: Sorted indices of the points to draw. The nearest point on each side of the
+            view is included, so that lines run to the edges of the axes.
+    """
+    no_points = len(x)
+    x_min, x_max = min(x_min, x_max), max(x_min, x_max)
+    start = max(int(np.searchsorted(x, x_min, side="left")) - 1, 0)
+    stop = min(int(np.searchsorted(x, x_max, side="right")) + 1, no_points)
+    if not needs_decimation(stop - start, no_columns):
+        return np.arange(start, stop)
+
+    columns = get_columns(x[start:stop], x_min, x_max, no_columns, log_x=log_x)
+
+    # Segments of consecutive points falling in the same column
+    boundaries = np.flatnonzero(columns[1:] != columns[:-1]) + 1
+    starts = np.concatenate(([0], boundaries))
+    ends = np.concatenate((boundaries, [stop - start])) - 1
+    segment_ids = np.repeat(np.arange(len(starts)), ends - starts + 1)
+
+    kept = [starts, ends]
+    for y in y_arrays:
+        y = np.asarray(y)[start:stop]
+        for reduce in (np.fmin, np.fmax):
+            # NaNs are ignored by fmin/fmax, segments holding only NaNs keep their first and last point
+            extremes = reduce.reduceat(y, starts)
+            hits = np.flatnonzero(y == extremes[segment_ids])
+            hit_segments = segment_ids[hits]
+            first_hits = np.ones(hits.size, dtype=bool)
+            first_hits[1:] = hit_segments[1:] != hit_segments[:-1]
+            kept.append(hits[first_hits])
+
+    return np.unique(np.concatenate(kept)) + start
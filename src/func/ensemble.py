@@ -0,0 +1,130 @@
+import numpy as np
+
+from src.func import spectra, sweep, tracing
+
+# Population heterogeneity: real cell populations have distributions of radius, membrane
+# permittivity... rather than the single values of a curve. The parameters are sampled for the
+# whole population, and the spectra of all samples are reduced to the population mean and
+# percentile bands. The (samples x frequencies) grid is evaluated in blocks of frequencies, so
+# that every block holds all the samples and its percentiles are exact, with bounded memory.
+
+DISTRIBUTIONS = ["normal", "lognormal", "uniform"]
+# Percentiles of the bands drawn around the mean: 5-95 % and 25-75 %, plus the median
+PERCENTILES = [5, 25, 50, 75, 95]
+NO_SAMPLES = 10000
+# Values (samples x frequencies) evaluated at once, same bound as the parameter sweeps
+CHUNK_SIZE = sweep.CHUNK_SIZE
+# Redraws of the non-positive samples of a normal distribution before giving up
+MAX_REDRAWS = 100
+
+
+def sample_distribution(distribution, no_samples, rng):
+    """
+    Samples one parameter of the population.
+
+    Args:
+        distribution (dict): {"distribution": "normal" or "lognormal", "mean": ..., "std": ...},
+            the mean and standard deviation of the parameter itself (not of its logarithm), or
+            {"distribution": "uniform", "low": ..., "high": ...}.
+        no_samples (int): Number of samples.
+        rng (np.random.Generator): Random generator.
+
+    Returns:
+        np.array: The samples, all positive.
+    """
+    kind = distribution.get("distribution")
+    if kind not in DISTRIBUTIONS:
+        raise ValueError(f"Unknown distribution: {kind}")
+
+    if kind == "uniform":
+        low, high = distribution["low"], distribution["high"]
+        if not 0 < low <= high:
+            raise ValueError(f"Uniform distribution needs 0 < low <= high, not {low} and {high}")
+        return rng.uniform(low, high, no_samples)
+
+    mean, std = distribution["mean"], distribution["std"]
+    if mean <= 0 or std < 0:
+        raise ValueError(f"Distribution needs a positive mean and std, not {mean} and {std}")
+
+    if kind == "lognormal":
+        # Parameters of the underlying normal distribution giving this mean and std
+        sigma = np.sqrt(np.log1p((std / mean) ** 2))
+        return rng.lognormal(np.log(mean) - sigma ** 2 / 2, sigma, no_samples)
+
+    # Normal distribution truncated to the physical, positive values
+    samples = rng.normal(mean, std, no_samples)
+    for _ in range(MAX_REDRAWS):
+        invalid = samples <= 0
+        if not invalid.any():
+            return samples
+        samples[invalid] = rng.normal(mean, std, np.count_nonzero(invalid))
+    raise ValueError(f"Normal distribution of mean {mean} and std {std} is mostly non-positive")
+
+
+def sample_population(parameters, distributions, no_samples=NO_SAMPLES, seed=None):
+    """
+    Parameters of every sample of the population, the distributed ones as column arrays.
+
+    Args:
+        parameters (dict): Parameters of the curve, see MainUI.create_default_curve_data.
+        distributions (dict): Distribution of every heterogeneous parameter, e.g.
+            {"core_radius": {"distribution": "normal", "mean": 5.0, "std": 0.5}}.
+        no_samples (int): Number of samples.
+        seed (int): Seed of the random generator, for reproducible populations.
+
+    Returns:
+        dict: The parameters of the population, each distributed one of shape (no_samples, 1).
+    """
+    if no_samples < 1:
+        raise ValueError(f"A population needs at least one sample, not {no_samples}")
+
+    rng = np.random.default_rng(seed)
+    population = dict(parameters)
+    for name, distribution in distributions.items():
+        if name not in sweep.SWEEP_PARAMETERS:
+            raise ValueError(f"Unknown parameter: {name}")
+        population[name] = sample_distribution(distribution, no_samples, rng).reshape(-1, 1)
+    return population
+
+
+@tracing.traced("ensemble_model", category="compute")
+def ensemble_model(parameters, model_name, frequencies, distributions, no_samples=NO_SAMPLES,
+                   percentiles=PERCENTILES, seed=None):
+    """
+    Population-averaged spectra of one particle model.
+
+    Args:
+        parameters (dict): Parameters of the curve, see MainUI.create_default_curve_data.
+        model_name (str): "homogenous_particle", "single_shell" or "two_shell".
+        frequencies (np.array): Frequencies (Hz) at which the model is evaluated.
+        distributions (dict): Distribution of every heterogeneous parameter, see sample_population.
+        no_samples (int): Number of samples of the population.
+        percentiles (list): Percentiles of the bands, between 0 and 100.
+        seed (int): Seed of the random generator.
+
+    Returns:
+        dict: The frequencies and percentiles, and for "recm" and "depforce" the population
+            mean "<key>_mean" of shape (no_frequencies,) and the "<key>_percentiles" of shape
+            (no_percentiles, no_frequencies).
+    """
+    frequencies = np.asarray(frequencies, dtype=np.float64)
+    population = sample_population(parameters, distributions, no_samples, seed)
+
+    result = {"frequencies": frequencies, "percentiles": list(percentiles)}
+    for key in ["recm", "depforce"]:
+        result[f"{key}_mean"] = np.empty(len(frequencies))
+        result[f"{key}_percentiles"] = np.empty((len(percentiles), len(frequencies)))
+
+    # Every block holds all the samples of a few frequencies
+    block_size = max(1, CHUNK_SIZE // no_samples)
+    for start in range(0, len(frequencies), block_size):
+        stop = min(start + block_size, len(frequencies))
+        recm, _, depforce = spectra.evaluate_model(population, model_name, frequencies[start:stop])
+        for key, values in [("recm", recm), ("depforce", depforce)]:
+            # Spectra not depending on the distributed parameters come out as a single row
+            values = np.broadcast_to(values, (no_samples, stop - start))
+            result[f"{key}_mean"][start:stop] = values.mean(axis=0)
+            result[f"{key}_percentiles"][:, start:stop] = np.percentile(values, percentiles, axis=0)
+
+    return result
+
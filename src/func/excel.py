@@ -1,9 +1,13 @@
-from openpyxl import Workbook, load_workbook
-from openpyxl.styles import PatternFill, Border, Side
-from openpyxl.utils import get_column_letter
+from src.func import tracing
 
+# openpyxl is imported inside the functions, so that the computation modules
+# can be imported by worker processes without paying for it
 
+
+@tracing.traced(category="io")
 def save_scatter_to_excel(file, scatter_data):
+    from openpyxl import Workbook
+
     wb = Workbook()
     ws = wb.active
 
@@ -30,7 +34,38 @@ def save_scatter_to_excel(file, scatter_data):
     wb.save(filename=file)
 
 
+@tracing.traced(category="io")
+def save_cross_over_table_to_excel(file, parameter_label, table, cut_off=None):
+    from openpyxl import Workbook
+
+    wb = Workbook()
+    ws = wb.active
+
+    ## Excel top-table setup ##
+    ws['A1'] = parameter_label
+    ws['B1'] = '1st cross-over frequency (Hz)'
+    ws['C1'] = '2nd cross-over frequency (Hz)'
+    ws['E1'] = 'No cross-over above'
+    ws['E2'] = cut_off
+
+    ## Excel bottom-table setup ##
+    # Empty cells where a cross-over is missing
+    for a, row in enumerate(table):
+        for b, value in enumerate(row):
+            ws.cell(row=a+2, column=b+1).value = value
+
+    auto_stretch_columns(ws)
+    set_background_color(ws, top=1, bottom=1, left=1, right=3, color='00C4D79B')
+    set_background_color(ws, top=1, bottom=1, left=5, right=5, color='00C4D79B')
+    set_border(ws, top=1, bottom=1, left=1, right=3, color='000000', border_style='thick')
+
+    wb.save(filename=file)
+
+
+@tracing.traced(category="io")
 def load_scatter_from_excel(file):
+    from openpyxl import load_workbook
+
     wb = load_workbook(filename=file)
     ws = wb.active
 
@@ -62,7 +97,10 @@ def load_scatter_from_excel(file):
         return None
 
 
+@tracing.traced(category="io")
 def load_curve_from_excel(file):
+    from openpyxl import load_workbook
+
     wb = load_workbook(filename=file)
     ws = wb.active
     parameters = {}
@@ -79,6 +117,10 @@ def load_curve_from_excel(file):
                       "2nd_shell_cond": 0.00001,
                       "2nd_shell_thick": 6.0,
                       "electric_field": 1.0,
+                      "aspect_ratio": 1.0,
+                      "wavelength": 100.0,
+                      "volume_fraction": 0.1,
+                      "cell_constant": 100.0,
                       "1st_cross_over": {"homogenous": 0.0,
                                          "single_shell": 0.0,
                                          "two_shell": 0.0},
@@ -101,6 +143,10 @@ def load_curve_from_excel(file):
                       "2nd_shell_cond": 0.00001,
                       "2nd_shell_thick": 6.0,
                       "electric_field": 1.0,
+                      "aspect_ratio": 1.0,
+                      "wavelength": 100.0,
+                      "volume_fraction": 0.1,
+                      "cell_constant": 100.0,
                       "1st_cross_over": {"homogenous": 0.0,
                                          "single_shell": 0.0,
                                          "two_shell": 0.0},
@@ -122,6 +168,8 @@ def load_curve_from_excel(file):
 
 # Setting borders to a group of cells #
 def set_border(ws, top, bottom, left, right, color, border_style):
+    from openpyxl.styles import Border, Side
+
     for i in range(top, bottom):
         border1 = Border(left=Side(border_style=border_style, color=color))
         ws.cell(row=i, column=left).border = border1
@@ -148,6 +196,8 @@ def set_border(ws, top, bottom, left, right, color, border_style):
 
 
 def set_background_color(ws, top, bottom, left, right, color):
+    from openpyxl.styles import PatternFill
+
     fill = PatternFill("solid", fgColor=color)
     for i in range(top, bottom + 1):
         for j in range(left, right + 1):
@@ -163,6 +213,8 @@ def set_tabel_background(ws, top, bottom, left, right, color1, color2):
 
 
 def auto_stretch_columns(ws):
+    from openpyxl.utils import get_column_letter
+
     for col in ws.columns:
         max_length = 0
         column = get_column_letter(col[0].column)  # Get the column name
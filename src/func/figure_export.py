@@ -0,0 +1,119 @@
+import io
+
+import numpy as np
+
+from src.func import tracing
+
+# File extension -> format name used by PIL for the raster formats
+RASTER_FORMATS = {"png": "PNG",
+                  "jpg": "JPEG",
+                  "jpeg": "JPEG",
+                  "tif": "TIFF",
+                  "tiff": "TIFF"}
+VECTOR_FORMATS = ["svg", "pdf", "eps"]
+
+
+def get_size_inches(pixels, dpi):
+    """
+    Converts a size in pixels into inches, for a figure rendered at the given DPI.
+    Agg truncates the size of the figure to whole pixels, so the result is nudged up
+    until it gives back exactly the requested number of pixels.
+
+    Args:
+        pixels (int): The size in pixels.
+        dpi (float): The DPI the figure is rendered at.
+
+    Returns:
+        float: The size in inches.
+    """
+    inches = pixels / dpi
+    while int(inches * dpi) < pixels:
+        inches = np.nextafter(inches, np.inf)
+    return inches
+
+
+def rgba_to_grayscale(rgba):
+    """
+    Converts an RGBA image buffer into grayscale, with the ITU-R 601-2 luma weights
+    (the same integer formula PIL uses for convert("L")).
+
+    Args:
+        rgba (np.ndarray): Image of shape (height, width, 4), dtype uint8.
+
+    Returns:
+        np.ndarray: Grayscale image of shape (height, width), dtype uint8.
+    """
+    rgb = rgba[..., :3].astype(np.uint32)
+    luma = (rgb[..., 0] * 19595 + rgb[..., 1] * 38470 + rgb[..., 2] * 7471 + 0x8000) >> 16
+    return luma.astype(np.uint8)
+
+
+def render_figure_to_buffer(figure, dpi):
+    """
+    Renders the figure once with Agg, at its current size.
+
+    Returns:
+        np.ndarray: RGBA image of shape (height, width, 4), dtype uint8.
+    """
+    buffer = io.BytesIO()
+    # savefig switches to an Agg canvas for the "rgba" format, whatever the canvas of the figure
+    figure.savefig(buffer, format="rgba", dpi=dpi)
+    width, height = int(figure.get_figwidth() * dpi), int(figure.get_figheight() * dpi)
+    return np.frombuffer(buffer.getbuffer(), dtype=np.uint8).reshape(height, width, 4)
+
+
+@tracing.traced("export_image", category="io")
+def export_figure(figure, file_path, width, height, dpi, grayscale=False, render_dpi=None):
+    """
+    Saves the figure at exactly width x height pixels. Raster formats are rendered once
+    from the Agg buffer and encoded once, vector formats are written directly by matplotlib.
+
+    Args:
+        figure (matplotlib.figure.Figure): The figure to export.
+        file_path (str): Path of the image, its extension sets the format.
+        width (int): Width of the image in pixels.
+        height (int): Height of the image in pixels.
+        dpi (int): DPI written in the image (and used for the rasterized parts of vector formats).
+        grayscale (bool): Convert raster images to grayscale. Ignored by vector formats.
+        render_dpi (float): DPI the layout is computed at, the one of the screen by default,
+            so that the exported figure looks like the graph on screen at that size.
+    """
+    extension = file_path.rsplit(".", 1)[-1].lower()
+    if extension not in RASTER_FORMATS and extension not in VECTOR_FORMATS:
+        raise ValueError(f"Unsupported image format: {extension}")
+
+    render_dpi = render_dpi or figure.dpi
+    original_size = figure.get_size_inches()
+    subplot_params = {key: getattr(figure.subplotpars, key)
+                      for key in ["left", "right", "bottom", "top", "wspace", "hspace"]}
+
+    size_inches = (get_size_inches(width, render_dpi), get_size_inches(height, render_dpi))
+
+    try:
+        # Lay the figure out at the exported size, the canvas on screen keeps its own size
+        if not np.allclose(size_inches, original_size):
+            figure.set_size_inches(*size_inches, forward=False)
+            figure.tight_layout()
+
+        if extension in VECTOR_FORMATS:
+            # The physical size of the figure is kept, dpi only affects rasterized artists
+            figure.savefig(file_path, format=extension, dpi=dpi)
+            return
+
+        image_data = render_figure_to_buffer(figure, render_dpi)
+    finally:
+        figure.set_size_inches(original_size, forward=False)
+        figure.subplots_adjust(**subplot_params)
+
+    from PIL import Image
+
+    pil_format = RASTER_FORMATS[extension]
+    if grayscale:
+        image = Image.fromarray(rgba_to_grayscale(image_data), mode="L")
+    elif pil_format == "JPEG":
+        # JPEG has no alpha channel
+        image = Image.fromarray(np.ascontiguousarray(image_data[..., :3]), mode="RGB")
+    else:
+        image = Image.fromarray(image_data, mode="RGBA")
+
+    image.save(file_path, format=pil_format, dpi=(dpi, dpi))
@@ -0,0 +1,34 @@
+import json
+
+from src.classes.numpy_encoder import NumpyEncoder
+from src.func import tracing
+
+
+@tracing.traced(category="io")
+def save_to_json(file_path, data):
+    """
+    Saves curve or scatter data (.odc / .ods files) as JSON, converting numpy types.
+
+    Args:
+        file_path (str): Path of the file to write.
+        data (dict): Curve or scatter data, without the widget.
+    """
+    with open(file_path, 'w') as file:
+        json.dump(data, file, cls=NumpyEncoder)
+
+
+@tracing.traced(category="io")
+def load_from_json(file_path):
+    """
+    Loads curve or scatter data from an .odc / .ods file.
+
+    Args:
+        file_path (str): Path of the file to read.
+
+    Returns:
+        dict: The data stored in the file.
+    """
+    with open(file_path, 'r') as file:
+        data = json.load(file)
+
+    return data
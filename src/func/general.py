@@ -1,8 +1,6 @@
-import os
 import random
+import sys
 
-from PyQt5.QtGui import QDoubleValidator
-from matplotlib.font_manager import findSystemFonts
 import numpy as np
 
 
@@ -37,49 +35,42 @@ def format_frequency(value):
         return f"{value_mhz:.2f} MHz"
 
 
-def get_all_os_fonts():
+def get_data_size(data):
     """
-    Get all available fonts on the system.
-    """
-    common_fonts = {
-        "arial": "Arial",
-        "verdana": "Verdana",
-        "helvetica": "Helvetica",
-        "times": "Times New Roman",
-        "cour": "Courier New",
-        "georgia": "Georgia",
-        "trebuc": "Trebuchet MS",
-        "impact": "Impact",
-        "segoeui": "Segoe UI",
-    }
-
-    fonts = findSystemFonts(fontpaths=None, fontext="ttf")
-    font_names_list = []
-    for i in fonts:
-        font_name = os.path.splitext(os.path.basename(i))[0]
-        font_names_list.append(font_name.lower())
-
-    final_font_list = []
-    for font in common_fonts.keys():
-        if font in font_names_list:
-            final_font_list.append(common_fonts[font])
-
-    return final_font_list
+    Approximates the memory held by curve or scatter data, in bytes.
 
+    Args:
+        data: numpy array, list of numbers, or dict/list nesting them.
 
-def lock_entry_to_float(entry):
-    validator = QDoubleValidator()
-    validator.setNotation(
-        QDoubleValidator.ScientificNotation
-    )  # Standard floating-point notation
-    validator.setDecimals(10)  # Allows up to 6 decimal places (adjust as needed)
-    entry.setValidator(validator)
-    entry.setMaxLength(12)  # Limit the number of characters to 10
+    Returns:
+        int: The approximate size in bytes.
+    """
+    if isinstance(data, np.ndarray):
+        return data.nbytes
+    elif isinstance(data, dict):
+        return sum(get_data_size(value) for value in data.values())
+    elif isinstance(data, (list, tuple)):
+        if len(data) == 0:
+            return sys.getsizeof(data)
+        if isinstance(data[0], (dict, list, tuple, np.ndarray)):
+            return sys.getsizeof(data) + sum(get_data_size(value) for value in data)
+        # Lists of numbers are assumed homogeneous, the first item stands for all of them
+        return sys.getsizeof(data) + len(data) * sys.getsizeof(data[0])
+    return 0
+
+
+def format_size(size):
+    """
+    Converts a size in bytes into a string with the appropriate unit (B, kB, MB or GB).
 
+    Args:
+        size (int): The size in bytes.
 
-def lock_entry_to_int(entry, min_value=1, max_value=2000, max_length=4):
-    validator = QDoubleValidator()
-    validator.setRange(min_value, max_value)
-    validator.setDecimals(0)  # Disallow decimal points
-    entry.setValidator(validator)
-    entry.setMaxLength(max_length)  # Limit the number of characters to 10
+    Returns:
+        str: The formatted size string.
+    """
+    for unit in ["B", "kB", "MB"]:
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
@@ -1,19 +1,184 @@
+import contextlib
+import contextvars
 import math
 import numpy as np
 
+# Wavelength (um) of the travelling wave of twDEP, the period of the electrode array
+DEFAULT_WAVELENGTH = 100.0
+
+# Precision of the model engine: the real and complex types of the arithmetic on the frequency
+# arrays. float64 by default, float32 for screening sweeps and large populations, which halves
+# their memory and doubles the values per SIMD instruction, for errors below 1e-6 on the CM factor
+# (see benchmarks/check_accuracy.py). The geometry of the particles (radii, volume ratios,
+# depolarization factors) has no frequency axis, and is always calculated in float64.
+PRECISIONS = {"float64": (np.float64, np.complex128),
+              "float32": (np.float32, np.complex64)}
+DEFAULT_PRECISION = "float64"
+
+# The precision is local to the context of the evaluation: every thread (e.g. the zoom workers of
+# the graph) starts in the default precision, whatever the precision set in the other threads
+_precision = contextvars.ContextVar("precision", default=DEFAULT_PRECISION)
+
+
+def set_precision(precision):
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown precision: {precision}")
+    _precision.set(precision)
+
+
+def get_precision():
+    return _precision.get()
+
+
+@contextlib.contextmanager
+def precision_mode(precision):
+    # Evaluates a with-block in the given precision, e.g. a screening sweep in float32
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown precision: {precision}")
+    token = _precision.set(precision)
+    try:
+        yield
+    finally:
+        _precision.reset(token)
+
+
+def get_real_dtype():
+    return PRECISIONS[_precision.get()][0]
+
+
+def as_real(value):
+    # Array of the value in the real type of the precision
+    return np.asarray(value, dtype=PRECISIONS[_precision.get()][0])
+
 
 # General functions #
 def complex_perm(freq, relperm, cond):
-    # Ensure inputs are of a higher precision data type
-    relperm = np.array(relperm, dtype=np.float64)
-    cond = np.array(cond, dtype=np.float64)
-    freq = np.array(freq, dtype=np.float64)
+    # Inputs in the real type of the precision, the python constants keeping that type
+    relperm = as_real(relperm)
+    cond = as_real(cond)
+    freq = as_real(freq)
 
     # Perform calculation, explicitly using complex numbers
     result = (relperm * 8.854e-12) - 1j * cond / (freq * 2 * np.pi)
 
     # Ensure the result is of complex type to handle imaginary parts correctly
-    return np.array(result, dtype=np.complex128)
+    return np.asarray(result, dtype=PRECISIONS[_precision.get()][1])
+
+
+# Equivalent complex permittivity of a particle covered by one shell, of volume shell_volume_ratio
+# times the one of the particle: (R_out^3 - r^3) / r^3, i.e. the radius ratio cubed minus 1. The
+# classic form shell * (ratio + 2K) / (ratio - K), with K = (inner - shell) / (inner + 2 * shell),
+# is multiplied out by (inner + 2 * shell). Both forms are equal, but for thin membranes the ratio
+# and K are both close to 1, and ratio - K loses most of the digits of float32 to cancellation
+def shell_equivalent_complex_permittivity(complex_perm_inner, complex_perm_shell, shell_volume_ratio):
+    # Calculate the shell term, common to the numerator and the denominator
+    shell_term = shell_volume_ratio * (complex_perm_inner + 2 * complex_perm_shell)
+
+    # Calculate the numerator and denominator for the main fraction
+    numerator = 3 * complex_perm_inner + shell_term
+    denominator = 3 * complex_perm_shell + shell_term
+
+    return complex_perm_shell * (numerator / denominator)
+
+
+# Multi-shell model #
+# Particle composed of a core surrounded by any number of shells, e.g. membrane, nucleus
+# envelope or cell wall. The shells are smeared out one at a time, from the core outwards, each
+# step replacing the particle and its next shell by a homogenous particle of equivalent
+# complex permittivity. All parameters can be arrays broadcasting with freq.
+def multi_shell_equivalent_complex_permittivity(freq, core_radius, core_perm, core_cond, shells):
+    """
+    Equivalent complex permittivity of a core covered by a list of shells.
+
+    Args:
+        freq (np.array): Frequencies (Hz).
+        core_radius (float): Radius of the core (um).
+        core_perm (float): Relative permittivity of the core.
+        core_cond (float): Conductivity of the core (S/m).
+        shells (list): (thickness (nm), relative permittivity, conductivity (S/m)) of every
+            shell, from the innermost to the outermost. Empty for a homogenous particle.
+
+    Returns:
+        tuple: The equivalent complex permittivity and the outer radius of the particle (um).
+    """
+    equivalent_perm = complex_perm(freq, core_perm, core_cond)
+    radius = np.asarray(core_radius, dtype=np.float64)
+
+    for thickness, perm, cond in shells:
+        outer_radius = radius + 0.001 * np.asarray(thickness, dtype=np.float64)
+        equivalent_perm = shell_equivalent_complex_permittivity(equivalent_perm,
+                                                                complex_perm(freq, perm, cond),
+                                                                as_real((outer_radius / radius) ** 3 - 1))
+        radius = outer_radius
+
+    return equivalent_perm, as_real(radius)
+
+
+# Claussius-Mossotti Factor calculation from the complex permittivities of particle and buffer
+def CMfactor_complex(complex_perm_particle, complex_perm_buffer):
+    # Calculate the numerator and denominator for the main fraction
+    numerator = complex_perm_particle - complex_perm_buffer
+    denominator = complex_perm_particle + 2 * complex_perm_buffer
+
+    return numerator / denominator
+
+
+# DEP Force calculation from the real part of the CM factor
+def DEP_force(cm_factor_real, particle_radius, buffer_perm, field_grad):
+    # Calculate the buffer permittivity
+    buffer_perm_value = buffer_perm * 8.854 * 10 ** (-6)
+
+    # Calculate the final result
+    return 2.0 * math.pi * buffer_perm_value * particle_radius**3 * cm_factor_real * field_grad
+
+
+# Electrorotation torque and travelling-wave DEP force, from the imaginary part of the CM factor.
+# They share the prefactor and the field term of the DEP force, the wavelength of the travelling
+# wave being in um
+def ROT_torque(cm_factor_imag, particle_radius, buffer_perm, field):
+    return -2.0 * DEP_force(cm_factor_imag, particle_radius, buffer_perm, field)
+
+
+def twDEP_force(cm_factor_imag, particle_radius, buffer_perm, field, wavelength):
+    # A travelling wave has a positive wavelength, the force is NaN otherwise
+    wavelength = as_real(np.where(np.asarray(wavelength) > 0, wavelength, np.nan))
+    return math.pi / wavelength * ROT_torque(cm_factor_imag, particle_radius, buffer_perm, field)
+
+
+def get_spectra(cm_factor, particle_radius, buffer_perm, field, wavelength):
+    # All spectra derived from one complex CM factor, see spectra.SPECTRA
+    particle_radius, buffer_perm, field, wavelength = (as_real(value) for value in
+                                                       [particle_radius, buffer_perm, field, wavelength])
+    return {"recm": cm_factor.real,
+            "imcm": cm_factor.imag,
+            "depforce": DEP_force(cm_factor.real, particle_radius, buffer_perm, field),
+            "rot": ROT_torque(cm_factor.imag, particle_radius, buffer_perm, field),
+            "twdep": twDEP_force(cm_factor.imag, particle_radius, buffer_perm, field, wavelength)}
+
+
+def multi_shell_spectra(freq, field_grad, core_radius, core_perm, core_cond, shells, buffer_perm, buffer_cond,
+                        wavelength=DEFAULT_WAVELENGTH):
+    """
+    Re[CM], Im[CM], DEP force, ROT torque and twDEP force of a multi-shell particle, from a
+    single evaluation of its complex CM factor. See multi_shell_equivalent_complex_permittivity
+    for the parameters, the wavelength of the travelling wave is in um.
+
+    Returns:
+        dict: The "recm", "imcm", "depforce", "rot" and "twdep" arrays.
+    """
+    particle_perm, particle_radius = multi_shell_equivalent_complex_permittivity(
+        freq, core_radius, core_perm, core_cond, shells)
+    cm_factor = CMfactor_complex(particle_perm, complex_perm(freq, buffer_perm, buffer_cond))
+
+    return get_spectra(cm_factor, particle_radius, buffer_perm, field_grad, wavelength)
+
+
+def multi_shell_all(freq, field_grad, core_radius, core_perm, core_cond, shells, buffer_perm, buffer_cond):
+    """
+    Re[CM], Im[CM] and DEP force of a multi-shell particle, see multi_shell_spectra.
+    """
+    spectra = multi_shell_spectra(freq, field_grad, core_radius, core_perm, core_cond, shells, buffer_perm, buffer_cond)
+    return spectra["recm"], spectra["imcm"], spectra["depforce"]
 
 
 # Single-shell model #
@@ -28,30 +193,15 @@ def single_shell_equivalent_complex_permittivity(
     fitting_sish_cytoplasm_perm,
     fitting_sish_cytoplasm_cond,
 ):
-    # Calculate complex permittivity for membrane and cytoplasm
-    complex_perm_membrane = complex_perm(
-        freq, fitting_sish_membrane_perm, fitting_sish_membrane_cond
-    )
-    complex_perm_cytoplasm = complex_perm(
-        freq, fitting_sish_cytoplasm_perm, fitting_sish_cytoplasm_cond
-    )
-
-    # Calculate radius ratio
-    radius_ratio = fitting_sish_particle_radius / (
-        fitting_sish_particle_radius - 0.001 * fitting_sish_membrane_thickness
+    # The particle radius is the outer radius, the membrane is the only shell of the cytoplasm
+    equivalent_perm, _ = multi_shell_equivalent_complex_permittivity(
+        freq,
+        fitting_sish_particle_radius - 0.001 * fitting_sish_membrane_thickness,
+        fitting_sish_cytoplasm_perm,
+        fitting_sish_cytoplasm_cond,
+        [(fitting_sish_membrane_thickness, fitting_sish_membrane_perm, fitting_sish_membrane_cond)],
     )
-    radius_ratio_cubed = radius_ratio**3
-
-    # Calculate permittivity difference and sum
-    perm_diff = complex_perm_cytoplasm - complex_perm_membrane
-    perm_sum = complex_perm_cytoplasm + 2 * complex_perm_membrane
-
-    # Calculate the numerator and denominator for the main fraction
-    numerator = radius_ratio_cubed + 2 * (perm_diff / perm_sum)
-    denominator = radius_ratio_cubed - (perm_diff / perm_sum)
-
-    # Return the final result
-    return complex_perm_membrane * (numerator / denominator)
+    return equivalent_perm
 
 
 # Claussius-Mossotti Factor calculation
@@ -81,12 +231,8 @@ def single_shell_CMfactor_complex(
         freq, fitting_gen_buffer_perm, fitting_gen_buffer_cond
     )
 
-    # Calculate the numerator and denominator for the main fraction
-    numerator = ss_model_result - buffer_complex_perm
-    denominator = ss_model_result + 2 * buffer_complex_perm
-
     # Return the final result
-    return (numerator / denominator).real
+    return CMfactor_complex(ss_model_result, buffer_complex_perm)
 
 
 # Claussius-Mossotti Factor calculation - real part only
@@ -165,23 +311,8 @@ def single_shell_DEP_force(
         fitting_gen_buffer_cond,
     )
 
-    # Calculate the buffer permittivity
-    buffer_perm = fitting_gen_buffer_perm * 8.854 * 10 ** (-6)
-
-    # Calculate the particle radius cubed
-    particle_radius_cubed = fitting_sish_particle_radius**3
-
     # Calculate the final result
-    result = (
-        2.0
-        * math.pi
-        * buffer_perm
-        * particle_radius_cubed
-        * cm_factor_real
-        * fitting_gen_fieldgrad
-    )
-
-    return result
+    return DEP_force(cm_factor_real, fitting_sish_particle_radius, fitting_gen_buffer_perm, fitting_gen_fieldgrad)
 
 
 def single_shell_all(
@@ -196,43 +327,17 @@ def single_shell_all(
     fitting_gen_buffer_perm,
     fitting_gen_buffer_cond,
 ):
-    cm_factor_real = single_shell_CMfactor_real(
-        freq,
-        fitting_sish_particle_radius,
-        fitting_sish_membrane_thickness,
-        fitting_sish_membrane_perm,
-        fitting_sish_membrane_cond,
-        fitting_sish_cytoplasm_perm,
-        fitting_sish_cytoplasm_cond,
-        fitting_gen_buffer_perm,
-        fitting_gen_buffer_cond,
-    )
-
-    cm_factor_imag = single_shell_CMfactor_imag(
-        freq,
-        fitting_sish_particle_radius,
-        fitting_sish_membrane_thickness,
-        fitting_sish_membrane_perm,
-        fitting_sish_membrane_cond,
-        fitting_sish_cytoplasm_perm,
-        fitting_sish_cytoplasm_cond,
-        fitting_gen_buffer_perm,
-        fitting_gen_buffer_cond,
-    )
-
-    dep_force = single_shell_DEP_force(
+    # The particle radius is the outer radius, the membrane is the only shell of the cytoplasm
+    return multi_shell_all(
         freq,
         fitting_gen_fieldgrad,
-        fitting_sish_particle_radius,
-        fitting_sish_membrane_thickness,
-        fitting_sish_membrane_perm,
-        fitting_sish_membrane_cond,
+        fitting_sish_particle_radius - 0.001 * fitting_sish_membrane_thickness,
         fitting_sish_cytoplasm_perm,
         fitting_sish_cytoplasm_cond,
+        [(fitting_sish_membrane_thickness, fitting_sish_membrane_perm, fitting_sish_membrane_cond)],
         fitting_gen_buffer_perm,
         fitting_gen_buffer_cond,
     )
-    return cm_factor_real, cm_factor_imag, dep_force
 
 
 # Homogenous particle #
@@ -252,12 +357,8 @@ def homogenous_particle_CMfactor_complex(
         freq, fitting_gen_buffer_perm, fitting_gen_buffer_cond
     )
 
-    # Calculate the numerator and denominator for the main fraction
-    numerator = complex_perm_particle - complex_perm_buffer
-    denominator = complex_perm_particle + 2 * complex_perm_buffer
-
     # Return the final result
-    return numerator / denominator
+    return CMfactor_complex(complex_perm_particle, complex_perm_buffer)
 
 
 # Claussius-Mossotti Factor calculation - real part only
@@ -313,23 +414,8 @@ def homogenous_particle_DEP_force(
         fitting_gen_buffer_cond,
     )
 
-    # Calculate the buffer permittivity
-    buffer_perm = fitting_gen_buffer_perm * 8.854 * 10 ** (-6)
-
-    # Calculate the particle radius cubed
-    particle_radius_cubed = fitting_hopa_particle_radius**3
-
     # Calculate the final result
-    result = (
-        2.0
-        * math.pi
-        * buffer_perm
-        * particle_radius_cubed
-        * cm_factor_real
-        * fitting_gen_fieldgrad
-    )
-
-    return result
+    return DEP_force(cm_factor_real, fitting_hopa_particle_radius, fitting_gen_buffer_perm, fitting_gen_fieldgrad)
 
 
 def homogenous_particle_all(
@@ -341,49 +427,19 @@ def homogenous_particle_all(
     fitting_gen_buffer_perm,
     fitting_gen_buffer_cond,
 ):
-    cm_factor_real = homogenous_particle_CMfactor_real(
-        freq,
-        fitting_hopa_particle_perm,
-        fitting_hopa_particle_cond,
-        fitting_gen_buffer_perm,
-        fitting_gen_buffer_cond,
-    )
-
-    cm_factor_imag = homogenous_particle_CMfactor_imag(
-        freq,
-        fitting_hopa_particle_perm,
-        fitting_hopa_particle_cond,
-        fitting_gen_buffer_perm,
-        fitting_gen_buffer_cond,
-    )
-
-    dep_force = homogenous_particle_DEP_force(
+    return multi_shell_all(
         freq,
         fitting_gen_fieldgrad,
         fitting_hopa_particle_radius,
         fitting_hopa_particle_perm,
         fitting_hopa_particle_cond,
+        [],
         fitting_gen_buffer_perm,
         fitting_gen_buffer_cond,
     )
 
-    return cm_factor_real, cm_factor_imag, dep_force
-
 
 # Two-shell model #
-def complex_perm(freq, relperm, cond):
-    # Ensure inputs are of a higher precision data type
-    relperm = np.array(relperm, dtype=np.float64)
-    cond = np.array(cond, dtype=np.float64)
-    freq = np.array(freq, dtype=np.float64)
-
-    # Perform calculation, explicitly using complex numbers
-    result = (relperm * 8.854e-12) - 1j * cond / (freq * 2 * np.pi)
-
-    # Ensure the result is of complex type to handle imaginary parts correctly
-    return np.array(result, dtype=np.complex128)
-
-
 # Two-Shell Models composed of a core, inner shell, and outer shell
 # Calculate the equivalent complex permittivity for a two-shell model
 def two_shell_equivalent_complex_permittivity(
@@ -398,40 +454,16 @@ def two_shell_equivalent_complex_permittivity(
     outer_shell_perm,
     outer_shell_cond,
 ):
-    # Calculate complex permittivity for core, inner shell, and outer shell
-    complex_perm_core = complex_perm(freq, core_perm, core_cond)
-    complex_perm_inner_shell = complex_perm(freq, inner_shell_perm, inner_shell_cond)
-    complex_perm_outer_shell = complex_perm(freq, outer_shell_perm, outer_shell_cond)
-
-    # Calculate radius ratios
-    inner_radius = core_radius + 0.001 * inner_shell_thickness
-    outer_radius = inner_radius + 0.001 * outer_shell_thickness
-
-    radius_ratio_inner = inner_radius / core_radius
-    radius_ratio_outer = outer_radius / inner_radius
-
-    # Calculate complex permittivity differences and sums
-    perm_diff_inner = complex_perm_core - complex_perm_inner_shell
-    perm_sum_inner = complex_perm_core + 2 * complex_perm_inner_shell
-
-    perm_diff_outer = complex_perm_inner_shell - complex_perm_outer_shell
-    perm_sum_outer = complex_perm_inner_shell + 2 * complex_perm_outer_shell
-
-    # Calculate the numerator and denominator for the main fraction
-    numerator_inner = radius_ratio_inner**3 + 2 * (perm_diff_inner / perm_sum_inner)
-    denominator_inner = radius_ratio_inner**3 - (perm_diff_inner / perm_sum_inner)
-
-    numerator_outer = radius_ratio_outer**3 + 2 * (perm_diff_outer / perm_sum_outer)
-    denominator_outer = radius_ratio_outer**3 - (perm_diff_outer / perm_sum_outer)
-
-    # Calculate equivalent permittivity for inner shell
-    equiv_perm_inner = complex_perm_inner_shell * (numerator_inner / denominator_inner)
-
-    # Calculate equivalent permittivity for outer shell
-    numerator_combined = numerator_outer * equiv_perm_inner
-    denominator_combined = denominator_outer * complex_perm_outer_shell
-
-    return complex_perm_outer_shell * (numerator_combined / denominator_combined)
+    # The inner shell is smeared into the core first, then the outer shell into the result
+    equivalent_perm, _ = multi_shell_equivalent_complex_permittivity(
+        freq,
+        core_radius,
+        core_perm,
+        core_cond,
+        [(inner_shell_thickness, inner_shell_perm, inner_shell_cond),
+         (outer_shell_thickness, outer_shell_perm, outer_shell_cond)],
+    )
+    return equivalent_perm
 
 
 # Claussius-Mossotti Factor calculation for two-shell model
@@ -465,12 +497,8 @@ def two_shell_CMfactor_complex(
 
     buffer_complex_perm = complex_perm(freq, buffer_perm, buffer_cond)
 
-    # Calculate the numerator and denominator for the main fraction
-    numerator = ts_model_result - buffer_complex_perm
-    denominator = ts_model_result + 2 * buffer_complex_perm
-
     # Return the final result
-    return (numerator / denominator).real
+    return CMfactor_complex(ts_model_result, buffer_complex_perm)
 
 
 # Claussius-Mossotti Factor calculation - real part only for two-shell model
@@ -567,24 +595,9 @@ def two_shell_DEP_force(
         buffer_cond,
     )
 
-    # Calculate the buffer permittivity
-    buffer_perm_value = buffer_perm * 8.854 * 10 ** (-6)
-
-    # Calculate the particle radius cubed
-    outer_radius = core_radius + 0.001 * (inner_shell_thickness + outer_shell_thickness)
-    particle_radius_cubed = outer_radius**3
-
     # Calculate the final result
-    result = (
-        2.0
-        * math.pi
-        * buffer_perm_value
-        * particle_radius_cubed
-        * cm_factor_real
-        * field_grad
-    )
-
-    return result
+    outer_radius = core_radius + 0.001 * (inner_shell_thickness + outer_shell_thickness)
+    return DEP_force(cm_factor_real, outer_radius, buffer_perm, field_grad)
 
 
 def two_shell_all(
@@ -602,50 +615,172 @@ def two_shell_all(
     buffer_perm,
     buffer_cond,
 ):
-    cm_factor_real = two_shell_CMfactor_real(
+    return multi_shell_all(
         freq,
+        field_grad,
         core_radius,
-        inner_shell_thickness,
-        outer_shell_thickness,
         core_perm,
         core_cond,
-        inner_shell_perm,
-        inner_shell_cond,
-        outer_shell_perm,
-        outer_shell_cond,
+        [(inner_shell_thickness, inner_shell_perm, inner_shell_cond),
+         (outer_shell_thickness, outer_shell_perm, outer_shell_cond)],
         buffer_perm,
         buffer_cond,
     )
 
-    cm_factor_imag = two_shell_CMfactor_imag(
-        freq,
-        core_radius,
-        inner_shell_thickness,
-        outer_shell_thickness,
-        core_perm,
-        core_cond,
-        inner_shell_perm,
-        inner_shell_cond,
-        outer_shell_perm,
-        outer_shell_cond,
-        buffer_perm,
-        buffer_cond,
-    )
 
-    dep_force = two_shell_DEP_force(
-        freq,
-        field_grad,
-        core_radius,
-        inner_shell_thickness,
-        outer_shell_thickness,
-        core_perm,
-        core_cond,
-        inner_shell_perm,
-        inner_shell_cond,
-        outer_shell_perm,
-        outer_shell_cond,
-        buffer_perm,
-        buffer_cond,
-    )
+# Ellipsoidal models #
+# Rod- and disc-shaped particles, e.g. bacteria and red blood cells, as ellipsoids of semi-axes
+# (a, b, c). The particle polarizes differently along each axis, through the depolarization
+# factor of the axis, so every quantity has one value per axis. The three axes are evaluated
+# together, as the first dimension of the arrays: (3,) + the shape of the sphere results.
+# Shells are taken of uniform thickness, which holds for shells thin compared to the axes.
+# Carlson symmetric elliptic integral R_D(x, y, z), by the duplication theorem
+def carlson_rd(x, y, z):
+    x, y, z = (np.array(value, dtype=np.float64) for value in np.broadcast_arrays(x, y, z))
+    total = np.zeros_like(x)
+    factor = 1.0
+
+    # Every duplication divides the spread of x, y and z by 4, the series below is exact to
+    # double precision once the spread is below 0.1 %
+    for _ in range(50):
+        mean = (x + y + 3 * z) / 5
+        if np.all(np.maximum.reduce([np.abs(mean - x), np.abs(mean - y), np.abs(mean - z)]) <= 1e-3 * mean):
+            break
+        sqrt_x, sqrt_y, sqrt_z = np.sqrt(x), np.sqrt(y), np.sqrt(z)
+        lambda_ = sqrt_x * sqrt_y + sqrt_x * sqrt_z + sqrt_y * sqrt_z
+        total += factor / (sqrt_z * (z + lambda_))
+        factor /= 4
+        x, y, z = (x + lambda_) / 4, (y + lambda_) / 4, (z + lambda_) / 4
+
+    mean = (x + y + 3 * z) / 5
+    dx, dy = (mean - x) / mean, (mean - y) / mean
+    dz = -(dx + dy) / 3
+    e2 = dx * dy - 6 * dz ** 2
+    e3 = (3 * dx * dy - 8 * dz ** 2) * dz
+    e4 = 3 * (dx * dy - dz ** 2) * dz ** 2
+    e5 = dx * dy * dz ** 3
+    series = (1 - 3 * e2 / 14 + e3 / 6 + 9 * e2 ** 2 / 88 - 3 * e4 / 22 - 9 * e2 * e3 / 52 + 3 * e5 / 26)
+    return 3 * total + factor * series / (mean * np.sqrt(mean))
+
+
+def depolarization_factors(semi_axes):
+    """
+    Depolarization factors of ellipsoids along their three axes, 1/3 each for a sphere.
+
+    Args:
+        semi_axes (np.array): Semi-axes (a, b, c) of shape (3, ...), any unit.
+
+    Returns:
+        np.array: The factors, of the same shape, summing to 1 over the first axis.
+    """
+    semi_axes = np.asarray(semi_axes, dtype=np.float64)
+    squared = semi_axes ** 2
+    volume = np.prod(semi_axes, axis=0)
+
+    # L_a = abc / 3 * R_D(b^2, c^2, a^2), and the same for the other axes, all in one call
+    return volume / 3 * carlson_rd(np.roll(squared, -1, axis=0), np.roll(squared, -2, axis=0), squared)
+
+
+def spheroid_semi_axes(radius, aspect_ratio):
+    # Spheroid of symmetry axis aspect_ratio * radius, first, and two axes of the radius:
+    # rods for an aspect ratio above 1, discs below 1
+    radius, aspect_ratio = np.broadcast_arrays(np.asarray(radius, dtype=np.float64),
+                                               np.asarray(aspect_ratio, dtype=np.float64))
+    return np.stack([radius * aspect_ratio, radius, radius])
+
+
+def expand_axes(axes_array, ndim):
+    # (3,) + shape -> (3,) + ones + shape, to broadcast against the arrays of ndim dimensions
+    padding = max(ndim - (axes_array.ndim - 1), 0)
+    return axes_array.reshape((3,) + (1,) * padding + axes_array.shape[1:])
+
+
+# Equivalent complex permittivity of an ellipsoid covered by one shell, along each axis
+def ellipsoid_shell_equivalent_complex_permittivity(complex_perm_inner, complex_perm_shell,
+                                                    inner_factors, outer_factors, volume_ratio):
+    # Calculate the geometric weights of the inner permittivity first, in the precision of the
+    # geometry: for thin shells the volume ratio is close to 1 and the factors of both surfaces
+    # close to each other. The classic form shell + (inner - shell) * weight is written as the
+    # weighted sum inner * weight + shell * (1 - weight), of weights between 0 and 1, which keeps
+    # the digits of float32 where the form with the difference cancels out
+    numerator_weights = inner_factors + volume_ratio * (1 - outer_factors)
+    denominator_weights = inner_factors - volume_ratio * outer_factors
 
-    return cm_factor_real, cm_factor_imag, dep_force
+    # Calculate the numerator and denominator for the main fraction
+    numerator = complex_perm_inner * as_real(numerator_weights) + complex_perm_shell * as_real(1 - numerator_weights)
+    denominator = (complex_perm_inner * as_real(denominator_weights) +
+                   complex_perm_shell * as_real(1 - denominator_weights))
+
+    return complex_perm_shell * (numerator / denominator)
+
+
+def ellipsoid_multi_shell_equivalent_complex_permittivity(freq, core_semi_axes, core_perm, core_cond, shells):
+    """
+    Equivalent complex permittivity of an ellipsoidal core covered by a list of shells, along
+    each axis. Same as multi_shell_equivalent_complex_permittivity, with the semi-axes of
+    the core (um) of shape (3, ...) instead of its radius.
+
+    Returns:
+        tuple: The equivalent complex permittivity along each axis, the outer semi-axes of the
+            particle (um) and their depolarization factors, all with the axes first.
+    """
+    parameters = [freq, core_perm, core_cond] + [value for shell in shells for value in shell]
+    ndim = max([np.ndim(value) for value in parameters] + [np.ndim(core_semi_axes) - 1])
+
+    semi_axes = expand_axes(np.asarray(core_semi_axes, dtype=np.float64), ndim)
+    factors = depolarization_factors(semi_axes)
+    equivalent_perm = complex_perm(freq, core_perm, core_cond)
+
+    for thickness, perm, cond in shells:
+        outer_semi_axes = semi_axes + 0.001 * np.asarray(thickness, dtype=np.float64)
+        outer_factors = depolarization_factors(outer_semi_axes)
+        volume_ratio = np.prod(semi_axes, axis=0) / np.prod(outer_semi_axes, axis=0)
+        equivalent_perm = ellipsoid_shell_equivalent_complex_permittivity(equivalent_perm,
+                                                                          complex_perm(freq, perm, cond),
+                                                                          factors, outer_factors, volume_ratio)
+        semi_axes, factors = outer_semi_axes, outer_factors
+
+    return equivalent_perm, semi_axes, factors
+
+
+# Claussius-Mossotti Factor calculation of an ellipsoid along each axis, equal to the one of a
+# sphere for a depolarization factor of 1/3
+def ellipsoid_CMfactor_complex(complex_perm_particle, complex_perm_buffer, factors):
+    perm_diff = complex_perm_particle - complex_perm_buffer
+    return perm_diff / (3 * (complex_perm_buffer + perm_diff * factors))
+
+
+def ellipsoid_multi_shell_spectra(freq, field_grad, core_semi_axes, core_perm, core_cond, shells, buffer_perm,
+                                  buffer_cond, wavelength=DEFAULT_WAVELENGTH):
+    """
+    Spectra of an ellipsoidal multi-shell particle aligned with the field along each of its
+    axes, from a single evaluation of its complex CM factors. See multi_shell_spectra and
+    ellipsoid_multi_shell_equivalent_complex_permittivity for the parameters.
+
+    Returns:
+        dict: The "recm", "imcm", "depforce", "rot" and "twdep" arrays, of shape (3,) + the
+            shape of the sphere results, one row per axis.
+    """
+    # The axes go in front of the dimensions of all the parameters, the buffer ones included
+    parameters = [freq, field_grad, core_perm, core_cond, buffer_perm, buffer_cond, wavelength]
+    ndim = max(np.ndim(value) for value in parameters + [value for shell in shells for value in shell])
+    core_semi_axes = expand_axes(np.asarray(core_semi_axes, dtype=np.float64), ndim)
+
+    particle_perm, semi_axes, factors = ellipsoid_multi_shell_equivalent_complex_permittivity(
+        freq, core_semi_axes, core_perm, core_cond, shells)
+    cm_factor = ellipsoid_CMfactor_complex(particle_perm, complex_perm(freq, buffer_perm, buffer_cond),
+                                           as_real(factors))
+
+    # The volume of the ellipsoid takes the place of the radius cubed of the sphere
+    equivalent_radius = np.cbrt(np.prod(semi_axes, axis=0))
+    return get_spectra(cm_factor, equivalent_radius, buffer_perm, field_grad, wavelength)
+
+
+def ellipsoid_multi_shell_all(freq, field_grad, core_semi_axes, core_perm, core_cond, shells, buffer_perm, buffer_cond):
+    """
+    Re[CM], Im[CM] and DEP force of an ellipsoidal multi-shell particle along each of its axes,
+    see ellipsoid_multi_shell_spectra.
+    """
+    spectra = ellipsoid_multi_shell_spectra(freq, field_grad, core_semi_axes, core_perm, core_cond, shells,
+                                            buffer_perm, buffer_cond)
+    return spectra["recm"], spectra["imcm"], spectra["depforce"]
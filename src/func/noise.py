@@ -1,5 +1,4 @@
 import numpy as np
-import colorednoise as cn
 
 
 def generate_awgn(signal, std_dev=0.05):
@@ -38,6 +37,9 @@ def generate_pink_noise(signal, std_dev=0.05):
     Returns:
     - np.array: Signal with added pink noise.
     """
+    # colorednoise is only needed for pink noise, import it on first use
+    import colorednoise as cn
+
     noise = cn.powerlaw_psd_gaussian(1, len(signal)) * std_dev
     return signal + noise
 
@@ -0,0 +1,483 @@
+from functools import lru_cache
+
+import copy
+
+import numpy as np
+
+# Plotting of the curves and scatters on matplotlib axes, shared by the graph of the main
+# window and the headless batch renderer. Nothing here depends on Qt or pyplot, and matplotlib
+# is only imported by the functions drawing on the axes, so that the constants can be imported
+# headless.
+
+Y_LABELS = [
+    "Re[CM(f)]",
+    "DEP force (pN)",
+    "Im[CM(f)]",
+    "Cross-over frequency (Hz)",
+    "ROT torque (a.u.)",
+    "twDEP force (a.u.)",
+    "Suspension permittivity",
+    "Suspension conductivity (S/m)",
+    "Suspension impedance (Ω)",
+]
+# Spectrum of the curves drawn for every y label, see spectra.SPECTRA
+Y_SPECTRA = ["recm", "depforce", "imcm", None, "rot", "twdep", "permittivity", "conductivity", "impedance"]
+# The cross-over graph has the conductivity of the medium on the x axis and log-scaled frequencies
+# on the y axis, see crossover.solve_cross_overs
+CROSS_OVER_INDEX = 3
+X_LABELS = ["Frequency (Hz)"] * 3 + ["Medium conductivity (S/m)"] + ["Frequency (Hz)"] * 5
+# Graphs of log-scaled y values: the cross-overs, and the suspension permittivity and impedance
+# that span decades over the dispersions
+LOG_Y_INDICES = [CROSS_OVER_INDEX, 6, 8]
+
+# Scatters with more points than this are rasterized in vector exports (svg, pdf), where
+# thousands of markers and error bars would otherwise make huge and slow files
+RASTERIZE_POINTS = 5000
+
+
+@lru_cache(maxsize=64)
+def get_font_properties(family, style, weight, size):
+    from matplotlib.font_manager import FontProperties
+
+    # Font lookups are slow, the same few fonts are requested for every figure
+    return FontProperties(family=family, style=style, weight=weight, size=size)
+
+
+def setup_axes(axes):
+    from matplotlib.ticker import StrMethodFormatter, LogFormatterMathtext
+
+    axes.set_xlabel("Frequency (Hz)", labelpad=5)
+    axes.set_xscale("log")
+    axes.set_ylabel("CM factor", labelpad=5)
+    axes.tick_params(labelsize="small")
+    # The tick labels always come from the formatters, never from fixed labels
+    axes.xaxis.set_major_formatter(LogFormatterMathtext())
+    axes.yaxis.set_major_formatter(StrMethodFormatter("{x:,.3f}"))
+
+
+def plot_curve(axes, name, color, x_data, y_data, line_width=1.5, line_style="-"):
+    line, = axes.plot(
+        x_data,
+        y_data,
+        label=name,
+        color=color,
+        linewidth=line_width,
+        linestyle=line_style,
+    )
+    return line
+
+
+def get_error_bar_vertices(x_data, y_min, y_max):
+    """
+    Vertices of all error bars as a single polyline, the bars being separated by NaNs.
+
+    Returns:
+        np.ndarray: Array of shape (3 * no_points, 2).
+    """
+    vertices = np.full((len(x_data), 3, 2), np.nan)
+    vertices[:, 0, 0] = vertices[:, 1, 0] = x_data
+    vertices[:, 0, 1] = y_min
+    vertices[:, 1, 1] = y_max
+    return vertices.reshape(-1, 2)
+
+
+def get_error_cap_data(x_data, y_min, y_max):
+    return np.concatenate((x_data, x_data)), np.concatenate((y_min, y_max))
+
+
+def get_band_vertices(x_data, y_min, y_max):
+    # Polygon of the band: along the lower edge, then back along the upper edge
+    return np.concatenate((np.column_stack((x_data, y_min)), np.column_stack((x_data, y_max))[::-1]))
+
+
+def plot_scatter(axes, name, color, x_data, y_data, y_errors, point_style="o", point_size=5, scatter_style="area",
+                 rasterized=None):
+    """
+    Plots a scatter with its errors, as points with error bars or as a band.
+
+    Args:
+        rasterized (bool): Rasterize the artists in vector exports. By default, when the scatter
+            has more than RASTERIZE_POINTS points.
+
+    Returns:
+        list: The artists of the scatter, that set_scatter_data can update.
+    """
+    from matplotlib.collections import LineCollection
+    from matplotlib.lines import Line2D
+
+    x_data, y_data, y_errors = np.asarray(x_data), np.asarray(y_data), np.asarray(y_errors)
+    y_min, y_max = y_data - y_errors, y_data + y_errors
+    if rasterized is None:
+        rasterized = len(x_data) > RASTERIZE_POINTS
+
+    if scatter_style == "scatter":
+        points = axes.scatter(
+            x_data,
+            y_data,
+            label=name,
+            color=color,
+            zorder=2,
+            s=point_size,
+            marker=point_style,
+            rasterized=rasterized,
+        )
+        # Error bars under the scatter points: all the bars in one collection, all the caps in one line,
+        # instead of the artist per bar and cap of Axes.errorbar
+        error_bars = LineCollection(
+            [get_error_bar_vertices(x_data, y_min, y_max)],
+            colors="grey",
+            linewidths=0.5,
+            zorder=1,
+            rasterized=rasterized,
+        )
+        # The data limits are given by the caps, the limits of a collection are wrong on the log axis
+        axes.add_collection(error_bars, autolim=False)
+        error_caps = Line2D(
+            *get_error_cap_data(x_data, y_min, y_max),
+            linestyle="none",
+            marker="_",
+            markersize=4,
+            markeredgewidth=0.5,
+            color="grey",
+            zorder=1,
+            rasterized=rasterized,
+        )
+        axes.add_line(error_caps)
+        return [points, error_bars, error_caps]
+
+    elif scatter_style == "area":
+        area = axes.fill_between(
+            x_data, y_min, y_max, color=color, alpha=0.3, label=name, rasterized=rasterized
+        )
+        return [area]
+
+    return []
+
+
+def set_curve_data(line, x_data, y_data):
+    line.set_data(x_data, y_data)
+
+
+def set_scatter_data(artists, x_data, y_data, y_errors, scatter_style="area"):
+    """
+    Replaces the data of the artists returned by plot_scatter, without creating new artists.
+    """
+    x_data, y_data, y_errors = np.asarray(x_data), np.asarray(y_data), np.asarray(y_errors)
+    y_min, y_max = y_data - y_errors, y_data + y_errors
+
+    if scatter_style == "scatter":
+        points, error_bars, error_caps = artists
+        points.set_offsets(np.column_stack((x_data, y_data)))
+        error_bars.set_segments([get_error_bar_vertices(x_data, y_min, y_max)])
+        error_caps.set_data(*get_error_cap_data(x_data, y_min, y_max))
+
+    elif scatter_style == "area":
+        area, = artists
+        area.set_verts([get_band_vertices(x_data, y_min, y_max)])
+
+
+def get_value_norm(values):
+    from matplotlib.colors import LogNorm, Normalize
+
+    # Log color scale for positive values spanning decades, e.g. conductivities. Two decades
+    # computed from rounded limits can fall just short of 100
+    values = np.asarray(values, dtype=np.float64)
+    values = values[np.isfinite(values)]
+    if values.size and values.min() > 0 and values.max() / values.min() >= 100 * (1 - 1e-9):
+        return LogNorm(vmin=values.min(), vmax=values.max())
+    return Normalize(vmin=values.min() if values.size else None, vmax=values.max() if values.size else None)
+
+
+def plot_curve_family(axes, x_data, y_data, values, name, colormap="viridis", line_width=1.0):
+    """
+    Plots the curves of a 1-D parameter sweep (see sweep.sweep_model) as a single collection,
+    colored by the swept value, with a colorbar.
+
+    Args:
+        x_data (np.ndarray): Frequencies shared by the curves.
+        y_data (np.ndarray): Spectra of shape (no_curves, no_frequencies).
+        values (np.ndarray): Swept value of every curve.
+        name (str): Label of the colorbar, e.g. the swept parameter.
+
+    Returns:
+        tuple: The LineCollection and its colorbar.
+    """
+    from matplotlib.collections import LineCollection
+
+    x_data, y_data = np.broadcast_arrays(np.asarray(x_data, dtype=np.float64), np.asarray(y_data, dtype=np.float64))
+    family = LineCollection(np.stack((x_data, y_data), axis=-1),
+                            cmap=colormap,
+                            norm=get_value_norm(values),
+                            linewidths=line_width)
+    family.set_array(np.asarray(values, dtype=np.float64))
+
+    # Same as for the error bars, the limits of a collection are wrong on the log axis
+    axes.add_collection(family, autolim=False)
+    axes.update_datalim([[np.nanmin(x_data), np.nanmin(y_data)], [np.nanmax(x_data), np.nanmax(y_data)]])
+    axes.autoscale_view()
+
+    colorbar = axes.figure.colorbar(family, ax=axes, label=name)
+    return family, colorbar
+
+
+def plot_ensemble(axes, name, color, x_data, mean, percentiles, line_width=1.5, line_style="-"):
+    """
+    Plots the population mean of an ensemble (see ensemble.ensemble_model) as a curve, over
+    its percentile bands, the outer percentiles lighter than the inner ones.
+
+    Args:
+        x_data (np.ndarray): Frequencies.
+        mean (np.ndarray): Population mean at every frequency.
+        percentiles (np.ndarray): Percentiles of shape (no_percentiles, no_frequencies), in
+            increasing order. The first and last rows bound the outer band, and so on inwards.
+
+    Returns:
+        tuple: The line of the mean and the list of bands.
+    """
+    percentiles = np.asarray(percentiles, dtype=np.float64)
+    no_bands = len(percentiles) // 2
+
+    bands = []
+    for index in range(no_bands):
+        bands.append(axes.fill_between(x_data, percentiles[index], percentiles[-index - 1],
+                                       color=color,
+                                       alpha=0.15 * (index + 1),
+                                       linewidth=0))
+
+    line = plot_curve(axes, name, color, x_data, mean, line_width=line_width, line_style=line_style)
+    return line, bands
+
+
+def plot_cross_over_map(axes, x_values, y_values, cross_overs, x_name, y_name, colormap="viridis"):
+    """
+    Plots the cross-over frequencies of a 2-D parameter sweep as a heatmap, with a colorbar.
+    The values without cross-over (NaN) are left blank.
+
+    Args:
+        x_values (np.ndarray): Values of the first swept parameter.
+        y_values (np.ndarray): Values of the second swept parameter.
+        cross_overs (np.ndarray): Cross-over frequencies of shape (len(x_values), len(y_values)).
+        x_name (str): Label of the x axis.
+        y_name (str): Label of the y axis.
+
+    Returns:
+        tuple: The QuadMesh and its colorbar.
+    """
+    from matplotlib.colors import LogNorm
+
+    cross_overs = np.ma.masked_invalid(np.asarray(cross_overs, dtype=np.float64))
+    mesh = axes.pcolormesh(x_values, y_values, cross_overs.T,
+                           shading="nearest",
+                           cmap=colormap,
+                           norm=LogNorm() if cross_overs.count() else None)
+
+    for values, set_scale in [(x_values, axes.set_xscale), (y_values, axes.set_yscale)]:
+        set_scale("log" if isinstance(get_value_norm(values), LogNorm) else "linear")
+    axes.set_xlabel(x_name)
+    axes.set_ylabel(y_name)
+
+    colorbar = axes.figure.colorbar(mesh, ax=axes, label="Cross-over frequency (Hz)")
+    return mesh, colorbar
+
+
+def get_style_sections(y_index, style_params):
+    # The style of the axes split in parts applied independently, see format_axes
+    font_family = style_params["font_family"]
+    return {"labels": (y_index, font_family, style_params["axis_style"]),
+            "ticks": (font_family, style_params["tick_style"]),
+            "grid": style_params["grid_style"],
+            "legend": (font_family, style_params["legend_style"]),
+            "frame": style_params["frame_style"]}
+
+
+def format_axes(axes, y_index=0, style_params=None, applied_style=None):
+    """
+    Applies the style of the graph to the axes. Only the parts of the style that differ from
+    applied_style are applied again, and the layout is only computed when something changed.
+
+    Args:
+        axes (matplotlib.axes.Axes): Axes prepared by setup_axes.
+        y_index (int): Index of the y label in Y_LABELS, CROSS_OVER_INDEX for the cross-over graph.
+        style_params (dict): The style, see MainUI.get_graph_styling.
+        applied_style (dict): The value returned by the previous call on the same axes. A part
+            removed from it is applied again, e.g. the legend once the plotted data changed.
+
+    Returns:
+        dict: The style now applied, to pass to the next call.
+    """
+    applied_style = applied_style or {}
+    style = get_style_sections(y_index, style_params)
+    changed = [key for key, value in style.items() if applied_style.get(key) != value]
+
+    if "labels" in changed:
+        format_labels(axes, y_index, style_params["font_family"], style_params["axis_style"])
+    # The ticks of a new scale are styled again
+    if "ticks" in changed or "labels" in changed:
+        format_ticks(axes, style_params["font_family"], style_params["tick_style"])
+    if "grid" in changed:
+        format_grid(axes, style_params["grid_style"])
+    if "legend" in changed:
+        format_legend(axes, style_params["font_family"], style_params["legend_style"])
+    if "frame" in changed:
+        format_frame(axes, style_params["frame_style"])
+
+    # Set tight layout
+    if changed:
+        axes.figure.tight_layout()
+
+    return copy.deepcopy(style)
+
+
+def format_labels(axes, y_index, font_family, axis_style):
+    from matplotlib.ticker import StrMethodFormatter, LogFormatterMathtext
+
+    # Scale of the y axis, the formatter is reset with the scale
+    if y_index in LOG_Y_INDICES:
+        axes.set_yscale("log")
+        axes.yaxis.set_major_formatter(LogFormatterMathtext())
+    else:
+        axes.set_yscale("linear")
+        axes.yaxis.set_major_formatter(StrMethodFormatter("{x:,.3f}"))
+
+    # Axis titles formating
+    axes.set_xlabel(
+        X_LABELS[y_index],
+        fontname=font_family,
+        labelpad=axis_style["labelpad"],
+        fontsize=axis_style["fontsize"],
+        fontweight=axis_style["fontweight"],
+        fontstyle=axis_style["fontstyle"],
+        color=axis_style["color"],
+    )
+
+    axes.set_ylabel(
+        Y_LABELS[y_index],
+        fontname=font_family,
+        labelpad=axis_style["labelpad"],
+        fontsize=axis_style["fontsize"],
+        fontweight=axis_style["fontweight"],
+        fontstyle=axis_style["fontstyle"],
+        color=axis_style["color"],
+    )
+
+
+def format_ticks(axes, font_family, tick_style):
+    # Tick labels formating, on the labels of the existing ticks: the ticks created later
+    # (when zooming) copy the properties of the first tick of their axis
+    font_props = get_font_properties(
+        font_family,
+        tick_style["fontstyle"],
+        tick_style["fontweight"],
+        tick_style["fontsize"],
+    )
+    for axis in [axes.xaxis, axes.yaxis]:
+        for tick in axis.get_major_ticks() + axis.get_minor_ticks():
+            tick.label1.set_fontproperties(font_props)
+            tick.label1.set_color(tick_style["color"])
+
+    # Tick formating
+    if tick_style["majortickvisibility"]:
+        axes.tick_params(
+            which="major",
+            pad=tick_style["labelpad"],
+            direction=tick_style["majortickdirection"],
+            length=tick_style["majorticklength"],
+            width=tick_style["majortickwidth"],
+        )
+    else:
+        axes.tick_params(which="major", length=0, width=0)
+
+    if tick_style["minortickvisibility"]:
+        axes.tick_params(
+            which="minor",
+            direction=tick_style["minortickdirection"],
+            length=tick_style["minorticklength"],
+            width=tick_style["minortickwidth"],
+        )
+    else:
+        axes.tick_params(which="minor", length=0, width=0)
+
+
+def format_grid(axes, grid_style):
+    # Grid formating
+    if grid_style["hgridvisibility"]:
+        axes.grid(True, axis="x")
+        axes.grid(
+            axis="x",
+            color="black",
+            linestyle=grid_style["hgridlinestyle"],
+            linewidth=grid_style["hgridlinewidth"],
+            alpha=grid_style["hgridalpha"],
+            zorder=0,
+        )
+    else:
+        axes.grid(False, axis="x")
+
+    if grid_style["vgridvisibility"]:
+        axes.grid(True, axis="y")
+        axes.grid(
+            axis="y",
+            color="black",
+            linestyle=grid_style["vgridlinestyle"],
+            linewidth=grid_style["vgridlinewidth"],
+            alpha=grid_style["vgridalpha"],
+            zorder=0,
+        )
+    else:
+        axes.grid(False, axis="y")
+
+
+def format_legend(axes, font_family, legend_style):
+    # Legend formating
+    font_props = get_font_properties(
+        font_family,
+        legend_style["fontstyle"],
+        legend_style["fontweight"],
+        legend_style["fontsize"],
+    )
+
+    handles, labels = axes.get_legend_handles_labels()
+    if legend_style["visibility"] and handles:
+        axes.legend(
+            handles,
+            labels,
+            prop=font_props,
+            loc=legend_style["position"],
+        )
+    elif axes.get_legend() is not None:
+        axes.get_legend().remove()
+
+
+def format_frame(axes, frame_style):
+    # Figure frame formating
+    if frame_style["topvisbility"]:
+        axes.spines["top"].set_visible(True)
+        axes.spines["top"].set_linewidth(
+            frame_style["linewidth"]
+        )
+    else:
+        axes.spines["top"].set_visible(False)
+
+    if frame_style["rightvisbility"]:
+        axes.spines["right"].set_visible(True)
+        axes.spines["right"].set_linewidth(
+            frame_style["linewidth"]
+        )
+    else:
+        axes.spines["right"].set_visible(False)
+
+    if frame_style["bottomvisbility"]:
+        axes.spines["bottom"].set_visible(True)
+        axes.spines["bottom"].set_linewidth(
+            frame_style["linewidth"]
+        )
+    else:
+        axes.spines["bottom"].set_visible(False)
+
+    if frame_style["leftvisbility"]:
+        axes.spines["left"].set_visible(True)
+        axes.spines["left"].set_linewidth(
+            frame_style["linewidth"]
+        )
+    else:
+        axes.spines["left"].set_visible(False)
@@ -0,0 +1,277 @@
+import numpy as np
+
+from src.func import models, suspension, tracing
+
+# Spectra of every particle model: Re[CM], Im[CM], DEP force, electrorotation torque,
+# travelling-wave DEP force and the permittivity, conductivity and impedance of a suspension of
+# the particles, all derived from one evaluation of its complex CM factor
+SPECTRA = ["recm", "imcm", "depforce", "rot", "twdep"] + suspension.SUSPENSION_SPECTRA
+
+
+def generate_frequencies(start, stop, no_points):
+    """
+    Generates a log-spaced frequency list between two frequencies.
+
+    Args:
+        start (float): First frequency in Hz.
+        stop (float): Last frequency in Hz.
+        no_points (int): Number of frequencies.
+
+    Returns:
+        np.array: The frequency list, as integers (Hz).
+    """
+    return np.logspace(start=np.log10(start),
+                       stop=np.log10(stop),
+                       num=no_points,
+                       endpoint=True,
+                       dtype=int)
+
+
+def get_model_shells(parameters, model_name):
+    # Shells of a particle model, from the innermost to the outermost, see models.multi_shell_spectra
+    if model_name == "homogenous_particle":
+        return []
+
+    elif model_name == "single_shell":
+        return [(parameters["1st_shell_thick"], parameters["1st_shell_perm"], parameters["1st_shell_cond"])]
+
+    elif model_name == "two_shell":
+        return [(parameters["1st_shell_thick"], parameters["1st_shell_perm"], parameters["1st_shell_cond"]),
+                (parameters["2nd_shell_thick"], parameters["2nd_shell_perm"], parameters["2nd_shell_cond"])]
+
+    raise ValueError(f"Unknown particle model: {model_name}")
+
+
+def evaluate_model_spectra(parameters, model_name, frequencies, keys=None):
+    """
+    Calculates the spectra of a single particle model (see SPECTRA), for all frequencies at
+    once, from a single evaluation of its complex CM factor. The suspension spectra are only
+    calculated when requested.
+
+    Spheroidal particles, of symmetry axis "aspect_ratio" times the radius, have their three
+    axes evaluated at once. Their spectra are the ones along the longest axis, which the
+    particles align with the field: the symmetry axis of rods, an equatorial axis of discs.
+    In a suspension they are randomly oriented, and its spectra average the three axes.
+    All spectra are NaN for an aspect ratio that is not positive.
+
+    Args:
+        parameters (dict): Curve parameters, as created by MainUI.create_default_curve_data.
+        model_name (str): "homogenous_particle", "single_shell" or "two_shell".
+        frequencies (np.array): Frequencies (Hz) at which the model is evaluated.
+        keys (list): Spectra to calculate, all SPECTRA when None.
+
+    Returns:
+        dict: The arrays of the requested spectra.
+    """
+    keys = SPECTRA if keys is None else list(keys)
+    unknown_keys = [key for key in keys if key not in SPECTRA]
+    if unknown_keys:
+        raise ValueError(f"Unknown spectra: {', '.join(unknown_keys)}")
+    suspension_keys = [key for key in keys if key in suspension.SUSPENSION_SPECTRA]
+
+    frequencies = np.asarray(frequencies, dtype=np.float64)
+    shells = get_model_shells(parameters, model_name)
+
+    # The particle radius of the single-shell model is its outer radius, the core radius otherwise
+    radius = np.asarray(parameters["core_radius"], dtype=np.float64)
+    if model_name == "single_shell":
+        radius = radius - 0.001 * np.asarray(parameters["1st_shell_thick"], dtype=np.float64)
+
+    # Curves saved before the aspect ratio and the wavelength existed are spheres, of the default wavelength
+    aspect_ratio = np.asarray(parameters.get("aspect_ratio", 1.0), dtype=np.float64)
+    # Non-positive aspect ratios have no shape, they are evaluated as spheres and their spectra set to NaN
+    valid_shape = aspect_ratio > 0
+    aspect_ratio = np.where(valid_shape, aspect_ratio, 1.0)
+    wavelength = parameters.get("wavelength", models.DEFAULT_WAVELENGTH)
+    particle = (parameters["core_perm"], parameters["core_cond"], shells,
+                parameters["buffer_perm"], parameters["buffer_cond"])
+
+    # Curves saved before the suspension spectra existed get the default volume fraction and cell constant
+    suspension_parameters = (parameters["buffer_perm"], parameters["buffer_cond"],
+                             parameters.get("volume_fraction", suspension.DEFAULT_VOLUME_FRACTION),
+                             parameters.get("cell_constant", suspension.DEFAULT_CELL_CONSTANT))
+
+    if np.all(aspect_ratio == 1):
+        spectra = models.multi_shell_spectra(frequencies, parameters["electric_field"], radius, *particle,
+                                             wavelength=wavelength)
+        cm_factor = spectra["recm"] + 1j * spectra["imcm"] if suspension_keys else None
+
+    else:
+        # The shells are of the same thickness along every axis
+        core_semi_axes = models.spheroid_semi_axes(parameters["core_radius"], aspect_ratio)
+        if model_name == "single_shell":
+            thickness = np.asarray(parameters["1st_shell_thick"], dtype=np.float64)
+            core_semi_axes = models.expand_axes(core_semi_axes, thickness.ndim) - 0.001 * thickness
+        spectra = models.ellipsoid_multi_shell_spectra(frequencies, parameters["electric_field"], core_semi_axes,
+                                                       *particle, wavelength=wavelength)
+
+        rods = aspect_ratio >= 1
+        cm_factor = np.mean(spectra["recm"] + 1j * spectra["imcm"], axis=0) if suspension_keys else None
+        spectra = {key: np.where(rods, spectrum[0], spectrum[1]) for key, spectrum in spectra.items() if key in keys}
+
+    spectra = {key: spectrum for key, spectrum in spectra.items() if key in keys}
+    if suspension_keys:
+        suspension_spectra = suspension.get_suspension_spectra(frequencies, cm_factor, *suspension_parameters)
+        spectra.update({key: suspension_spectra[key] for key in suspension_keys})
+    if not np.all(valid_shape):
+        spectra = {key: models.as_real(np.where(valid_shape, spectrum, np.nan)) for key, spectrum in spectra.items()}
+    return spectra
+
+
+def evaluate_model(parameters, model_name, frequencies):
+    """
+    Calculates the Re[CM], Im[CM] and DEP force spectra of a single particle model, see
+    evaluate_model_spectra.
+
+    Returns:
+        tuple: The Re[CM], Im[CM] and DEP force arrays.
+    """
+    spectra = evaluate_model_spectra(parameters, model_name, frequencies, keys=["recm", "imcm", "depforce"])
+    return spectra["recm"], spectra["imcm"], spectra["depforce"]
+
+
+@tracing.traced("generate_curve_data", category="compute")
+def generate_curve_data(parameters, frequencies_list):
+    """
+    Calculates the spectra of all particle models for a set of curve parameters.
+
+    Args:
+        parameters (dict): Curve parameters, as created by MainUI.create_default_curve_data.
+        frequencies_list (np.array): Frequencies (Hz) at which the models are evaluated.
+
+    Returns:
+        dict: The frequencies and the spectra of every model, e.g. "recm_single_shell" or
+            "rot_two_shell" (see SPECTRA).
+    """
+    curve_data = {"frequencies": frequencies_list}
+
+    # The models are evaluated on the whole frequency array at once
+    for model_name in ["homogenous_particle", "single_shell", "two_shell"]:
+        for key, spectrum in evaluate_model_spectra(parameters, model_name, frequencies_list).items():
+            curve_data[f"{key}_{model_name}"] = spectrum
+
+    return curve_data
+
+
+def evaluate_curve(parameters, data_key, frequencies):
+    """
+    Calculates one spectrum of a curve, e.g. "recm_single_shell", at any frequencies.
+    Used to re-evaluate the displayed curves at the resolution of the view.
+
+    Args:
+        parameters (dict): Curve parameters.
+        data_key (str): Key of the spectrum in the curve data, see generate_curve_data.
+        frequencies (np.array): Frequencies (Hz) at which the spectrum is evaluated.
+
+    Returns:
+        np.array: The values of the spectrum.
+    """
+    quantity, model_name = data_key.split("_", 1)
+    return evaluate_model_spectra(parameters, model_name, frequencies, keys=[quantity])[quantity]
+
+
+def evaluate_in_window(evaluator, start, stop, no_points, log_x=True):
+    """
+    Samples a spectrum between two frequencies.
+
+    Args:
+        evaluator (callable): Function returning the spectrum values for an array of frequencies.
+        start (float): First frequency in Hz.
+        stop (float): Last frequency in Hz.
+        no_points (int): Number of frequencies.
+        log_x (bool): Log-spaced frequencies, linearly spaced otherwise.
+
+    Returns:
+        tuple: The frequencies and the spectrum values.
+    """
+    if log_x:
+        frequencies = np.logspace(np.log10(start), np.log10(stop), no_points)
+    else:
+        frequencies = np.linspace(start, stop, no_points)
+    return frequencies, np.asarray(evaluator(frequencies))
+
+
+def get_cross_over_freq(freq_list, recm_list):
+    """
+    Finds the first (negative to positive) and second (positive to negative)
+    cross-over frequencies of a Re[CM] spectrum.
+
+    Args:
+        freq_list (list): Frequencies of the spectrum.
+        recm_list (list): Re[CM] values of the spectrum.
+
+    Returns:
+        tuple: First and second cross-over frequencies, None when missing.
+    """
+    intersections = []
+    first_co = None
+    second_co = None
+    for i in range(len(recm_list)-1):
+        if recm_list[i] < 0 and recm_list[i+1] > 0:
+            first_co = freq_list[i]
+            intersections.append(freq_list[i])
+        elif recm_list[i] > 0 and recm_list[i+1] < 0:
+            second_co = freq_list[i]
+            intersections.append(freq_list[i])
+
+    return first_co, second_co
+
+
+def get_cross_over_brackets(recm):
+    """
+    Locates the first (negative to positive) and second (positive to negative) cross-overs
+    of many Re[CM] spectra at once, between two consecutive points.
+
+    Args:
+        recm (np.array): Re[CM] values, the frequencies along the last axis.
+
+    Returns:
+        list: For the first and the second cross-over, a (found, index) pair of arrays of the
+            shape of recm without its last axis. The cross-over lies between the points index
+            and index + 1, where found is True.
+    """
+    rising = (recm[..., :-1] < 0) & (recm[..., 1:] >= 0)
+    falling = (recm[..., :-1] > 0) & (recm[..., 1:] <= 0)
+
+    brackets = []
+    for crossings in [rising, falling]:
+        # As in get_cross_over_freq, the last crossing of each kind is taken
+        index = crossings.shape[-1] - 1 - np.argmax(crossings[..., ::-1], axis=-1)
+        brackets.append((crossings.any(axis=-1), index))
+    return brackets
+
+
+def get_cross_over_freqs(frequencies, recm):
+    """
+    Finds the first (negative to positive) and second (positive to negative) cross-over
+    frequencies of many Re[CM] spectra at once, e.g. of a parameter sweep.
+
+    Args:
+        frequencies (np.array): Frequencies of the spectra, increasing.
+        recm (np.array): Re[CM] values, the frequencies along the last axis.
+
+    Returns:
+        tuple: Arrays of the first and second cross-over frequencies, of the shape of recm
+            without its last axis. As in get_cross_over_freq, the last crossing of each kind
+            is taken, interpolated in log-frequency between the two points around it. NaN when
+            missing.
+    """
+    frequencies = np.asarray(frequencies, dtype=np.float64)
+    recm = np.asarray(recm, dtype=np.float64)
+    if frequencies.size < 2:
+        missing = np.full(recm.shape[:-1], np.nan)
+        return missing, missing.copy()
+    log_frequencies = np.log10(frequencies)
+
+    cross_overs = []
+    for found, index in get_cross_over_brackets(recm):
+        before = np.take_along_axis(recm, index[..., np.newaxis], axis=-1)[..., 0]
+        after = np.take_along_axis(recm, index[..., np.newaxis] + 1, axis=-1)[..., 0]
+
+        # Linear interpolation of the zero of Re[CM] between the two points
+        with np.errstate(divide="ignore", invalid="ignore"):
+            fraction = np.where(found, before / (before - after), 0.0)
+        log_cross_over = log_frequencies[index] + fraction * (log_frequencies[index + 1] - log_frequencies[index])
+        cross_overs.append(np.where(found, 10 ** log_cross_over, np.nan))
+
+    return cross_overs[0], cross_overs[1]
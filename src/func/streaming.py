@@ -0,0 +1,199 @@
+import os
+
+import numpy as np
+
+from src.func import ensemble, files, models, spectra, sweep, tracing
+
+# Streaming of massive families, e.g. 10^5 curves x 10^4 frequencies, too large for memory. The
+# (members x frequencies) grid is evaluated in blocks bounded by a memory budget, every block
+# written straight into .npy files on disk, opened as memory maps. The results are read back
+# lazily, only the parts that are accessed being loaded.
+#
+# A stream is a directory holding:
+#   stream.json                    the model, family shape, swept or distributed parameter names
+#   frequencies.npy                the frequencies (Hz)
+#   values_<i>.npy                 the values of the i-th swept parameter, or its samples
+#   <spectrum>.npy                 every spectrum of spectra.SPECTRA, of shape (members, frequencies),
+#                                  in the precision of the models (see models.set_precision)
+#   1st_cross_over.npy, 2nd_...    the cross-over frequencies of every member (NaN when missing)
+
+MANIFEST_FILE = "stream.json"
+# Memory of the evaluation of a block, in bytes
+MEMORY_BUDGET = 256 * 1024 ** 2
+# Peak memory of the models per value of the grid in float64: the complex intermediates and the
+# spectra of a block, measured for spheroids, whose three axes make them the most expensive.
+# Half of it in float32, see models.set_precision
+BYTES_PER_VALUE = 192
+
+
+def get_block_shape(no_members, no_frequencies, memory_budget=MEMORY_BUDGET):
+    """
+    Shape of the blocks of the (members x frequencies) grid evaluated at once.
+
+    Args:
+        no_members (int): Members of the family.
+        no_frequencies (int): Frequencies of every member.
+        memory_budget (int): Memory of the evaluation of a block, in bytes.
+
+    Returns:
+        tuple: Members and frequencies of a block. Whole rows of frequencies when they fit in
+            the budget, the blocks then being contiguous on disk.
+    """
+    bytes_per_value = BYTES_PER_VALUE * np.dtype(models.get_real_dtype()).itemsize // 8
+    block_size = memory_budget // bytes_per_value
+    if block_size < 1:
+        raise ValueError(f"Memory budget of {memory_budget} bytes is too small for a single value")
+
+    if no_frequencies <= block_size:
+        return min(no_members, block_size // no_frequencies), no_frequencies
+    return 1, block_size
+
+
+def create_stream(directory, model_name, shape, names, values, frequencies):
+    # Writes the description of the stream and opens its spectra as writable memory maps
+    os.makedirs(directory, exist_ok=True)
+    files.save_to_json(os.path.join(directory, MANIFEST_FILE),
+                       {"model": model_name, "shape": list(shape), "names": names, "spectra": spectra.SPECTRA})
+    np.save(os.path.join(directory, "frequencies.npy"), frequencies)
+    for index, value in enumerate(values):
+        np.save(os.path.join(directory, f"values_{index}.npy"), value)
+
+    no_members = int(np.prod(shape))
+    return {key: np.lib.format.open_memmap(os.path.join(directory, f"{key}.npy"), mode="w+",
+                                           dtype=models.get_real_dtype(), shape=(no_members, len(frequencies)))
+            for key in spectra.SPECTRA}
+
+
+@tracing.traced("stream_family", category="compute")
+def stream_family(directory, family_parameters, names, shape, values, model_name, frequencies,
+                  memory_budget=MEMORY_BUDGET):
+    """
+    Evaluates one particle model for all members of a family, written block by block to disk.
+
+    Args:
+        directory (str): Directory of the stream, created when missing.
+        family_parameters (dict): Parameters of the family, the varying ones as column arrays
+            of one row per member, see sweep.get_family_parameters.
+        names (list): Names of the varying parameters.
+        shape (tuple): Shape of the family, its members being flattened in that order.
+        values (list): Values of every varying parameter, saved with the stream.
+        model_name (str): "homogenous_particle", "single_shell" or "two_shell".
+        frequencies (np.array): Frequencies (Hz) at which the model is evaluated, increasing.
+        memory_budget (int): Memory of the evaluation of a block, in bytes.
+
+    Returns:
+        dict: The stream read back lazily, see load_stream.
+    """
+    frequencies = np.asarray(frequencies, dtype=np.float64)
+    no_members = int(np.prod(shape))
+    outputs = create_stream(directory, model_name, shape, names, values, frequencies)
+
+    block_members, block_frequencies = get_block_shape(no_members, len(frequencies), memory_budget)
+    for start in range(0, no_members, block_members):
+        stop = min(start + block_members, no_members)
+        chunk = sweep.get_chunk(family_parameters, names, start, stop)
+        for first in range(0, len(frequencies), block_frequencies):
+            last = min(first + block_frequencies, len(frequencies))
+            for key, spectrum in spectra.evaluate_model_spectra(chunk, model_name, frequencies[first:last]).items():
+                # Spectra not depending on the varying parameters come out as a single row
+                outputs[key][start:stop, first:last] = spectrum
+
+    for output in outputs.values():
+        output.flush()
+    del outputs
+
+    save_cross_overs(directory, frequencies, memory_budget)
+    return load_stream(directory)
+
+
+def save_cross_overs(directory, frequencies, memory_budget=MEMORY_BUDGET):
+    # The cross-overs need whole rows of Re[CM], read back from disk a few rows at a time
+    recm = np.load(os.path.join(directory, "recm.npy"), mmap_mode="r")
+    cross_overs = [np.empty(recm.shape[0]), np.empty(recm.shape[0])]
+
+    block_members = max(1, memory_budget // BYTES_PER_VALUE // max(recm.shape[1], 1))
+    for start in range(0, recm.shape[0], block_members):
+        stop = min(start + block_members, recm.shape[0])
+        first, second = spectra.get_cross_over_freqs(frequencies, recm[start:stop])
+        cross_overs[0][start:stop], cross_overs[1][start:stop] = first, second
+
+    np.save(os.path.join(directory, "1st_cross_over.npy"), cross_overs[0])
+    np.save(os.path.join(directory, "2nd_cross_over.npy"), cross_overs[1])
+
+
+def stream_sweep(directory, parameters, model_name, frequencies, sweeps, memory_budget=MEMORY_BUDGET):
+    """
+    Evaluates a parameter sweep to disk, like sweep.sweep_model for families too large for memory.
+
+    Args:
+        directory (str): Directory of the stream.
+        parameters (dict): Parameters shared by the family, see MainUI.create_default_curve_data.
+        model_name (str): "homogenous_particle", "single_shell" or "two_shell".
+        frequencies (np.array): Frequencies (Hz) at which the model is evaluated, increasing.
+        sweeps (list): One or two (parameter name, values) pairs, see sweep.sweep_model.
+        memory_budget (int): Memory of the evaluation of a block, in bytes.
+
+    Returns:
+        dict: The stream read back lazily, see load_stream.
+    """
+    shape, family_parameters = sweep.get_family_parameters(parameters, sweeps)
+    names = [name for name, _ in sweeps]
+    values = [np.asarray(values, dtype=np.float64).ravel() for _, values in sweeps]
+    return stream_family(directory, family_parameters, names, shape, values, model_name, frequencies,
+                         memory_budget)
+
+
+def stream_ensemble(directory, parameters, model_name, frequencies, distributions, no_samples=ensemble.NO_SAMPLES,
+                    seed=None, memory_budget=MEMORY_BUDGET):
+    """
+    Evaluates the spectra of every sample of a heterogeneous population to disk, see
+    ensemble.sample_population.
+
+    Args:
+        directory (str): Directory of the stream.
+        parameters (dict): Parameters of the curve, see MainUI.create_default_curve_data.
+        model_name (str): "homogenous_particle", "single_shell" or "two_shell".
+        frequencies (np.array): Frequencies (Hz) at which the model is evaluated, increasing.
+        distributions (dict): Distribution of every heterogeneous parameter.
+        no_samples (int): Number of samples of the population.
+        seed (int): Seed of the random generator.
+        memory_budget (int): Memory of the evaluation of a block, in bytes.
+
+    Returns:
+        dict: The stream read back lazily, see load_stream, the values being the samples of
+            every distributed parameter.
+    """
+    population = ensemble.sample_population(parameters, distributions, no_samples, seed)
+    names = list(distributions)
+    values = [population[name].ravel() for name in names]
+    return stream_family(directory, population, names, (no_samples,), values, model_name, frequencies,
+                         memory_budget)
+
+
+@tracing.traced(category="io")
+def load_stream(directory):
+    """
+    Opens a stream for reading, without loading its spectra.
+
+    Args:
+        directory (str): Directory of the stream.
+
+    Returns:
+        dict: The model name, frequencies, names and values of the varying parameters, like
+            sweep.sweep_model, and every spectrum as a read-only memory map of shape family
+            shape + (no_frequencies,), with the cross-overs of shape family shape.
+    """
+    manifest = files.load_from_json(os.path.join(directory, MANIFEST_FILE))
+    shape = tuple(manifest["shape"])
+
+    result = {"model": manifest["model"],
+              "names": manifest["names"],
+              "frequencies": np.load(os.path.join(directory, "frequencies.npy")),
+              "values": [np.load(os.path.join(directory, f"values_{index}.npy"))
+                         for index in range(len(manifest["names"]))]}
+    for key in manifest["spectra"]:
+        spectrum = np.load(os.path.join(directory, f"{key}.npy"), mmap_mode="r")
+        result[key] = spectrum.reshape(shape + spectrum.shape[-1:])
+    for key in ["1st_cross_over", "2nd_cross_over"]:
+        result[key] = np.load(os.path.join(directory, f"{key}.npy"), mmap_mode="r").reshape(shape)
+    return result
@@ -0,0 +1,74 @@
+import numpy as np
+
+from src.func import models
+
+# Dielectric spectroscopy of a suspension of the particles: the Maxwell-Wagner mixture of the
+# particles, of equivalent complex permittivity given by the shell models, in the buffer. The
+# mixture only needs the complex CM factor of the particles, already evaluated for the DEP
+# spectra, so that the suspension spectra come from the same single evaluation:
+#   eps_suspension = eps_buffer * (1 + 2 * phi * CM) / (1 - phi * CM)
+# for a volume fraction phi. The mixture formula holds for dilute suspensions, phi below ~0.3.
+# The suspension spectra are calculated with the particle spectra, so that invalid suspension
+# parameters give NaN suspension spectra, rather than errors that would lose the particle ones.
+
+# Spectra of the suspension, see spectra.SPECTRA
+SUSPENSION_SPECTRA = ["permittivity", "conductivity", "impedance"]
+DEFAULT_VOLUME_FRACTION = 0.1
+# Electrode distance over electrode area of the measurement cell (1/m), 1 cm over 1 cm2
+DEFAULT_CELL_CONSTANT = 100.0
+VACUUM_PERM = 8.854e-12
+
+
+def get_valid_volume_fraction(volume_fraction):
+    # Volume fraction, NaN outside of [0, 1)
+    volume_fraction = models.as_real(volume_fraction)
+    return models.as_real(np.where((volume_fraction >= 0) & (volume_fraction < 1), volume_fraction, np.nan))
+
+
+# Calculate the complex permittivity of the suspension from the CM factor of its particles, NaN for
+# volume fractions outside of [0, 1)
+def maxwell_wagner_complex_permittivity(cm_factor, complex_perm_buffer, volume_fraction):
+    volume_fraction = get_valid_volume_fraction(volume_fraction)
+    # The complex division of the NaN values warns, the NaN being expected
+    with np.errstate(invalid="ignore"):
+        return complex_perm_buffer * (1 + 2 * volume_fraction * cm_factor) / (1 - volume_fraction * cm_factor)
+
+
+# Calculate the complex permittivity of the suspension from the equivalent complex permittivity of its
+# particles, e.g. single_shell_equivalent_complex_permittivity
+def mixture_complex_permittivity(complex_perm_particle, complex_perm_buffer, volume_fraction):
+    cm_factor = models.CMfactor_complex(complex_perm_particle, complex_perm_buffer)
+    return maxwell_wagner_complex_permittivity(cm_factor, complex_perm_buffer, volume_fraction)
+
+
+def get_suspension_spectra(freq, cm_factor, buffer_perm, buffer_cond, volume_fraction=DEFAULT_VOLUME_FRACTION,
+                           cell_constant=DEFAULT_CELL_CONSTANT):
+    """
+    Permittivity, conductivity and impedance spectra of a suspension of particles.
+
+    Args:
+        freq (np.array): Frequencies (Hz), broadcast against the CM factor.
+        cm_factor (np.array): Complex CM factor of the particles. Randomly oriented spheroids
+            use the mean of the CM factors along their three axes.
+        buffer_perm (float): Relative permittivity of the buffer.
+        buffer_cond (float): Conductivity of the buffer (S/m).
+        volume_fraction (float): Volume fraction of the particles, from 0 to below 1.
+        cell_constant (float): Cell constant of the measurement cell (1/m), positive.
+
+    Returns:
+        dict: The "permittivity" (relative), "conductivity" (S/m) and "impedance" (magnitude,
+            Ohm) arrays. NaN where the volume fraction is out of range, and the impedance also
+            where the cell constant is not positive.
+    """
+    freq = models.as_real(freq)
+    cell_constant = models.as_real(cell_constant)
+    cell_constant = models.as_real(np.where(cell_constant > 0, cell_constant, np.nan))
+
+    suspension_perm = maxwell_wagner_complex_permittivity(cm_factor, models.complex_perm(freq, buffer_perm, buffer_cond),
+                                                          volume_fraction)
+    # Complex conductivity of the suspension, sigma + j * omega * eps
+    admittivity = 2j * np.pi * freq * suspension_perm
+
+    return {"permittivity": suspension_perm.real / VACUUM_PERM,
+            "conductivity": admittivity.real,
+            "impedance": cell_constant / np.abs(admittivity)}
@@ -0,0 +1,143 @@
+import numpy as np
+
+from src.func import models, spectra, tracing
+
+# Parameter sweeps: a family of curves sharing all parameters but one or two, e.g. the buffer
+# conductivity, evaluated in a single batched call of the models. The swept values get their
+# own axes in front of the frequency axis, and numpy broadcasts them through the equations:
+#   1-D sweep of N values          -> spectra of shape (N, no_frequencies)
+#   2-D sweep of N x M values      -> spectra of shape (N, M, no_frequencies)
+
+# Parameters of the MainUI.create_default_curve_data schema that can be swept
+SWEEP_PARAMETERS = ["buffer_perm", "buffer_cond",
+                    "core_perm", "core_cond", "core_radius",
+                    "1st_shell_perm", "1st_shell_cond", "1st_shell_thick",
+                    "2nd_shell_perm", "2nd_shell_cond", "2nd_shell_thick",
+                    "electric_field", "aspect_ratio", "wavelength", "volume_fraction", "cell_constant"]
+MODEL_NAMES = ["homogenous_particle", "single_shell", "two_shell"]
+
+# Values (curves x frequencies) evaluated at once, bounds the memory of the complex intermediates
+CHUNK_SIZE = 1000000
+
+
+def get_sweep_values(start, stop, no_values, log_scale=False):
+    """
+    Values of a swept parameter between two limits.
+
+    Args:
+        start (float): First value.
+        stop (float): Last value.
+        no_values (int): Number of values.
+        log_scale (bool): Log-spaced values, e.g. for conductivities, linearly spaced otherwise.
+
+    Returns:
+        np.array: The values, as float64.
+    """
+    if log_scale:
+        return np.logspace(np.log10(start), np.log10(stop), no_values)
+    return np.linspace(start, stop, no_values)
+
+
+def get_family_parameters(parameters, sweeps):
+    """
+    Parameters of every member of the family, the swept ones as column arrays.
+
+    Args:
+        parameters (dict): Parameters shared by the family, see MainUI.create_default_curve_data.
+        sweeps (list): One or two (parameter name, values) pairs.
+
+    Returns:
+        tuple: The shape of the family, e.g. (N,) or (N, M), and the parameters of its members
+            flattened in that order, the swept values being arrays of shape (no_members, 1).
+    """
+    if not 1 <= len(sweeps) <= 2:
+        raise ValueError(f"A sweep varies one or two parameters, not {len(sweeps)}")
+
+    names = [name for name, _ in sweeps]
+    for name in names:
+        if name not in SWEEP_PARAMETERS:
+            raise ValueError(f"Unknown sweep parameter: {name}")
+    if len(set(names)) != len(names):
+        raise ValueError(f"The same parameter is swept twice: {names[0]}")
+
+    values = [np.asarray(values, dtype=np.float64).ravel() for _, values in sweeps]
+    shape = tuple(len(value) for value in values)
+    grids = np.meshgrid(*values, indexing="ij")
+
+    family_parameters = dict(parameters)
+    for name, grid in zip(names, grids):
+        family_parameters[name] = grid.reshape(-1, 1)
+    return shape, family_parameters
+
+
+def get_chunk(family_parameters, names, start, stop):
+    chunk = dict(family_parameters)
+    for name in names:
+        chunk[name] = family_parameters[name][start:stop]
+    return chunk
+
+
+@tracing.traced("sweep_model", category="compute")
+def sweep_model(parameters, model_name, frequencies, sweeps):
+    """
+    Evaluates one particle model for a whole family of parameters.
+
+    Args:
+        parameters (dict): Parameters shared by the family, see MainUI.create_default_curve_data.
+        model_name (str): "homogenous_particle", "single_shell" or "two_shell".
+        frequencies (np.array): Frequencies (Hz) at which the model is evaluated, increasing.
+        sweeps (list): One or two (parameter name, values) pairs, e.g.
+            [("buffer_cond", get_sweep_values(1e-3, 1, 100, log_scale=True))].
+
+    Returns:
+        dict: The frequencies, the names and values of the swept parameters, the spectra of
+            spectra.SPECTRA of shape family shape + (no_frequencies,), and the
+            "1st_cross_over" and "2nd_cross_over" frequencies of shape family shape (NaN when
+            the spectrum does not cross zero).
+    """
+    frequencies = np.asarray(frequencies, dtype=np.float64)
+    shape, family_parameters = get_family_parameters(parameters, sweeps)
+    names = [name for name, _ in sweeps]
+    no_members = int(np.prod(shape))
+
+    # The spectra are stored in the precision of the models, see models.set_precision
+    result = {key: np.empty((no_members, len(frequencies)), dtype=models.get_real_dtype()) for key in spectra.SPECTRA}
+    chunk_size = max(1, CHUNK_SIZE // max(len(frequencies), 1))
+    for start in range(0, no_members, chunk_size):
+        stop = min(start + chunk_size, no_members)
+        chunk = get_chunk(family_parameters, names, start, stop)
+        for key, values in spectra.evaluate_model_spectra(chunk, model_name, frequencies).items():
+            # Spectra not depending on the swept parameters come out as a single row
+            result[key][start:stop] = values
+
+    for key in spectra.SPECTRA:
+        result[key] = result[key].reshape(shape + (len(frequencies),))
+    result["1st_cross_over"], result["2nd_cross_over"] = spectra.get_cross_over_freqs(frequencies, result["recm"])
+
+    result["frequencies"] = frequencies
+    result["names"] = names
+    result["values"] = [np.asarray(values, dtype=np.float64).ravel() for _, values in sweeps]
+    return result
+
+
+def sweep_curve_data(parameters, frequencies, sweeps):
+    """
+    Evaluates all particle models for a family of parameters, like spectra.generate_curve_data.
+
+    Args:
+        parameters (dict): Parameters shared by the family.
+        frequencies (np.array): Frequencies (Hz) at which the models are evaluated, increasing.
+        sweeps (list): One or two (parameter name, values) pairs.
+
+    Returns:
+        dict: The keys of spectra.generate_curve_data, the spectra of shape family shape +
+            (no_frequencies,), plus the "1st_cross_over_<model>" and "2nd_cross_over_<model>"
+            frequencies of every model.
+    """
+    curve_data = {"frequencies": np.asarray(frequencies, dtype=np.float64)}
+    for model_name in MODEL_NAMES:
+        result = sweep_model(parameters, model_name, frequencies, sweeps)
+        for key in spectra.SPECTRA + ["1st_cross_over", "2nd_cross_over"]:
+            curve_data[f"{key}_{model_name}"] = result[key]
+
+    return curve_data
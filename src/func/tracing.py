@@ -0,0 +1,174 @@
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+
+# Lightweight tracing of the hot paths (curve generation, graph refresh, drawing, file I/O).
+# Spans are only recorded while tracing is enabled, and are saved in the Chrome trace-event
+# format, which can be opened in chrome://tracing, edge://tracing or https://ui.perfetto.dev.
+#
+# Tracing is enabled at startup by setting the OPENDEP_TRACE environment variable to the
+# path of the trace file, which is written when the program exits:
+#   OPENDEP_TRACE=trace.json python main.py
+
+TRACE_ENVIRONMENT_VARIABLE = "OPENDEP_TRACE"
+
+_enabled = False
+_events = []
+_listeners = []
+_start_time = time.perf_counter()
+
+
+class _NullSpan:
+    # Returned by span() while nothing listens, so that the traced code only pays
+    # for one function call and an empty with-block
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    def __init__(self, name, category, args):
+        self.name = name
+        self.category = category
+        self.args = args
+        self.start = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        end = time.perf_counter()
+        for listener in _listeners:
+            listener(self.name, self.category, end - self.start)
+        if not _enabled:
+            return False
+
+        event = {"name": self.name,
+                 "cat": self.category,
+                 "ph": "X",
+                 "ts": (self.start - _start_time) * 1e6,
+                 "dur": (end - self.start) * 1e6,
+                 "pid": os.getpid(),
+                 "tid": threading.get_ident()}
+        if self.args:
+            event["args"] = self.args
+        if exc_type is not None:
+            event.setdefault("args", {})["error"] = exc_type.__name__
+        _events.append(event)
+        return False
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def is_enabled():
+    return _enabled
+
+
+def clear():
+    _events.clear()
+
+
+def get_events():
+    return list(_events)
+
+
+def add_listener(callback):
+    """
+    Registers a callback called as callback(name, category, duration_in_seconds) at the
+    end of every span, whether or not the trace is being recorded. The callback may be
+    called from worker threads.
+    """
+    if callback not in _listeners:
+        _listeners.append(callback)
+
+
+def remove_listener(callback):
+    if callback in _listeners:
+        _listeners.remove(callback)
+
+
+def span(name, category="app", **args):
+    """
+    Measures the duration of a with-block.
+
+    Args:
+        name (str): Name shown in the trace viewer, e.g. "refresh_graph".
+        category (str): Category of the span (compute, render, io, app).
+        **args: Extra values stored with the span (number of curves, file path...).
+
+    Returns:
+        A context manager, which does nothing while tracing is disabled and no listener is set.
+    """
+    if not _enabled and not _listeners:
+        return _NULL_SPAN
+    return Span(name, category, args)
+
+
+def traced(name=None, category="app"):
+    """
+    Decorator recording a span for every call of the decorated function.
+    Not meant for Qt slots, as the wrapper hides the signature PyQt inspects.
+    """
+    def decorator(func):
+        span_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled and not _listeners:
+                return func(*args, **kwargs)
+            with Span(span_name, category, None):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def save_trace(file_path):
+    """
+    Writes the recorded spans as a Chrome trace-event JSON file.
+
+    Args:
+        file_path (str): Path of the trace file.
+    """
+    metadata = [{"name": "process_name", "ph": "M", "pid": os.getpid(),
+                 "args": {"name": "OpenDEP View"}}]
+    for thread in threading.enumerate():
+        metadata.append({"name": "thread_name", "ph": "M", "pid": os.getpid(),
+                         "tid": thread.ident, "args": {"name": thread.name}})
+
+    with open(file_path, 'w') as file:
+        json.dump({"traceEvents": metadata + get_events(), "displayTimeUnit": "ms"}, file)
+
+
+def enable_from_environment():
+    """
+    Enables tracing when OPENDEP_TRACE is set, and saves the trace to that path at exit.
+
+    Returns:
+        str: The trace file path, or None when tracing stays disabled.
+    """
+    file_path = os.environ.get(TRACE_ENVIRONMENT_VARIABLE)
+    if not file_path:
+        return None
+
+    enable()
+    atexit.register(save_trace, file_path)
+    return file_path
@@ -1,13 +1,12 @@
 import os
 
-import numpy as np
 from PyQt5.QtGui import QColor
 from PyQt5.QtWidgets import QDialog, QGraphicsDropShadowEffect, QFileDialog
 from PyQt5.QtCore import Qt
 from PyQt5.uic import loadUi
-from PIL import Image
 
-from src.func import general
+from src.func import figure_export
+from ui.helpers import pyqt
 
 
 class CaptureWidgetUI(QDialog):
@@ -29,8 +28,8 @@ class CaptureWidgetUI(QDialog):
         self.pyqt5_entry_image_path.setText(os.path.expanduser("~/Desktop"))
 
         # Lock to integer only
-        general.lock_entry_to_int(self.pyqt5_entry_image_width)
-        general.lock_entry_to_int(self.pyqt5_entry_image_height)
+        pyqt.lock_entry_to_int(self.pyqt5_entry_image_width)
+        pyqt.lock_entry_to_int(self.pyqt5_entry_image_height)
 
     def connect_buttons(self):
         self.pyqt5_button_image_close.clicked.connect(self.exit)
@@ -76,18 +75,16 @@ class CaptureWidgetUI(QDialog):
         else:
             width = int(self.parent_widget.pyqt5_entry_graph_width.text())
             height = int(self.parent_widget.pyqt5_entry_graph_height.text())
-        # Save the image
-        self.parent_widget.pyqt5_graph_widget.figure.savefig(f"{path}/{name}.{format}",
-                                                             dpi=dpi,
-                                                             bbox_inches='tight')
-
-        image = Image.open(f"{path}/{name}.{format}")
-        if self.pyqt5_combo_image_color.currentText() == "Grayscale":
-            image = image.convert("L")
-        output_size = (width, height)
-        image = image.resize(output_size)
-        output_dpi = (dpi, dpi)
-        image.save(f"{path}/{name}.{format}", dpi=output_dpi)
+        # Save the image, rendered once at the requested size
+        graph_widget = self.parent_widget.pyqt5_graph_widget
+        with graph_widget.full_resolution():
+            figure_export.export_figure(graph_widget.figure,
+                                        f"{path}/{name}.{format}",
+                                        width=width,
+                                        height=height,
+                                        dpi=dpi,
+                                        grayscale=self.pyqt5_combo_image_color.currentText() == "Grayscale",
+                                        render_dpi=graph_widget.get_screen_dpi())
 
     def open_widget(self):
         self.exec_()
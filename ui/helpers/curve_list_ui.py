@@ -0,0 +1,214 @@
+from PyQt5.QtCore import Qt, QEvent, QPoint, QRect, QRectF, QSize, QTimer
+from PyQt5.QtGui import QColor, QPen
+from PyQt5.QtWidgets import QStyledItemDelegate, QListView
+
+from src.classes.pyqt import CurveListModel
+from ui.helpers.curve_widget_ui import CurveWidgetUI
+
+# Curve widgets kept hidden for reuse, beyond the ones shown in the viewport
+MAX_POOLED_WIDGETS = 4
+MODEL_NAMES = ["Homogenous", "Single-shell", "Two-shell"]
+
+
+# Shows the curves in a QListView. Only the rows in the viewport get a real CurveWidgetUI, as persistent
+# editors taken from a small pool of widgets; the other rows are painted, so a session with thousands of
+# curves only ever holds the few widgets that fit on screen.
+class CurveListUI(QStyledItemDelegate):
+    def __init__(self, view, parent_widget):
+        QStyledItemDelegate.__init__(self, view)
+
+        # Varaibles
+        self.view = view
+        self.viewport = view.viewport()
+        self.parent_widget = parent_widget
+        self.model = CurveListModel(parent_widget.curves_dict, parent=view)
+        self.open_widgets = {}
+        self.widget_pool = []
+        self.expanded_ids = set()
+        self.row_heights = {}
+        self.layout_pending = False
+
+        # The first widget gives the height of the collapsed rows, and goes to the pool
+        widget = self.create_widget()
+        self.collapsed_height = widget.sizeHint().height()
+        self.widget_pool.append(widget)
+
+        self.view.setModel(self.model)
+        self.view.setItemDelegate(self)
+        self.view.setResizeMode(QListView.Adjust)
+        self.view.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.view.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.view.verticalScrollBar().setSingleStep(20)
+
+        # The widgets are handed out once the view is laid out, after the pending events
+        self.update_timer = QTimer(self)
+        self.update_timer.setSingleShot(True)
+        self.update_timer.setInterval(0)
+        self.update_timer.timeout.connect(self.update_widgets)
+
+        self.view.verticalScrollBar().valueChanged.connect(self.schedule_update)
+        self.viewport.installEventFilter(self)
+        self.model.rowsInserted.connect(self.schedule_layout)
+        self.model.rowsRemoved.connect(self.remove_stale_ids)
+        self.model.rowsRemoved.connect(self.schedule_layout)
+
+    def create_widget(self):
+        widget = CurveWidgetUI(self.viewport)
+        widget.hide()
+        widget.pyqt5_checkbox_curves_expand.clicked.connect(lambda checked, widget=widget: self.update_row_height(widget))
+        widget.pyqt5_checkbox_curves_expand.toggled.connect(lambda checked, widget=widget: self.update_row_height(widget))
+        widget.pyqt5_combo_model_selection.currentIndexChanged.connect(lambda index, widget=widget: self.update_row_height(widget))
+        return widget
+
+    # CURVES
+    def add_curve(self, curve_id):
+        self.model.add_curve(curve_id)
+        self.view.scrollToTop()
+
+    def remove_curve(self, curve_id):
+        # The widget goes back to the pool before its row disappears
+        if curve_id in self.open_widgets:
+            self.view.closePersistentEditor(self.model.index(self.model.get_row(curve_id)))
+        self.model.remove_curve(curve_id)
+
+    def remove_stale_ids(self):
+        curve_ids = self.model.positions
+        self.expanded_ids = {key for key in self.expanded_ids if key in curve_ids}
+        self.row_heights = {key: value for key, value in self.row_heights.items() if key in curve_ids}
+
+    def refresh(self):
+        # The painted rows follow the names, colors and visibility of the curves
+        self.viewport.update()
+
+    # VISIBLE WIDGETS
+    def schedule_update(self):
+        self.update_timer.start()
+
+    def schedule_layout(self):
+        self.layout_pending = True
+        self.update_timer.start()
+
+    def get_visible_rows(self):
+        no_rows = self.model.rowCount()
+        if no_rows == 0:
+            return range(0)
+
+        rect = self.viewport.rect()
+        first = self.view.indexAt(QPoint(rect.center().x(), rect.top()))
+        last = self.view.indexAt(QPoint(rect.center().x(), rect.bottom()))
+        first_row = first.row() if first.isValid() else 0
+        last_row = last.row() if last.isValid() else no_rows - 1
+        return range(first_row, last_row + 1)
+
+    def update_widgets(self):
+        if self.layout_pending:
+            self.layout_pending = False
+            self.view.doItemsLayout()
+
+        rows = self.get_visible_rows()
+        visible_ids = {self.model.get_curve_id(row) for row in rows}
+
+        # Release the widgets scrolled out first, so that they can be reused for the new rows
+        for curve_id in list(self.open_widgets.keys()):
+            if curve_id not in visible_ids:
+                self.view.closePersistentEditor(self.model.index(self.model.get_row(curve_id)))
+        for row in rows:
+            if self.model.get_curve_id(row) not in self.open_widgets:
+                self.view.openPersistentEditor(self.model.index(row))
+
+    def update_row_height(self, widget):
+        if widget.id is None:
+            return
+
+        if widget.is_expanded():
+            self.expanded_ids.add(widget.id)
+        else:
+            self.expanded_ids.discard(widget.id)
+
+        row = self.model.get_row(widget.id)
+        if row >= 0:
+            self.sizeHintChanged.emit(self.model.index(row))
+            self.schedule_layout()
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Resize and obj is self.viewport:
+            self.schedule_layout()
+        # The curve widgets handle their own entries, the editing shortcuts of the delegate are not used
+        return False
+
+    # DELEGATE
+    def createEditor(self, parent, option, index):
+        curve_id = index.data(CurveListModel.CurveIdRole)
+        widget = self.widget_pool.pop() if self.widget_pool else self.create_widget()
+
+        widget.id = curve_id
+        widget.parent_widget = self.parent_widget
+        widget.set_entries_with_data()
+        widget.set_expanded(curve_id in self.expanded_ids)
+        widget.show()
+
+        self.parent_widget.curves_dict[curve_id]["widget"] = widget
+        self.open_widgets[curve_id] = widget
+        return widget
+
+    def destroyEditor(self, editor, index):
+        curve_id = editor.id
+        self.open_widgets.pop(curve_id, None)
+        if curve_id in self.parent_widget.curves_dict and self.parent_widget.curves_dict[curve_id]["widget"] is editor:
+            self.parent_widget.curves_dict[curve_id]["widget"] = None
+
+        editor.id = None
+        editor.hide()
+        if len(self.widget_pool) < MAX_POOLED_WIDGETS:
+            self.widget_pool.append(editor)
+        else:
+            editor.deleteLater()
+
+    def setEditorData(self, editor, index):
+        pass
+
+    def setModelData(self, editor, model, index):
+        pass
+
+    def updateEditorGeometry(self, editor, option, index):
+        editor.setGeometry(option.rect)
+
+    def sizeHint(self, option, index):
+        curve_id = index.data(CurveListModel.CurveIdRole)
+        widget = self.open_widgets.get(curve_id)
+        if widget is not None:
+            self.row_heights[curve_id] = widget.sizeHint().height()
+
+        return QSize(self.viewport.width(), self.row_heights.get(curve_id, self.collapsed_height))
+
+    def paint(self, painter, option, index):
+        curve_id = index.data(CurveListModel.CurveIdRole)
+        if curve_id in self.open_widgets or curve_id not in self.parent_widget.curves_dict:
+            return
+        curve = self.parent_widget.curves_dict[curve_id]
+
+        # Same card as the collapsed curve widget: color swatch, name and model
+        painter.save()
+        painter.setRenderHint(painter.Antialiasing)
+        rect = QRectF(option.rect.adjusted(6, 3, -6, -3))
+        painter.setPen(QPen(QColor("#E2E8F0")))
+        painter.setBrush(QColor("#FFFFFF"))
+        painter.drawRoundedRect(rect, 6, 6)
+
+        swatch = QRectF(rect.left() + 10, rect.center().y() - 8, 16, 16)
+        painter.setPen(QPen(QColor("#E2E8F0")))
+        painter.setBrush(QColor(curve["color"]))
+        painter.drawRoundedRect(swatch, 4, 4)
+
+        font = painter.font()
+        font.setPixelSize(14)
+        painter.setFont(font)
+        text_rect = QRect(int(swatch.right()) + 10, option.rect.top(), int(rect.width()) - 150, option.rect.height())
+        painter.setPen(QColor("#0F172A" if curve["visibility"] else "#94A3B8"))
+        name = painter.fontMetrics().elidedText(curve["name"], Qt.ElideRight, text_rect.width())
+        painter.drawText(text_rect, Qt.AlignVCenter | Qt.AlignLeft, name)
+
+        model_rect = QRect(int(rect.right()) - 110, option.rect.top(), 100, option.rect.height())
+        painter.setPen(QColor("#64748B"))
+        painter.drawText(model_rect, Qt.AlignVCenter | Qt.AlignRight, MODEL_NAMES[curve["model"]])
+        painter.restore()
@@ -1,8 +1,5 @@
-import random
-
-from PyQt5.QtGui import QDoubleValidator
-
-from src.func.general import *
+from src.func.general import format_frequency
+from ui.helpers.pyqt import lock_entry_to_float, lock_entry_to_range
 
 from PyQt5.QtWidgets import QWidget, QPushButton, QColorDialog, QFileDialog
 from PyQt5.uic import loadUi
@@ -17,6 +14,7 @@ class CurveWidgetUI(QWidget):
         # Varaibles
         self.parent_widget = None
         self.id = None
+        self.line_styles = ['-', ':', '--', '-.']
 
         # Some initial setup
         self.collapse(collapse=True)
@@ -29,11 +27,14 @@ class CurveWidgetUI(QWidget):
         self.pyqt5_button_delete_curve.clicked.connect(self.delete_self)
         self.pyqt5_button_duplicate_curve.clicked.connect(self.duplicate_curve)
         self.pyqt5_button_save_curve.clicked.connect(self.save_curve)
+        self.pyqt5_button_save_curve_cross_over.clicked.connect(self.save_cross_over_table)
 
         self.pyqt5_combo_curve_line_style.currentIndexChanged.connect(self.pick_curve_line_style)
         self.pyqt5_spinbox_curve_line_width.valueChanged.connect(self.change_curve_thickness)
 
         self.pyqt5_button_simulate_curve_noise.clicked.connect(self.open_noise_widget)
+        self.pyqt5_button_sweep_curve.clicked.connect(self.open_sweep_widget)
+        self.pyqt5_button_ensemble_curve.clicked.connect(self.open_ensemble_widget)
 
         # Model selection
         self.pyqt5_combo_model_selection.currentIndexChanged.connect(lambda:self.change_model(self.pyqt5_combo_model_selection.currentIndex()))
@@ -45,7 +46,8 @@ class CurveWidgetUI(QWidget):
         "param_core_perm", "param_core_cond",
         "param_1st_shell_perm", "param_1st_shell_cond",
         "param_2nd_shell_perm", "param_2nd_shell_cond",
-        "param_size", "param_fieldgrad",
+        "param_size", "param_fieldgrad", "param_aspect_ratio", "param_wavelength",
+        "param_volume_fraction", "param_cell_constant",
         "param_1st_shell_thick", "param_2nd_shell_thick"]
 
         for param in self.parameters_to_modify:
@@ -68,12 +70,26 @@ class CurveWidgetUI(QWidget):
         for entry in entries_list:
             lock_entry_to_float(entry)
 
+        # Restrict the shape, wavelength and suspension entries to their valid range
+        lock_entry_to_range(self.pyqt5_entry_param_aspect_ratio, 0, include_bottom=False)
+        lock_entry_to_range(self.pyqt5_entry_param_wavelength, 0, include_bottom=False)
+        lock_entry_to_range(self.pyqt5_entry_param_volume_fraction, 0, 1, include_top=False)
+        lock_entry_to_range(self.pyqt5_entry_param_cell_constant, 0, include_bottom=False)
+
     def collapse(self, collapse=True):
         if collapse:
             self.pyqt5_frame_group_parameters.setVisible(False)
         else:
             self.pyqt5_frame_group_parameters.setVisible(True)
 
+    def is_expanded(self):
+        return not self.pyqt5_frame_group_parameters.isHidden()
+
+    def set_expanded(self, expanded):
+        # The expand checkbox is checked while the widget is collapsed
+        self.collapse(collapse=not expanded)
+        self.pyqt5_checkbox_curves_expand.setChecked(not expanded)
+
     def change_model(self, index=None, init=False):
         for i in self.pyqt5_frame_input_group.findChildren(QWidget):
             i.setVisible(True)
@@ -121,12 +137,27 @@ class CurveWidgetUI(QWidget):
         model = self.parent_widget.curves_dict[self.id]["model"]
         parameters = self.parent_widget.curves_dict[self.id]["parameters"]
 
+        line_style = self.parent_widget.curves_dict[self.id]["line_style"]
+        line_width = self.parent_widget.curves_dict[self.id]["line_width"]
+
         self.pyqt5_button_pick_curve_color.setStyleSheet(f"background-color: {color}")
         self.pyqt5_entry_curve_name.setText(name)
         self.pyqt5_checkbox_curves_visible.setChecked(visible)
 
+        # The widget can be reused for another curve by the curve list, so the populating
+        # must not be taken for an edit of the curve
+        for widget in [self.pyqt5_combo_model_selection, self.pyqt5_combo_curve_line_style,
+                       self.pyqt5_spinbox_curve_line_width]:
+            widget.blockSignals(True)
+        self.pyqt5_combo_curve_line_style.setCurrentIndex(self.line_styles.index(line_style) if line_style in self.line_styles else 0)
+        self.pyqt5_spinbox_curve_line_width.setValue(line_width)
+
         # Model Selection
         self.pyqt5_combo_model_selection.setCurrentIndex(model)
+        self.change_model(index=model, init=True)
+        for widget in [self.pyqt5_combo_model_selection, self.pyqt5_combo_curve_line_style,
+                       self.pyqt5_spinbox_curve_line_width]:
+            widget.blockSignals(False)
 
         self.pyqt5_entry_param_buffer_perm.setText(str(parameters["buffer_perm"]))  # Buffer permittivity
         self.pyqt5_entry_param_buffer_cond.setText(str(parameters["buffer_cond"]))  # Buffer conductivity
@@ -142,6 +173,10 @@ class CurveWidgetUI(QWidget):
 
         self.pyqt5_entry_param_size.setText(str(parameters["core_radius"]))  # Particle radius
         self.pyqt5_entry_param_fieldgrad.setText(str(parameters["electric_field"]))  # Electric Field
+        self.pyqt5_entry_param_aspect_ratio.setText(str(parameters.get("aspect_ratio", 1.0)))  # Aspect ratio
+        self.pyqt5_entry_param_wavelength.setText(str(parameters.get("wavelength", 100.0)))  # twDEP wavelength
+        self.pyqt5_entry_param_volume_fraction.setText(str(parameters.get("volume_fraction", 0.1)))  # Volume fraction
+        self.pyqt5_entry_param_cell_constant.setText(str(parameters.get("cell_constant", 100.0)))  # Cell constant
 
         self.pyqt5_entry_param_1st_shell_thick.setText(str(parameters["1st_shell_thick"]))  # 1st shell thickness
         self.pyqt5_entry_param_2nd_shell_thick.setText(str(parameters["2nd_shell_thick"]))  # 2nd shell thickness)
@@ -166,6 +201,12 @@ class CurveWidgetUI(QWidget):
         self.pyqt5_entry_twoshell_secondco.setText(
             format_frequency(parameters["2nd_cross_over"]["two_shell"]))  # 2nd shell first coross-over
 
+    def get_ranged_entry_value(self, entry, key, default):
+        # Values out of the range of the entry are rejected, the entry getting back the one of the curve
+        if not entry.hasAcceptableInput():
+            entry.setText(str(self.parent_widget.curves_dict[self.id]["parameters"].get(key, default)))
+        return float(entry.text())
+
     def get_data_from_entries(self):
         parameters = {}
 
@@ -183,6 +224,14 @@ class CurveWidgetUI(QWidget):
 
         parameters["core_radius"] = float(self.pyqt5_entry_param_size.text())  # Particle radius
         parameters["electric_field"] = float(self.pyqt5_entry_param_fieldgrad.text())  # Electric Field
+        parameters["aspect_ratio"] = self.get_ranged_entry_value(self.pyqt5_entry_param_aspect_ratio,
+                                                                 "aspect_ratio", 1.0)  # Aspect ratio
+        parameters["wavelength"] = self.get_ranged_entry_value(self.pyqt5_entry_param_wavelength,
+                                                               "wavelength", 100.0)  # twDEP wavelength
+        parameters["volume_fraction"] = self.get_ranged_entry_value(self.pyqt5_entry_param_volume_fraction,
+                                                                    "volume_fraction", 0.1)  # Volume fraction
+        parameters["cell_constant"] = self.get_ranged_entry_value(self.pyqt5_entry_param_cell_constant,
+                                                                  "cell_constant", 100.0)  # Cell constant
 
         parameters["1st_shell_thick"] = float(self.pyqt5_entry_param_1st_shell_thick.text())  # 1st shell thickness
         parameters["2nd_shell_thick"] = float(self.pyqt5_entry_param_2nd_shell_thick.text())  # 2nd shell thickness
@@ -216,8 +265,7 @@ class CurveWidgetUI(QWidget):
             self.parent_widget.refresh_graph()
 
     def pick_curve_line_style(self):
-        styles = ['-', ':', '--', '-.']
-        self.parent_widget.curves_dict[self.id]["line_style"] = styles[self.pyqt5_combo_curve_line_style.currentIndex()]
+        self.parent_widget.curves_dict[self.id]["line_style"] = self.line_styles[self.pyqt5_combo_curve_line_style.currentIndex()]
         self.parent_widget.refresh_graph()
 
     def change_curve_thickness(self):
@@ -230,8 +278,8 @@ class CurveWidgetUI(QWidget):
         self.parent_widget.refresh_graph()
 
     def delete_self(self):
+        # The curve list takes the widget back when the row is removed
         self.parent_widget.delete_curve(self.id)
-        self.close()
 
     def enterEvent(self, event):
         self.start_focus_curve()
@@ -258,6 +306,18 @@ class CurveWidgetUI(QWidget):
         if filepath:
             self.parent_widget.save_curve(self.id, filepath)
 
+    def save_cross_over_table(self):
+        # Open file dialog and save the cross-overs versus medium conductivity as an Excel table
+        filepath, _ = QFileDialog.getSaveFileName(self, "Save cross-over table", "", "Excel Table (*.xlsx)")
+        if filepath:
+            self.parent_widget.save_cross_over_table(self.id, filepath)
+
     def open_noise_widget(self):
         self.parent_widget.noise_widget.selected_curve_id = self.id
         self.parent_widget.noise_widget.exec_()
+
+    def open_sweep_widget(self):
+        self.parent_widget.sweep_widget.open_widget(self.id)
+
+    def open_ensemble_widget(self):
+        self.parent_widget.ensemble_widget.open_widget(self.id)
@@ -0,0 +1,138 @@
+from PyQt5.QtGui import QColor
+from PyQt5.QtWidgets import QDialog, QGraphicsDropShadowEffect
+from PyQt5.QtCore import Qt
+from PyQt5.uic import loadUi
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_qt5agg import FigureCanvas
+
+from src.func import ensemble, plotting, sweep
+from ui.helpers.pyqt import lock_entry_to_int, lock_entry_to_range
+from ui.helpers.sweep_widget_ui import PARAMETER_LABELS
+
+# Default distributed parameters: the size and the membrane of the cells
+DEFAULT_PARAMETERS = ["core_radius", "1st_shell_perm"]
+DEFAULT_DISTRIBUTIONS = ["normal", "lognormal"]
+# Population spectra, with the index of their graph in plotting.Y_LABELS
+ENSEMBLE_SPECTRA = [("recm", 0), ("depforce", 1)]
+MAX_SAMPLES = 100000
+
+
+class EnsembleWidgetUI(QDialog):
+    def __init__(self, parent=None):
+        QDialog.__init__(self, parent)
+        loadUi("ui/widgets/ensemble_widget.ui", self)
+
+        # Initial setup
+        self.style_window()
+
+        # Varaibles
+        self.parent_widget = parent
+        self.selected_curve_id = None
+
+        # Graph of the population mean and its percentile bands
+        self.figure = Figure()
+        self.canvas = FigureCanvas(self.figure)
+        self.verticalLayout_ensemble_graph.addWidget(self.canvas)
+
+        for index, (parameter, distribution) in enumerate(zip(DEFAULT_PARAMETERS, DEFAULT_DISTRIBUTIONS), start=1):
+            combo = getattr(self, f"pyqt5_combo_ensemble_parameter_{index}")
+            for name in sweep.SWEEP_PARAMETERS:
+                combo.addItem(PARAMETER_LABELS[name], name)
+            combo.setCurrentIndex(sweep.SWEEP_PARAMETERS.index(parameter))
+            getattr(self, f"pyqt5_combo_ensemble_distribution_{index}").setCurrentIndex(
+                ensemble.DISTRIBUTIONS.index(distribution))
+
+            # Relative spread, below 100 % so that the uniform distributions stay positive
+            lock_entry_to_range(getattr(self, f"pyqt5_entry_ensemble_spread_{index}"), 0, 100, include_top=False)
+
+        lock_entry_to_int(self.pyqt5_entry_ensemble_samples, max_value=MAX_SAMPLES, max_length=6)
+        for key, y_index in ENSEMBLE_SPECTRA:
+            self.pyqt5_combo_ensemble_spectrum.addItem(plotting.Y_LABELS[y_index], key)
+
+        self.enable_second_parameter(False)
+
+        # Connect buttons
+        self.connect_buttons()
+
+    def connect_buttons(self):
+        self.pyqt5_button_back.clicked.connect(self.exit)
+        self.pyqt5_button_plot_ensemble.clicked.connect(self.plot_ensemble)
+        self.pyqt5_checkbox_ensemble_parameter_2.toggled.connect(self.enable_second_parameter)
+
+    def style_window(self):
+        # Remove the title bar, logo, and exit button
+        self.setWindowFlags(Qt.Window | Qt.FramelessWindowHint)
+
+        # Add Transparency
+        self.setAttribute(Qt.WA_TranslucentBackground, True)
+
+        # Add a shadow effect
+        shadow = QGraphicsDropShadowEffect(self)
+        shadow.setBlurRadius(15)
+        shadow.setXOffset(0)
+        shadow.setYOffset(0)
+        shadow.setColor(QColor(0, 0, 0, 75))  # Black color with some transparency
+        self.setGraphicsEffect(shadow)
+
+    def exit(self):
+        self.close()
+
+    def open_widget(self, curve_id):
+        self.selected_curve_id = curve_id
+        self.figure.clear()
+        self.canvas.draw()
+        self.exec_()
+
+    def enable_second_parameter(self, enabled):
+        for name in ["combo_ensemble_parameter_2", "combo_ensemble_distribution_2", "entry_ensemble_spread_2"]:
+            getattr(self, f"pyqt5_{name}").setEnabled(enabled)
+
+    def get_distribution(self, index, parameters):
+        spread_entry = getattr(self, f"pyqt5_entry_ensemble_spread_{index}")
+        if not spread_entry.hasAcceptableInput():
+            return None
+
+        # The distribution is centered on the value of the curve, its spread relative to it
+        name = getattr(self, f"pyqt5_combo_ensemble_parameter_{index}").currentData()
+        kind = ensemble.DISTRIBUTIONS[getattr(self, f"pyqt5_combo_ensemble_distribution_{index}").currentIndex()]
+        value = float(parameters[name])
+        if value <= 0:
+            return None
+        spread = value * float(spread_entry.text()) / 100
+
+        if kind == "uniform":
+            return name, {"distribution": kind, "low": value - spread, "high": value + spread}
+        return name, {"distribution": kind, "mean": value, "std": spread}
+
+    def get_distributions(self, parameters):
+        distributions = [self.get_distribution(1, parameters)]
+        if self.pyqt5_checkbox_ensemble_parameter_2.isChecked():
+            distributions.append(self.get_distribution(2, parameters))
+        if None in distributions or len({name for name, _ in distributions}) != len(distributions):
+            return None
+        return dict(distributions)
+
+    def plot_ensemble(self):
+        if self.selected_curve_id not in self.parent_widget.curves_dict \
+                or not self.pyqt5_entry_ensemble_samples.hasAcceptableInput():
+            return
+
+        curve = self.parent_widget.curves_dict[self.selected_curve_id]
+        distributions = self.get_distributions(curve["parameters"])
+        if distributions is None:
+            return
+
+        result = ensemble.ensemble_model(curve["parameters"], sweep.MODEL_NAMES[curve["model"]],
+                                         self.parent_widget.curves_dict.frequencies, distributions,
+                                         no_samples=int(float(self.pyqt5_entry_ensemble_samples.text())))
+        key, y_index = ENSEMBLE_SPECTRA[self.pyqt5_combo_ensemble_spectrum.currentIndex()]
+
+        # Population mean over the 5-95 % and 25-75 % bands, in the style of the main graph
+        self.figure.clear()
+        axes = self.figure.add_subplot(111)
+        plotting.setup_axes(axes)
+        plotting.plot_ensemble(axes, f"{curve['name']} - population mean", curve["color"], result["frequencies"],
+                               result[f"{key}_mean"], result[f"{key}_percentiles"],
+                               line_width=curve["line_width"], line_style=curve["line_style"])
+        plotting.format_axes(axes, y_index=y_index, style_params=self.parent_widget.get_graph_styling())
+        self.canvas.draw()
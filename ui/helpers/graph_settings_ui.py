@@ -3,7 +3,7 @@ from PyQt5.QtGui import QIcon, QColor
 from PyQt5.QtWidgets import QDialog, QGraphicsDropShadowEffect, QColorDialog
 from PyQt5.uic import loadUi
 
-from src.func.general import get_all_os_fonts
+from ui.helpers.pyqt import get_all_os_fonts
 import json
 
 # Create a classes to handle the graph settings UI
@@ -3,17 +3,22 @@
 # ------------------------------------------------------
 
 ### START IMPORTS ###
+from contextlib import contextmanager
+
 ## PyQt5 imports ##
+from PyQt5.QtCore import QThreadPool, QTimer
 from PyQt5.QtWidgets import *
 
+import numpy as np
+
 
 ## Matplotlib imports ##
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 from matplotlib.backends.backend_qt5agg import FigureCanvas
-from matplotlib.font_manager import FontProperties
-from matplotlib.ticker import StrMethodFormatter, ScalarFormatter, LogFormatterMathtext
 from matplotlib.backends.backend_qt5agg import NavigationToolbar2QT as NavigationToolbar
-from matplotlib.patches import Rectangle
+
+from src.classes.pyqt import FunctionWorker
+from src.func import decimation, plotting, spectra, tracing
 
 ### END IMPORTS ###
 
@@ -24,9 +29,21 @@ class GraphWidget(QWidget):
 
         # some default values
         self.scatter_style = "area"
-
-        # Create figure with tight layout
-        self.figure = plt.figure()
+        # Dense curves and scatters drawn decimated, with their full resolution data
+        self.decimated_plots = []
+        # Analytic curves, re-evaluated in the visible frequency window when zooming
+        self.analytic_plots = []
+        self.evaluation_generation = 0
+        self.evaluation_timer = QTimer(self)
+        self.evaluation_timer.setSingleShot(True)
+        self.evaluation_timer.setInterval(150)
+        self.evaluation_timer.timeout.connect(self.evaluate_analytic_plots)
+        # Style applied by format_graph, only the parts that change are applied again
+        self.applied_style = {}
+
+        # Create figure with tight layout. The figure is not registered in pyplot, it belongs to this
+        # widget only and is freed with it
+        self.figure = Figure()
 
         self.canvas = FigureCanvas(self.figure)
         self.toolbar = NavigationToolbar(self.canvas, self)
@@ -36,11 +53,11 @@ class GraphWidget(QWidget):
         layout.addWidget(self.canvas)
 
         self.canvas.axes = self.canvas.figure.add_subplot(111)
-        self.canvas.axes.set_xlabel("Frequency (Hz)", labelpad=5)
-        plt.xscale("log")
-        self.canvas.axes.set_ylabel("CM factor", labelpad=5)
-        self.canvas.axes.tick_params(labelsize="small")
-        self.canvas.axes.yaxis.set_major_formatter(StrMethodFormatter("{x:,.3f}"))
+        plotting.setup_axes(self.canvas.axes)
+
+        # The decimation follows the view limits and the size of the axes
+        self.canvas.axes.callbacks.connect("xlim_changed", self.update_view)
+        self.canvas.mpl_connect("resize_event", self.update_view)
 
         # Set tight layout
         self.setLayout(layout)
@@ -48,52 +65,166 @@ class GraphWidget(QWidget):
     def get_figure_size(self):
         return self.figure.get_size_inches() * self.figure.dpi
 
+    def get_screen_dpi(self):
+        # The figure DPI includes the device pixel ratio on high-DPI screens
+        return self.figure.dpi / self.canvas.device_pixel_ratio
+
     def set_tight_layout(self):
         self.figure.tight_layout()
-        self.canvas.draw()
-
-    def update_curve(self, name, color, x_data, y_data, line_width=1.5, line_style="-"):
-        self.canvas.axes.plot(
-            x_data,
-            y_data,
-            label=name,
-            color=color,
-            linewidth=line_width,
-            linestyle=line_style,
-        )
+        self.draw()
+
+    def draw(self):
+        with tracing.span("canvas.draw", category="render"):
+            self.canvas.draw()
+
+    def clear(self):
+        # Only the plotted data is removed, the axes keep their style
+        axes = self.canvas.axes
+        for artist in list(axes.lines) + list(axes.collections):
+            artist.remove()
+        if axes.get_legend() is not None:
+            axes.get_legend().remove()
+        axes.relim()
+        axes.autoscale()
+
+        self.decimated_plots = []
+        self.analytic_plots = []
+        # Results of evaluations still running belong to the old curves
+        self.evaluation_generation += 1
+        self.evaluation_timer.stop()
+        # The legend lists the plotted data, it is made again by the next format_graph
+        self.applied_style.pop("legend", None)
+
+    def update_curve(self, name, color, x_data, y_data, line_width=1.5, line_style="-", evaluator=None):
+        """
+        Plots a curve. When an evaluator is given (a function returning the y values for an array
+        of frequencies), the curve is re-evaluated at the resolution of the view after zooming in.
+        """
+        x_data, y_data = np.asarray(x_data), np.asarray(y_data)
+        # Dense data is plotted decimated from the start, the artists never hold every point
+        indices = self.get_initial_indices(x_data, [y_data])
+
+        line = plotting.plot_curve(self.canvas.axes, name, color, x_data[indices], y_data[indices],
+                                   line_width=line_width, line_style=line_style)
+
+        if evaluator is not None and len(x_data) > 1 and decimation.is_sorted(x_data):
+            self.analytic_plots.append({"line": line,
+                                        "x_data": x_data[indices],
+                                        "y_data": y_data[indices],
+                                        "evaluator": evaluator,
+                                        "evaluated": False})
+        else:
+            self.add_decimated_plot(indices, x_data, [y_data],
+                                    lambda indices: plotting.set_curve_data(line, x_data[indices], y_data[indices]))
 
     def update_scatter(
         self, name, color, x_data, y_data, y_errors, point_style="o", point_size=5
     ):
-        if self.scatter_style == "scatter":
-            self.canvas.axes.scatter(
-                x_data,
-                y_data,
-                label=name,
-                color=color,
-                zorder=2,
-                s=point_size,
-                marker=point_style,
-            )
-            # Plot error bars under the scatter points
-            self.canvas.axes.errorbar(
-                x_data,
-                y_data,
-                yerr=y_errors,
-                fmt="none",
-                ecolor="grey",
-                zorder=1,
-                elinewidth=0.5,
-                capsize=2,
-            )
-
-        elif self.scatter_style == "area":
-            y_min = [y_data - y_errors for y_data, y_errors in zip(y_data, y_errors)]
-            y_max = [y_data + y_errors for y_data, y_errors in zip(y_data, y_errors)]
-
-            self.canvas.axes.fill_between(
-                x_data, y_min, y_max, color=color, alpha=0.3, label=name
-            )
+        x_data, y_data, y_errors = np.asarray(x_data), np.asarray(y_data), np.asarray(y_errors)
+        y_arrays = [y_data - y_errors, y_data + y_errors]
+        indices = self.get_initial_indices(x_data, y_arrays)
+
+        scatter_style = self.scatter_style
+        # Rasterized or not depending on the full data, exports draw every point
+        artists = plotting.plot_scatter(self.canvas.axes, name, color, x_data[indices], y_data[indices],
+                                        y_errors[indices], point_style=point_style, point_size=point_size,
+                                        scatter_style=scatter_style,
+                                        rasterized=len(x_data) > plotting.RASTERIZE_POINTS)
+
+        self.add_decimated_plot(indices, x_data, y_arrays,
+                                lambda indices: plotting.set_scatter_data(artists, x_data[indices], y_data[indices],
+                                                                          y_errors[indices], scatter_style))
+
+    def get_axes_width(self):
+        # Width of the axes in pixels, one decimation column per pixel
+        return max(int(self.canvas.axes.bbox.width), 1)
+
+    def get_initial_indices(self, x_data, y_arrays):
+        # Only dense and sorted data is decimated, the rest is plotted as is
+        if not decimation.needs_decimation(len(x_data), self.get_axes_width()) or not decimation.is_sorted(x_data):
+            return slice(None)
+        # The view limits are only known at the next draw, decimate over the whole data until then.
+        # The extremes are kept, so the autoscaled limits are the same as with the full data
+        return decimation.get_decimation_indices(x_data, y_arrays, x_data[0], x_data[-1], self.get_axes_width(),
+                                                 log_x=self.canvas.axes.get_xscale() == "log")
+
+    def add_decimated_plot(self, indices, x_data, y_arrays, set_data):
+        if isinstance(indices, slice):
+            return
+        self.decimated_plots.append({"x_data": x_data, "y_arrays": y_arrays, "set_data": set_data})
+
+    def decimate_plot(self, plot):
+        x_min, x_max = self.canvas.axes.get_xlim()
+        indices = decimation.get_decimation_indices(plot["x_data"], plot["y_arrays"], x_min, x_max,
+                                                    self.get_axes_width(),
+                                                    log_x=self.canvas.axes.get_xscale() == "log")
+        plot["set_data"](indices)
+
+    def update_decimation(self, event=None):
+        for plot in self.decimated_plots:
+            self.decimate_plot(plot)
+
+    def update_view(self, event=None):
+        # Called when the x limits or the size of the axes change
+        self.update_decimation()
+        self.schedule_evaluation()
+
+    def schedule_evaluation(self):
+        x_min, x_max = sorted(self.canvas.axes.get_xlim())
+        zoomed_in = False
+        for plot in self.analytic_plots:
+            if x_min <= plot["x_data"][0] and plot["x_data"][-1] <= x_max:
+                # The whole curve is visible, its own data is used
+                if plot["evaluated"]:
+                    plotting.set_curve_data(plot["line"], plot["x_data"], plot["y_data"])
+                    plot["evaluated"] = False
+                    self.canvas.draw_idle()
+            else:
+                zoomed_in = True
+
+        # Wait for the end of the zoom or pan before evaluating
+        if zoomed_in:
+            self.evaluation_timer.start()
+
+    def evaluate_analytic_plots(self):
+        x_min, x_max = sorted(self.canvas.axes.get_xlim())
+        log_x = self.canvas.axes.get_xscale() == "log"
+
+        # Only the visible part of every curve is evaluated, with one point per pixel
+        windows = []
+        for index, plot in enumerate(self.analytic_plots):
+            start, stop = max(x_min, plot["x_data"][0]), min(x_max, plot["x_data"][-1])
+            if start < stop:
+                windows.append((index, plot["evaluator"], start, stop))
+        if not windows:
+            return
+
+        self.evaluation_generation += 1
+        worker = FunctionWorker(evaluate_windows, self.evaluation_generation, windows, self.get_axes_width(), log_x)
+        worker.signals.finished.connect(self.apply_evaluation)
+        QThreadPool.globalInstance().start(worker)
+
+    def apply_evaluation(self, result):
+        generation, curves = result
+        # Newer views or a cleared graph make the result obsolete
+        if generation != self.evaluation_generation:
+            return
+
+        for index, frequencies, values in curves:
+            plot = self.analytic_plots[index]
+            plotting.set_curve_data(plot["line"], frequencies, values)
+            plot["evaluated"] = True
+        self.canvas.draw_idle()
+
+    @contextmanager
+    def full_resolution(self):
+        # Exports draw every point, the decimated data is only meant for the screen
+        for plot in self.decimated_plots:
+            plot["set_data"](slice(None))
+        try:
+            yield
+        finally:
+            self.update_decimation()
 
     def focus_curve(self, name):
         for line in self.canvas.axes.lines:
@@ -101,165 +232,34 @@ class GraphWidget(QWidget):
                 # Get line width
                 new_line_width = line.get_linewidth() + 1
                 line.set_linewidth(new_line_width)
-        self.canvas.draw()
+        self.draw()
 
     def unfocus_curve(self, name):
         for line in self.canvas.axes.lines:
             if line.get_label() == name:
                 new_line_width = line.get_linewidth() - 1
                 line.set_linewidth(new_line_width)
-        self.canvas.draw()
+        self.draw()
 
     def format_graph(self, y_index=0, style_params=None):
-        # Allways available styling
-        y_labels = [
-            "Re[CM(f)]",
-            "DEP force (pN)",
-            "Im[CM(f)]",
-        ]
-        plt.xscale("log")
-
-        # Axis titles formating
-        self.canvas.axes.set_xlabel(
-            "Frequency (Hz)",
-            fontname=style_params["font_family"],
-            labelpad=style_params["axis_style"]["labelpad"],
-            fontsize=style_params["axis_style"]["fontsize"],
-            fontweight=style_params["axis_style"]["fontweight"],
-            fontstyle=style_params["axis_style"]["fontstyle"],
-            color=style_params["axis_style"]["color"],
-        )
-
-        self.canvas.axes.set_ylabel(
-            y_labels[y_index],
-            fontname=style_params["font_family"],
-            labelpad=style_params["axis_style"]["labelpad"],
-            fontsize=style_params["axis_style"]["fontsize"],
-            fontweight=style_params["axis_style"]["fontweight"],
-            fontstyle=style_params["axis_style"]["fontstyle"],
-            color=style_params["axis_style"]["color"],
-        )
-
-        # Tick labels formating
-        self.canvas.axes.set_xticklabels(
-            self.canvas.axes.get_xticks(),
-            fontname=style_params["font_family"],
-            fontsize=style_params["tick_style"]["fontsize"],
-            fontweight=style_params["tick_style"]["fontweight"],
-            fontstyle=style_params["tick_style"]["fontstyle"],
-            color=style_params["tick_style"]["color"],
-        )
-
-        self.canvas.axes.set_yticklabels(
-            self.canvas.axes.get_yticks(),
-            fontname=style_params["font_family"],
-            fontsize=style_params["tick_style"]["fontsize"],
-            fontweight=style_params["tick_style"]["fontweight"],
-            fontstyle=style_params["tick_style"]["fontstyle"],
-            color=style_params["tick_style"]["color"],
-        )
-
-        # Tick formating
-        if style_params["tick_style"]["majortickvisibility"]:
-            self.canvas.axes.tick_params(
-                which="major",
-                pad=style_params["tick_style"]["labelpad"],
-                direction=style_params["tick_style"]["majortickdirection"],
-                length=style_params["tick_style"]["majorticklength"],
-                width=style_params["tick_style"]["majortickwidth"],
-            )
-        else:
-            self.canvas.axes.tick_params(which="major", length=0, width=0)
-
-        if style_params["tick_style"]["minortickvisibility"]:
-            self.canvas.axes.tick_params(
-                which="minor",
-                direction=style_params["tick_style"]["minortickdirection"],
-                length=style_params["tick_style"]["minorticklength"],
-                width=style_params["tick_style"]["minortickwidth"],
-            )
-        else:
-            self.canvas.axes.tick_params(which="minor", length=0, width=0)
-
-        # Grid formating
-        if style_params["grid_style"]["hgridvisibility"]:
-            self.canvas.axes.grid(True, axis="x")
-            self.canvas.axes.grid(
-                axis="x",
-                color="black",
-                linestyle=style_params["grid_style"]["hgridlinestyle"],
-                linewidth=style_params["grid_style"]["hgridlinewidth"],
-                alpha=style_params["grid_style"]["hgridalpha"],
-                zorder=0,
-            )
-        else:
-            self.canvas.axes.grid(False, axis="x")
-
-        if style_params["grid_style"]["vgridvisibility"]:
-            self.canvas.axes.grid(True, axis="y")
-            self.canvas.axes.grid(
-                axis="y",
-                color="black",
-                linestyle=style_params["grid_style"]["vgridlinestyle"],
-                linewidth=style_params["grid_style"]["vgridlinewidth"],
-                alpha=style_params["grid_style"]["vgridalpha"],
-                zorder=0,
-            )
-        else:
-            self.canvas.axes.grid(False, axis="y")
-
-        # Legend formating
-        font_props = FontProperties(
-            family=style_params["font_family"],  # Set font family
-            style=style_params["legend_style"]["fontstyle"],  # Set font style
-            weight=style_params["legend_style"]["fontweight"],  # Set font weight
-            size=style_params["legend_style"]["fontsize"],
-        )
-
-        if style_params["legend_style"]["visibility"]:
-            self.canvas.axes.legend(
-                prop=font_props,
-                loc=style_params["legend_style"]["position"],
-            )
-        else:
-            self.canvas.axes.legend().set_visible(False)
-
-        # Figure frame formating
-        if style_params["frame_style"]["topvisbility"]:
-            self.canvas.axes.spines["top"].set_visible(True)
-            self.canvas.axes.spines["top"].set_linewidth(
-                style_params["frame_style"]["linewidth"]
-            )
-        else:
-            self.canvas.axes.spines["top"].set_visible(False)
-
-        if style_params["frame_style"]["rightvisbility"]:
-            self.canvas.axes.spines["right"].set_visible(True)
-            self.canvas.axes.spines["right"].set_linewidth(
-                style_params["frame_style"]["linewidth"]
-            )
-        else:
-            self.canvas.axes.spines["right"].set_visible(False)
-
-        if style_params["frame_style"]["bottomvisbility"]:
-            self.canvas.axes.spines["bottom"].set_visible(True)
-            self.canvas.axes.spines["bottom"].set_linewidth(
-                style_params["frame_style"]["linewidth"]
-            )
-        else:
-            self.canvas.axes.spines["bottom"].set_visible(False)
-
-        if style_params["frame_style"]["leftvisbility"]:
-            self.canvas.axes.spines["left"].set_visible(True)
-            self.canvas.axes.spines["left"].set_linewidth(
-                style_params["frame_style"]["linewidth"]
-            )
-        else:
-            self.canvas.axes.spines["left"].set_visible(False)
-
-        # Set number formating for the two axis
-        self.canvas.axes.xaxis.set_major_formatter(LogFormatterMathtext())
-        self.canvas.axes.yaxis.set_major_formatter(StrMethodFormatter("{x:,.3f}"))
-
-        # Set tight layout
-        self.figure.tight_layout()
+        """
+        Applies the style of the graph, only where it differs from the style already applied.
+
+        Returns:
+            bool: Whether anything was changed, and the graph needs to be drawn again.
+        """
+        with tracing.span("format_graph", category="render"):
+            previous_style = self.applied_style
+            self.applied_style = plotting.format_axes(self.canvas.axes, y_index=y_index, style_params=style_params,
+                                                      applied_style=previous_style)
+            return self.applied_style != previous_style
+
+
+def evaluate_windows(generation, windows, no_points, log_x):
+    # Runs in a thread of the pool, away from the GUI thread
+    with tracing.span("reevaluate_curves", category="compute", curves=len(windows), points=no_points):
+        curves = []
+        for index, evaluator, start, stop in windows:
+            frequencies, values = spectra.evaluate_in_window(evaluator, start, stop, no_points, log_x=log_x)
+            curves.append((index, frequencies, values))
+    return generation, curves
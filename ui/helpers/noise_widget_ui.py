@@ -4,7 +4,7 @@ from PyQt5.QtWidgets import QDialog, QGraphicsDropShadowEffect
 from PyQt5.QtCore import Qt
 from PyQt5.uic import loadUi
 
-from src.func import models, noise
+from src.func import noise, spectra
 
 
 class NoiseWidgetUI(QDialog):
@@ -92,63 +92,19 @@ class NoiseWidgetUI(QDialog):
 
     def generate_recm(self, frequencies):
         parameters = self.parent_widget.curves_dict[self.selected_curve_id]["parameters"]
-
-        recm_ho_list = []
-        recm_ss_list = []
-        recm_ts_list = []
-
-        for i in frequencies:
-            recm_ho, imcm_ho, depforce_ho = models.homogenous_particle_all(
-                freq=i,
-                fitting_gen_fieldgrad=parameters["electric_field"],
-                fitting_hopa_particle_radius=parameters["core_radius"],
-                fitting_hopa_particle_perm=parameters["core_perm"],
-                fitting_hopa_particle_cond=parameters["core_cond"],
-                fitting_gen_buffer_perm=parameters["buffer_perm"],
-                fitting_gen_buffer_cond=parameters["buffer_cond"])
-
-            recm_ss, imcm_ss, depforce_ss = models.single_shell_all(
-                freq=i,
-                fitting_gen_fieldgrad=parameters["electric_field"],
-                fitting_sish_particle_radius=parameters["core_radius"],
-                fitting_sish_membrane_thickness=parameters["1st_shell_thick"],
-                fitting_sish_membrane_perm=parameters["1st_shell_perm"],
-                fitting_sish_membrane_cond=parameters["1st_shell_cond"],
-                fitting_sish_cytoplasm_perm=parameters["core_perm"],
-                fitting_sish_cytoplasm_cond=parameters["core_cond"],
-                fitting_gen_buffer_perm=parameters["buffer_perm"],
-                fitting_gen_buffer_cond=parameters["buffer_cond"])
-
-            recm_ts, imcm_ts, depforce_ts = models.two_shell_all(
-                freq=i,
-                field_grad=parameters["electric_field"],
-                core_radius=parameters["core_radius"],
-                inner_shell_thickness=parameters["1st_shell_thick"],
-                inner_shell_perm=parameters["1st_shell_perm"],
-                inner_shell_cond=parameters["1st_shell_cond"],
-                outer_shell_thickness=parameters["2nd_shell_thick"],
-                outer_shell_perm=parameters["2nd_shell_perm"],
-                outer_shell_cond=parameters["2nd_shell_cond"],
-                core_perm=parameters["core_perm"],
-                core_cond=parameters["core_cond"],
-                buffer_perm=parameters["buffer_perm"],
-                buffer_cond=parameters["buffer_cond"])
-
-            recm_ho_list.append(recm_ho)
-            recm_ss_list.append(recm_ss)
-            recm_ts_list.append(recm_ts)
+        curve_data = spectra.generate_curve_data(parameters, frequencies)
 
         if self.parent_widget.curves_dict[self.selected_curve_id]["model"] == 0:
             # transform to np.array
-            recm_ho_list = np.array(recm_ho_list)
+            recm_ho_list = np.array(curve_data["recm_homogenous_particle"])
             return recm_ho_list
 
         elif self.parent_widget.curves_dict[self.selected_curve_id]["model"] == 1:
-            recm_ss_list = np.array(recm_ss_list)
+            recm_ss_list = np.array(curve_data["recm_single_shell"])
             return recm_ss_list
 
         elif self.parent_widget.curves_dict[self.selected_curve_id]["model"] == 2:
-            recm_ts_list = np.array(recm_ts_list)
+            recm_ts_list = np.array(curve_data["recm_two_shell"])
             return recm_ts_list
 
     def generate_noise_scatter(self):
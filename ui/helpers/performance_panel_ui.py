@@ -0,0 +1,88 @@
+from PyQt5.QtCore import pyqtSignal
+from PyQt5.QtWidgets import QWidget, QHBoxLayout, QLabel
+
+from src.func import general, tracing
+
+# Spans shown by the panel, matched by name first and then by category
+RECOMPUTE_SPANS = ["generate_curve_data", "reevaluate_curves"]
+REDRAW_SPANS = ["refresh_graph", "canvas.draw"]
+FILE_CATEGORY = "io"
+
+
+class PerformancePanelUI(QWidget):
+    # Spans can end in worker threads, the signal brings the timings back to the GUI thread
+    span_finished = pyqtSignal(str, str, float)
+
+    def __init__(self, parent=None):
+        QWidget.__init__(self, parent)
+
+        # Varaibles
+        self.parent_widget = parent
+        self.last_recompute = None
+        self.last_redraw = None
+        self.last_file_operation = None
+
+        # Labels, from left to right in the status bar
+        self.pyqt5_label_counts = QLabel(self)
+        self.pyqt5_label_memory = QLabel(self)
+        self.pyqt5_label_recompute = QLabel(self)
+        self.pyqt5_label_redraw = QLabel(self)
+        self.pyqt5_label_file = QLabel(self)
+
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(8, 0, 8, 0)
+        layout.setSpacing(16)
+        for label in [self.pyqt5_label_counts, self.pyqt5_label_memory, self.pyqt5_label_recompute,
+                      self.pyqt5_label_redraw, self.pyqt5_label_file]:
+            label.setStyleSheet("QLabel {border: none; font-size: 12px; color: #64748B;}")
+            layout.addWidget(label)
+        layout.addStretch()
+
+        self.span_finished.connect(self.update_timings)
+        listener = self.span_finished.emit
+        tracing.add_listener(listener)
+        self.destroyed.connect(lambda: tracing.remove_listener(listener))
+
+        self.update_labels()
+        self.update_session()
+
+    def update_timings(self, name, category, duration):
+        if name in RECOMPUTE_SPANS:
+            self.last_recompute = (name, duration)
+        elif name in REDRAW_SPANS:
+            self.last_redraw = (name, duration)
+        elif category == FILE_CATEGORY:
+            self.last_file_operation = (name, duration)
+
+        self.update_labels()
+        # The graph is refreshed after every change of the curves and scatters
+        if name == "refresh_graph":
+            self.update_session()
+
+    def update_labels(self):
+        self.pyqt5_label_recompute.setText(f"Recompute: {self.format_timing(self.last_recompute)}")
+        self.pyqt5_label_redraw.setText(f"Redraw: {self.format_timing(self.last_redraw)}")
+        self.pyqt5_label_file.setText(f"File: {self.format_timing(self.last_file_operation)}")
+
+    def update_session(self):
+        curves_dict = getattr(self.parent_widget, "curves_dict", None)
+        scatter_dict = getattr(self.parent_widget, "scatter_dict", None)
+        if curves_dict is None or scatter_dict is None:
+            return
+
+        # The stores sum their arrays, without going through every curve
+        no_points = curves_dict.get_no_points() + scatter_dict.get_no_points()
+        data_size = curves_dict.get_data_size() + scatter_dict.get_data_size()
+
+        self.pyqt5_label_counts.setText(f"Curves: {len(curves_dict)}   Scatters: {len(scatter_dict)}   "
+                                        f"Points: {no_points}")
+        self.pyqt5_label_memory.setText(f"Data: {general.format_size(data_size)}")
+
+    @staticmethod
+    def format_timing(timing):
+        if timing is None:
+            return "-"
+        name, duration = timing
+        if duration < 1:
+            return f"{duration * 1e3:.1f} ms ({name})"
+        return f"{duration:.2f} s ({name})"
@@ -0,0 +1,95 @@
+import os
+
+from PyQt5.QtGui import QDoubleValidator, QValidator
+from matplotlib.font_manager import findSystemFonts
+
+DEFAULT_FONT = "DejaVu Sans"
+
+
+def get_all_os_fonts():
+    """
+    Get all available fonts on the system.
+    """
+    common_fonts = {
+        "arial": "Arial",
+        "verdana": "Verdana",
+        "helvetica": "Helvetica",
+        "times": "Times New Roman",
+        "cour": "Courier New",
+        "georgia": "Georgia",
+        "trebuc": "Trebuchet MS",
+        "impact": "Impact",
+        "segoeui": "Segoe UI",
+    }
+
+    fonts = findSystemFonts(fontpaths=None, fontext="ttf")
+    font_names_list = []
+    for i in fonts:
+        font_name = os.path.splitext(os.path.basename(i))[0]
+        font_names_list.append(font_name.lower())
+
+    final_font_list = []
+    for font in common_fonts.keys():
+        if font in font_names_list:
+            final_font_list.append(common_fonts[font])
+
+    # The font shipped with matplotlib, when none of the common fonts are installed
+    if not final_font_list:
+        final_font_list.append(DEFAULT_FONT)
+
+    return final_font_list
+
+
+def lock_entry_to_float(entry):
+    validator = QDoubleValidator()
+    validator.setNotation(
+        QDoubleValidator.ScientificNotation
+    )  # Standard floating-point notation
+    validator.setDecimals(10)  # Allows up to 6 decimal places (adjust as needed)
+    entry.setValidator(validator)
+    entry.setMaxLength(12)  # Limit the number of characters to 10
+
+
+class RangeDoubleValidator(QDoubleValidator):
+    # Float validator of open or closed bounds, e.g. a volume fraction in [0, 1). Values out of
+    # the bounds are intermediate, they can be typed but do not finish the editing
+    def __init__(self, bottom=None, top=None, include_bottom=True, include_top=True, parent=None):
+        QDoubleValidator.__init__(self, parent)
+        self.setNotation(QDoubleValidator.ScientificNotation)
+        self.setDecimals(10)
+        self.range_bottom = bottom
+        self.range_top = top
+        self.include_bottom = include_bottom
+        self.include_top = include_top
+
+    def is_in_range(self, value):
+        if self.range_bottom is not None:
+            if value < self.range_bottom or (value == self.range_bottom and not self.include_bottom):
+                return False
+        if self.range_top is not None:
+            if value > self.range_top or (value == self.range_top and not self.include_top):
+                return False
+        return True
+
+    def validate(self, text, pos):
+        state, text, pos = QDoubleValidator.validate(self, text, pos)
+        if state == QValidator.Acceptable:
+            try:
+                if not self.is_in_range(float(text)):
+                    state = QValidator.Intermediate
+            except ValueError:
+                state = QValidator.Intermediate
+        return state, text, pos
+
+
+def lock_entry_to_range(entry, bottom=None, top=None, include_bottom=True, include_top=True):
+    entry.setValidator(RangeDoubleValidator(bottom, top, include_bottom, include_top, entry))
+    entry.setMaxLength(12)
+
+
+def lock_entry_to_int(entry, min_value=1, max_value=2000, max_length=4):
+    validator = QDoubleValidator()
+    validator.setRange(min_value, max_value)
+    validator.setDecimals(0)  # Disallow decimal points
+    entry.setValidator(validator)
+    entry.setMaxLength(max_length)  # Limit the number of characters to 10
@@ -1,14 +1,14 @@
-import random
+from src.classes.pyqt import FloatDelegate, ScatterTableModel
+from src.func.excel import save_scatter_to_excel
 
-from src.classes.pyqt import FloatDelegate
-from src.func.general import *
-from src.func.excel import *
-
-from PyQt5.QtWidgets import QWidget, QPushButton, QColorDialog, QFileDialog, QAbstractScrollArea, QHeaderView, \
-    QTableWidgetItem
+from PyQt5.QtWidgets import QWidget, QPushButton, QColorDialog, QFileDialog, QAbstractScrollArea, QHeaderView
 from PyQt5.QtCore import Qt
 from PyQt5.uic import loadUi
 
+# Rows shown before the table starts scrolling
+MAX_TABLE_ROWS = 10
+
+
 # Create a classes to handle the widget that will be spawn when the user wants to add a curve to the graph
 class ScatterWidgetUI(QWidget):
     def __init__(self, parent=None):
@@ -18,12 +18,17 @@ class ScatterWidgetUI(QWidget):
         # Varaibles
         self.parent_widget = None
         self.id = None
-        self.disable_table_signals = False
         self.point_styles = ["o", "s", "v", "+", "x", "*"]
 
+        # The table shows the arrays of the scatter through a model, only the visible rows are rendered
+        self.table_model = ScatterTableModel(parent=self)
+        self.pyqt5_tableview_exp_spectra.setModel(self.table_model)
+        # Lock table items to floats
+        self.pyqt5_tableview_exp_spectra.setItemDelegate(FloatDelegate(self.pyqt5_tableview_exp_spectra))
+
         # Some initial setup
         self.collapse(collapse=True)
-        self.pyqt5_tablewidget_exp_spectra.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.pyqt5_tableview_exp_spectra.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         self.resize_table_height_to_no_rows()
 
         # Connect buttons
@@ -41,7 +46,7 @@ class ScatterWidgetUI(QWidget):
 
         self.pyqt5_button_add_scatter_point.clicked.connect(self.add_table_scatter_point)
         self.pyqt5_button_remove_scatter_point.clicked.connect(lambda: self.remove_table_scatter_point(
-            self.pyqt5_tablewidget_exp_spectra.currentRow()))
+            self.pyqt5_tableview_exp_spectra.currentIndex().row()))
         self.pyqt5_button_pick_scatter_color.clicked.connect(self.pick_curve_color)
         self.pyqt5_button_delete_scatter.clicked.connect(self.delete_self)
         self.pyqt5_button_duplicate_scatter.clicked.connect(lambda: self.parent_widget.generate_new_scatter(
@@ -50,17 +55,17 @@ class ScatterWidgetUI(QWidget):
         self.pyqt5_button_save_scatter.clicked.connect(self.save_scatter)
         self.pyqt5_button_save_scatter_excel.clicked.connect(self.save_scatter_to_excel)
 
-        self.pyqt5_tablewidget_exp_spectra.itemSelectionChanged.connect(self.update_button_state)
+        self.pyqt5_tableview_exp_spectra.selectionModel().selectionChanged.connect(self.update_button_state)
 
     def update_button_state(self):
         # Enable the button if any items are selected, otherwise disable it
-        if self.pyqt5_tablewidget_exp_spectra.selectedItems():
+        if self.pyqt5_tableview_exp_spectra.selectionModel().hasSelection():
             self.pyqt5_button_remove_scatter_point.setEnabled(True)
         else:
             self.pyqt5_button_remove_scatter_point.setEnabled(False)
 
     def connect_buttons_after_setup(self):
-        self.pyqt5_tablewidget_exp_spectra.cellChanged.connect(self.get_data_from_table)
+        self.table_model.dataChanged.connect(self.table_data_changed)
 
     def collapse(self, collapse=True):
         if collapse:
@@ -69,9 +74,10 @@ class ScatterWidgetUI(QWidget):
             self.pyqt5_frame_group_parameters.setVisible(True)
 
     def resize_table_height_to_no_rows(self):
-        print(self.pyqt5_tablewidget_exp_spectra.rowCount())
-        self.pyqt5_tablewidget_exp_spectra.setFixedHeight((self.pyqt5_tablewidget_exp_spectra.rowCount()) * 35
-                                                          + self.pyqt5_tablewidget_exp_spectra.horizontalHeader().height())
+        # Long scatters scroll inside the table instead of growing the widget
+        no_rows = min(self.table_model.rowCount(), MAX_TABLE_ROWS)
+        self.pyqt5_tableview_exp_spectra.setFixedHeight(no_rows * 35
+                                                        + self.pyqt5_tableview_exp_spectra.horizontalHeader().height())
 
     def pick_curve_color(self):
         # Open color picker
@@ -105,8 +111,18 @@ class ScatterWidgetUI(QWidget):
         self.parent_widget.refresh_graph()
 
     def delete_self(self):
+        # The main window undocks the widget and releases it
         self.parent_widget.delete_scatter(self.id)
-        self.close()
+
+    def release(self):
+        # Drops the arrays shown by the table and frees the widget with its children once the
+        # pending events are handled, closing it only hides it
+        self.table_model.set_scatter_data({key: [] for key in self.table_model.columns})
+        self.id = None
+        self.parent_widget = None
+        self.hide()
+        self.setParent(None)
+        self.deleteLater()
 
     def save_scatter(self):
         # Open file dialog and save curve as a json file with suffix .odc
@@ -120,61 +136,28 @@ class ScatterWidgetUI(QWidget):
             save_scatter_to_excel(filepath, self.parent_widget.scatter_dict[self.id]['scatter'])
 
     def add_table_scatter_point(self):
-        # Disable table signals
-        self.disable_table_signals = True
-
-        # Get the number of rows
-        row_count = self.pyqt5_tablewidget_exp_spectra.rowCount()
-
-        # Insert a new row
-        self.pyqt5_tablewidget_exp_spectra.insertRow(row_count)
-
-        # Set the default values
-        if row_count == 0:
-            self.pyqt5_tablewidget_exp_spectra.setItem(row_count, 0, QTableWidgetItem("1000"))
-            self.pyqt5_tablewidget_exp_spectra.setItem(row_count, 1, QTableWidgetItem("0.5"))
-            self.pyqt5_tablewidget_exp_spectra.setItem(row_count, 2, QTableWidgetItem("0.05"))
-
+        # The new point copies the last one
+        if self.table_model.rowCount() == 0:
+            values = [1000.0, 0.5, 0.05]
         else:
-            self.pyqt5_tablewidget_exp_spectra.setItem(row_count, 0, QTableWidgetItem(
-                str(float(self.pyqt5_tablewidget_exp_spectra.item(row_count - 1, 0).text()))))
-            self.pyqt5_tablewidget_exp_spectra.setItem(row_count, 1, QTableWidgetItem(
-                str(float(self.pyqt5_tablewidget_exp_spectra.item(row_count - 1, 1).text()))))
-            self.pyqt5_tablewidget_exp_spectra.setItem(row_count, 2, QTableWidgetItem(
-                str(float(self.pyqt5_tablewidget_exp_spectra.item(row_count - 1, 2).text()))))
+            values = [self.table_model.scatter_data[key][-1] for key in self.table_model.columns]
+        self.table_model.append_row(values)
 
         # Resize the table
         self.resize_table_height_to_no_rows()
 
-        # Enable table signals
-        self.disable_table_signals = False
-
-        # Update the dictionary and graph
-        self.get_data_from_table()
-
-        # Lock table items to floats
-        delegate = FloatDelegate(self.pyqt5_tablewidget_exp_spectra)
-        self.pyqt5_tablewidget_exp_spectra.setItemDelegate(delegate)
+        # Refresh all graphs with new data
+        self.parent_widget.refresh_graph()
 
     def remove_table_scatter_point(self, row):
-        # Disable table signals
-        self.disable_table_signals = True
-
         # Remove the row
-        self.pyqt5_tablewidget_exp_spectra.removeRow(row)
+        self.table_model.remove_row(row)
 
         # Resize the table
         self.resize_table_height_to_no_rows()
 
-        # Enable table signals
-        self.disable_table_signals = False
-
-        # Update the dictionary and graph
-        self.get_data_from_table()
-
-    def clear_table_scatter_points(self):
-        self.pyqt5_tablewidget_exp_spectra.clearContents()
-        self.pyqt5_tablewidget_exp_spectra.setRowCount(0)
+        # Refresh all graphs with new data
+        self.parent_widget.refresh_graph()
 
     def set_entries_with_data(self):
         color = self.parent_widget.scatter_dict[self.id]["color"]
@@ -190,44 +173,10 @@ class ScatterWidgetUI(QWidget):
         self.pyqt5_combo_scatter_point_style.setCurrentIndex(point_style_index)
         self.pyqt5_spinbox_scatter_size.setValue(point_size)
 
-        self.clear_table_scatter_points()
-        scatter_data = self.parent_widget.scatter_dict[self.id]["scatter"]
-
-        for i in range(len(scatter_data["frequencies"])):
-            # Get the number of rows
-            row_count = self.pyqt5_tablewidget_exp_spectra.rowCount()
-
-            # Insert a new row
-            self.pyqt5_tablewidget_exp_spectra.insertRow(row_count)
-
-            # Populate the row
-            self.pyqt5_tablewidget_exp_spectra.setItem(i, 0, QTableWidgetItem(str(scatter_data["frequencies"][i])))
-            self.pyqt5_tablewidget_exp_spectra.setItem(i, 1, QTableWidgetItem(str(scatter_data["recm_values"][i])))
-            self.pyqt5_tablewidget_exp_spectra.setItem(i, 2, QTableWidgetItem(str(scatter_data["recm_errors"][i])))
-
+        # The table works directly on the scatter data
+        self.table_model.set_scatter_data(self.parent_widget.scatter_dict[self.id]["scatter"])
         self.resize_table_height_to_no_rows()
 
-        # Lock table items to floats
-        delegate = FloatDelegate(self.pyqt5_tablewidget_exp_spectra)
-        self.pyqt5_tablewidget_exp_spectra.setItemDelegate(delegate)
-
-    def get_data_from_table(self):
-        if not self.disable_table_signals:
-            frequencies = []
-            cm_factors = []
-            cm_errors = []
-
-            for row in range(self.pyqt5_tablewidget_exp_spectra.rowCount()):
-                frequencies.append(float(self.pyqt5_tablewidget_exp_spectra.item(row, 0).text()))
-                cm_factors.append(float(self.pyqt5_tablewidget_exp_spectra.item(row, 1).text()))
-                cm_errors.append(float(self.pyqt5_tablewidget_exp_spectra.item(row, 2).text()))
-
-            scatter_data = {"frequencies": frequencies,
-                            "recm_values": cm_factors,
-                            "recm_errors": cm_errors}
-
-            # Scatter data
-            self.parent_widget.scatter_dict[self.id]["scatter"] = scatter_data
-
-            # Refresh all graphs with new data
-            self.parent_widget.refresh_graph()
+    def table_data_changed(self):
+        # The edited value is already in the scatter data, only the graph is refreshed
+        self.parent_widget.refresh_graph()
@@ -0,0 +1,175 @@
+from PyQt5.QtGui import QColor
+from PyQt5.QtWidgets import QDialog, QGraphicsDropShadowEffect
+from PyQt5.QtCore import Qt
+from PyQt5.uic import loadUi
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_qt5agg import FigureCanvas
+
+from src.func import plotting, sweep
+from ui.helpers.pyqt import lock_entry_to_float, lock_entry_to_int
+
+# Labels of the swept parameters, the same as in the curve widget
+PARAMETER_LABELS = {"buffer_perm": "Buffer permittivity (ε0)",
+                    "buffer_cond": "Buffer conductivity (S/m)",
+                    "core_perm": "Core permittivity (ε0)",
+                    "core_cond": "Core conductivity (S/m)",
+                    "core_radius": "Particle radius (µm)",
+                    "1st_shell_perm": "1st shell permittivity (ε0)",
+                    "1st_shell_cond": "1st shell conductivity (S/m)",
+                    "1st_shell_thick": "1st shell thickness (nm)",
+                    "2nd_shell_perm": "2nd shell permittivity (ε0)",
+                    "2nd_shell_cond": "2nd shell conductivity (S/m)",
+                    "2nd_shell_thick": "2nd shell thickness (nm)",
+                    "electric_field": "∇E² (V²/m³)",
+                    "aspect_ratio": "Aspect ratio",
+                    "wavelength": "twDEP wavelength (µm)",
+                    "volume_fraction": "Volume fraction",
+                    "cell_constant": "Cell constant (1/m)"}
+DEFAULT_PARAMETERS = ["buffer_cond", "core_radius"]
+# Largest number of values of a swept parameter
+MAX_VALUES = 1000
+
+
+class SweepWidgetUI(QDialog):
+    def __init__(self, parent=None):
+        QDialog.__init__(self, parent)
+        loadUi("ui/widgets/sweep_widget.ui", self)
+
+        # Initial setup
+        self.style_window()
+
+        # Varaibles
+        self.parent_widget = parent
+        self.selected_curve_id = None
+
+        # Graph of the sweep, a family of curves or a map of the cross-overs
+        self.figure = Figure()
+        self.canvas = FigureCanvas(self.figure)
+        self.verticalLayout_sweep_graph.addWidget(self.canvas)
+
+        for index, parameter in enumerate(DEFAULT_PARAMETERS, start=1):
+            combo = getattr(self, f"pyqt5_combo_sweep_parameter_{index}")
+            for name in sweep.SWEEP_PARAMETERS:
+                combo.addItem(PARAMETER_LABELS[name], name)
+            combo.setCurrentIndex(sweep.SWEEP_PARAMETERS.index(parameter))
+
+            lock_entry_to_float(getattr(self, f"pyqt5_entry_sweep_start_{index}"))
+            lock_entry_to_float(getattr(self, f"pyqt5_entry_sweep_stop_{index}"))
+            lock_entry_to_int(getattr(self, f"pyqt5_entry_sweep_no_{index}"), min_value=2, max_value=MAX_VALUES)
+
+        self.enable_second_parameter(False)
+
+        # Connect buttons
+        self.connect_buttons()
+
+    def connect_buttons(self):
+        self.pyqt5_button_back.clicked.connect(self.exit)
+        self.pyqt5_button_plot_sweep.clicked.connect(self.plot_sweep)
+        self.pyqt5_button_add_sweep_curves.clicked.connect(self.add_curves)
+        self.pyqt5_checkbox_sweep_parameter_2.toggled.connect(self.enable_second_parameter)
+        for index in [1, 2]:
+            getattr(self, f"pyqt5_combo_sweep_parameter_{index}").currentIndexChanged.connect(
+                lambda _, index=index: self.set_default_range(index))
+
+    def style_window(self):
+        # Remove the title bar, logo, and exit button
+        self.setWindowFlags(Qt.Window | Qt.FramelessWindowHint)
+
+        # Add Transparency
+        self.setAttribute(Qt.WA_TranslucentBackground, True)
+
+        # Add a shadow effect
+        shadow = QGraphicsDropShadowEffect(self)
+        shadow.setBlurRadius(15)
+        shadow.setXOffset(0)
+        shadow.setYOffset(0)
+        shadow.setColor(QColor(0, 0, 0, 75))  # Black color with some transparency
+        self.setGraphicsEffect(shadow)
+
+    def exit(self):
+        self.close()
+
+    def open_widget(self, curve_id):
+        self.selected_curve_id = curve_id
+        for index in [1, 2]:
+            self.set_default_range(index)
+        self.figure.clear()
+        self.canvas.draw()
+        self.exec_()
+
+    def enable_second_parameter(self, enabled):
+        for name in ["combo_sweep_parameter_2", "entry_sweep_start_2", "entry_sweep_stop_2", "entry_sweep_no_2",
+                     "checkbox_sweep_log_2"]:
+            getattr(self, f"pyqt5_{name}").setEnabled(enabled)
+        # Only the family of a single parameter can be added to the session
+        self.pyqt5_button_add_sweep_curves.setEnabled(not enabled)
+
+    def set_default_range(self, index):
+        # A decade below and above the value of the curve
+        if self.selected_curve_id not in self.parent_widget.curves_dict:
+            return
+        name = getattr(self, f"pyqt5_combo_sweep_parameter_{index}").currentData()
+        value = float(self.parent_widget.curves_dict[self.selected_curve_id]["parameters"][name])
+        getattr(self, f"pyqt5_entry_sweep_start_{index}").setText(f"{value / 10:g}")
+        getattr(self, f"pyqt5_entry_sweep_stop_{index}").setText(f"{value * 10:g}")
+        getattr(self, f"pyqt5_checkbox_sweep_log_{index}").setChecked(value > 0)
+
+    def get_sweep(self, index):
+        start_entry = getattr(self, f"pyqt5_entry_sweep_start_{index}")
+        stop_entry = getattr(self, f"pyqt5_entry_sweep_stop_{index}")
+        no_entry = getattr(self, f"pyqt5_entry_sweep_no_{index}")
+        if not (start_entry.hasAcceptableInput() and stop_entry.hasAcceptableInput() and no_entry.hasAcceptableInput()):
+            return None
+
+        start, stop = float(start_entry.text()), float(stop_entry.text())
+        # Log-spaced values need positive limits
+        log_scale = getattr(self, f"pyqt5_checkbox_sweep_log_{index}").isChecked() and start > 0 and stop > 0
+        values = sweep.get_sweep_values(start, stop, int(float(no_entry.text())), log_scale=log_scale)
+        return getattr(self, f"pyqt5_combo_sweep_parameter_{index}").currentData(), values
+
+    def get_sweeps(self):
+        sweeps = [self.get_sweep(1)]
+        if self.pyqt5_checkbox_sweep_parameter_2.isChecked():
+            sweeps.append(self.get_sweep(2))
+        if None in sweeps or len({name for name, _ in sweeps}) != len(sweeps):
+            return None
+        return sweeps
+
+    def get_y_index(self):
+        # Spectrum of the graph of the main window, Re[CM] for the cross-over graph
+        y_index = self.parent_widget.graph_y_index
+        return 0 if plotting.Y_SPECTRA[y_index] is None else y_index
+
+    def plot_sweep(self):
+        sweeps = self.get_sweeps()
+        if sweeps is None or self.selected_curve_id not in self.parent_widget.curves_dict:
+            return
+
+        curve = self.parent_widget.curves_dict[self.selected_curve_id]
+        result = sweep.sweep_model(curve["parameters"], sweep.MODEL_NAMES[curve["model"]],
+                                   self.parent_widget.curves_dict.frequencies, sweeps)
+        labels = [PARAMETER_LABELS[name] for name in result["names"]]
+
+        self.figure.clear()
+        axes = self.figure.add_subplot(111)
+        if len(sweeps) == 1:
+            # The family of curves, colored by the swept value, in the style of the main graph
+            y_index = self.get_y_index()
+            plotting.setup_axes(axes)
+            plotting.plot_curve_family(axes, result["frequencies"], result[plotting.Y_SPECTRA[y_index]],
+                                       result["values"][0], labels[0])
+            plotting.format_axes(axes, y_index=y_index, style_params=self.parent_widget.get_graph_styling())
+        else:
+            # The first cross-over of every pair of values
+            plotting.plot_cross_over_map(axes, result["values"][0], result["values"][1], result["1st_cross_over"],
+                                         labels[0], labels[1])
+            self.figure.tight_layout()
+        self.canvas.draw()
+
+    def add_curves(self):
+        sweeps = self.get_sweeps()
+        if sweeps is None or len(sweeps) != 1 or self.selected_curve_id not in self.parent_widget.curves_dict:
+            return
+
+        name, values = sweeps[0]
+        self.parent_widget.add_curve_family(self.selected_curve_id, name, values)
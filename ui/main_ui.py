@@ -1,6 +1,8 @@
+import copy
+import functools
 import random
+
 import numpy as np
-import json
 
 from PyQt5.QtCore import QSize
 from PyQt5.QtGui import QIcon
@@ -9,17 +11,29 @@ from PyQt5.uic import loadUi
 from PyQt5 import QtCore
 from matplotlib.figure import Figure
 
-from src.func import models
 from src.func import general
+from src.func import crossover
 from src.func import excel
-from src.classes.numpy_encoder import NumpyEncoder
-
-from ui.helpers.curve_widget_ui import CurveWidgetUI
+from src.func import files
+from src.func import plotting
+from src.func import spectra
+from src.func import sweep
+from src.func import tracing
+from src.classes.stores import CurveStore, ScatterStore
+
+from ui.helpers.curve_list_ui import CurveListUI
 from ui.helpers.scatter_widget_ui import ScatterWidgetUI
-from ui.resources import graphical_resources
+from ui.resources.load_resources import register_graphical_resources
 from ui.helpers.graph_settings_ui import GraphSettingsUI
 from ui.helpers.noise_widget_ui import NoiseWidgetUI
+from ui.helpers.sweep_widget_ui import SweepWidgetUI
+from ui.helpers.ensemble_widget_ui import EnsembleWidgetUI
 from ui.helpers.capture_widget_ui import CaptureWidgetUI
+from ui.helpers.performance_panel_ui import PerformancePanelUI
+from ui.helpers import pyqt
+
+# Register the icons used by the .ui files before any widget is loaded
+register_graphical_resources()
 
 '''
 OpenDEP View
@@ -41,6 +55,10 @@ OpenDEP View
     You can contact the developer/owner of OpenDEP at "ioan.tivig@gmail.com" or "ioan.tivig@umfcd.ro".
 '''
 
+# Y index of the graph for each graph content button, from left to right (see plotting.Y_LABELS)
+GRAPH_CONTENT_Y_INDICES = [0, 1, 4, 5, 6, 7, 8, plotting.CROSS_OVER_INDEX]
+
+
 class MainUI(QMainWindow):
     def __init__(self):
         QMainWindow.__init__(self)
@@ -52,10 +70,12 @@ class MainUI(QMainWindow):
 
         # Create default parameters
         self.default_curve = None
-        self.curves_dict = {}
-        self.scatter_dict = {}
+        self.curves_dict = CurveStore()
+        self.scatter_dict = ScatterStore()
         self.no_curve_points = 100
         self.graph_y_index = 0
+        # Cross-overs versus medium conductivity of the curves, with the parameters they were solved for
+        self.cross_over_cache = {}
 
         # Default styles
         self.point_styles = ["o", "s", "v", "+", "x", "*"]
@@ -64,8 +84,14 @@ class MainUI(QMainWindow):
         # Load the rest of the widgets
         self.graph_settings = GraphSettingsUI(parent=self)
         self.noise_widget = NoiseWidgetUI(parent=self)
+        self.sweep_widget = SweepWidgetUI(parent=self)
+        self.ensemble_widget = EnsembleWidgetUI(parent=self)
         self.capture_widget = CaptureWidgetUI(parent=self)
 
+        # Performance panel in the status bar - timings of the last recompute, redraw and file operation
+        self.performance_panel = PerformancePanelUI(parent=self)
+        self.statusBar().addWidget(self.performance_panel, 1)
+
         # Toolbar buttons
         self.pyqt5_button_save_figure.clicked.connect(self.capture_widget.open_widget)
         self.pyqt5_button_home_figure.clicked.connect(self.pyqt5_graph_widget.toolbar.home)
@@ -82,9 +108,8 @@ class MainUI(QMainWindow):
         self.pyqt5_button_curve_load_excel.clicked.connect(lambda: self.load_curve(file_type="Excel"))
 
 
-        # Hide Scrollbars
-        self.pyqt5_scrollarea_plots_curve.setHorizontalScrollBarPolicy(QtCore.Qt.ScrollBarAlwaysOff)
-        self.pyqt5_scrollarea_plots_curve.setVerticalScrollBarPolicy(QtCore.Qt.ScrollBarAlwaysOff)
+        # Curve list - only the curves in view get a widget, the others are painted
+        self.curve_list = CurveListUI(self.pyqt5_listview_curves, parent_widget=self)
 
         # Graph content menubar, to toggle what is displayed on the graph
         self.pyqt5_graphcontent_buttons = self.pyqt5_frame_toolbar_graphcontent.findChildren(QPushButton)
@@ -114,7 +139,7 @@ class MainUI(QMainWindow):
         self.pyqt5_entry_graph_height.setDisabled(True)
 
         # ScrollArea buttons
-        self.pyqt5_button_curves_add.clicked.connect(self.generate_new_curve)
+        self.pyqt5_button_curves_add.clicked.connect(lambda: self.generate_new_curve())
 
         # Entry fields for the frequency range
         self.pyqt5_entry_param_freq_start.editingFinished.connect(self.modify_all_curves)
@@ -137,7 +162,7 @@ class MainUI(QMainWindow):
                           self.pyqt5_entry_param_freq_stop
                           ]
         for entry in entries_to_int:
-            general.lock_entry_to_int(entry, min_value=1, max_value=2000, max_length=4)
+            pyqt.lock_entry_to_int(entry, min_value=1, max_value=2000, max_length=4)
 
     # UI METHODS
     def toggle_tabs(self, buttons, tab_widgets):
@@ -163,11 +188,6 @@ class MainUI(QMainWindow):
         # Create a new scatter widget
         scatter_widget = ScatterWidgetUI()
 
-        # Create Random ID which wont be already in the dictionary keys
-        id = random.randint(0, 9999)
-        while id in self.scatter_dict.keys():
-            id = random.randint(0, 9999)
-
         # Create parameters for the curve
         point_style = 'o'
         point_size = 50
@@ -198,11 +218,12 @@ class MainUI(QMainWindow):
             color = self.scatter_dict[duplicate_id]["color"]
             point_size = self.scatter_dict[duplicate_id]["point_size"]
             point_style = self.scatter_dict[duplicate_id]["point_style"]
-            scatter_data = self.scatter_dict[duplicate_id]["scatter"]
+            # The table edits the arrays in place, the copy gets its own
+            scatter_data = {key: np.array(value, dtype=np.float64)
+                            for key, value in self.scatter_dict[duplicate_id]["scatter"].items()}
 
         elif type == "load":
-            with open(file_path, 'r') as file:
-                data = json.load(file)
+            data = files.load_from_json(file_path)
             name = data["name"]
             color = data["color"]
             point_size = data["point_size"]
@@ -222,14 +243,17 @@ class MainUI(QMainWindow):
             color = general.get_random_color_hex()
             name = file_path.split("/")[-1].split(".")[0]
 
-        # Add the curve to the dictionary
-        self.scatter_dict[id] = {"name": name,
-                                "color": color,
-                                "point_size": point_size,
-                                "point_style": point_style,
-                                "visibility": visibility,
-                                "scatter": scatter_data,
-                                "widget": scatter_widget}
+        # The scatter data is kept as arrays, from the table to the graph
+        scatter_data = {key: np.asarray(values, dtype=np.float64) for key, values in scatter_data.items()}
+
+        # Add the scatter to the store, which gives its ID
+        id = self.scatter_dict.add({"name": name,
+                                    "color": color,
+                                    "point_size": point_size,
+                                    "point_style": point_style,
+                                    "visibility": visibility,
+                                    "scatter": scatter_data,
+                                    "widget": scatter_widget})
 
         # Populate the widget with the data
         scatter_widget.id = id
@@ -246,12 +270,19 @@ class MainUI(QMainWindow):
         self.pyqt5_scrollarea_scatter_curves_layout.insertWidget(0, scatter_widget)
 
     # Delete scatter from the dictionary and refresh the graph
-    def delete_scatter(self, id):
-        # Remove the curve from the dictionary
+    def delete_scatter(self, id, refresh=True):
+        # Undock the widget and free it with its table, which holds the arrays of the scatter
+        widget = self.scatter_dict[id]["widget"]
+        if widget is not None:
+            self.pyqt5_scrollarea_scatter_curves_layout.removeWidget(widget)
+            widget.release()
+
+        # Remove the scatter from the dictionary
         del self.scatter_dict[id]
 
         # Refresh the graph
-        self.refresh_graph()
+        if refresh:
+            self.refresh_graph()
 
     # Save scatter to file
     def save_scatter(self, id, file_path):
@@ -259,10 +290,7 @@ class MainUI(QMainWindow):
         data = self.scatter_dict[id].copy()
         data["widget"] = None
 
-        with open(file_path, 'w') as file:
-            json.dump(data, file, cls=NumpyEncoder)
-
-        file.close()
+        files.save_to_json(file_path, data)
 
     # Load scatter from file
     def load_scatter(self):
@@ -279,10 +307,7 @@ class MainUI(QMainWindow):
 
     # CURVE METHODS - add, modify, duplicate, delete, save, load
     # Generate new curve with default parameters
-    def generate_new_curve(self):
-        # Create a new curve widget
-        new_curve_widget = CurveWidgetUI()
-
+    def generate_new_curve(self, refresh=True):
         # Create a new parameters list
         generated_parameters = self.create_default_curve_data()
 
@@ -302,11 +327,6 @@ class MainUI(QMainWindow):
         generated_parameters["1st_cross_over"]["two_shell"] = 0.0
         generated_parameters["2nd_cross_over"]["two_shell"] = 0.0
 
-        # Create Random ID which wont be already in the dictionary keys
-        id = random.randint(0, 9999)
-        while id in self.curves_dict.keys():
-            id = random.randint(0, 9999)
-
         # Create base parameters for the curve
         color = general.get_random_color_hex()
         name = f"Curve {len(self.curves_dict) + 1}"
@@ -315,94 +335,129 @@ class MainUI(QMainWindow):
         line_style = '-'
         line_width = 1.5
 
-        # Add the curve to the dictionary
-        self.curves_dict[id] = {"name": name,
-                                "color": color,
-                                "line_style": line_style,
-                                "line_width": line_width,
-                                "visibility": visibility,
-                                "model": model,
-                                "parameters": generated_parameters,
-                                "curves": curve_data,
-                                "widget": new_curve_widget}
+        # Add the curve to the store, which gives its ID
+        id = self.curves_dict.add({"name": name,
+                                   "color": color,
+                                   "line_style": line_style,
+                                   "line_width": line_width,
+                                   "visibility": visibility,
+                                   "model": model,
+                                   "parameters": generated_parameters,
+                                   "curves": curve_data,
+                                   "widget": None})
 
-        # Populate the widget with the data
-        new_curve_widget.id = id
-        new_curve_widget.parent_widget = self
-        new_curve_widget.set_entries_with_data()
+        # Add the curve at the top of the list, its widget is created when it is shown
+        self.curve_list.add_curve(id)
 
         # Refresh all graphs with new data
-        self.refresh_graph()
-
-        # Dock the widget at index 0 from the top
-        self.pyqt5_scrollarea_plots_curve_layout.insertWidget(0, new_curve_widget)
+        if refresh:
+            self.refresh_graph()
 
     # Modify single curve from the dictionary and refresh the graph
-    def modify_single_curve(self, id):
-        # Update the parameters from entry fields of the widget
-        parameters = self.curves_dict[id]["widget"].get_data_from_entries()
-        self.curves_dict[id]["parameters"] = parameters
+    def modify_single_curve(self, id, refresh=True):
+        with tracing.span("modify_single_curve", category="compute", curve_id=id):
+            # Update the parameters from entry fields of the widget, curves scrolled out of view keep theirs
+            widget = self.curves_dict[id]["widget"]
+            if widget is not None:
+                self.curves_dict[id]["parameters"] = widget.get_data_from_entries()
+
+            # Generate the curve data
+            curve_data = self.generate_curve_data(self.curves_dict[id]["parameters"])
+            self.curves_dict[id]["curves"] = curve_data
+
+            # Calculate the cross over frequency
+            # Homogenous
+            first_ho_co, second_ho_co = self.get_cross_over_freq(curve_data["frequencies"], curve_data["recm_homogenous_particle"])
+            self.curves_dict[id]["parameters"]["1st_cross_over"]["homogenous"] = first_ho_co
+            self.curves_dict[id]["parameters"]["2nd_cross_over"]["homogenous"] = second_ho_co
+            # Single Shell
+            first_ss_co, second_ss_co = self.get_cross_over_freq(curve_data["frequencies"], curve_data["recm_single_shell"])
+            self.curves_dict[id]["parameters"]["1st_cross_over"]["single_shell"] = first_ss_co
+            self.curves_dict[id]["parameters"]["2nd_cross_over"]["single_shell"] = second_ss_co
+            ## TO ADD The Two-Shell model after is implemented fully
+            first_ts_co, second_ts_co = self.get_cross_over_freq(curve_data["frequencies"], curve_data["recm_two_shell"])
+            self.curves_dict[id]["parameters"]["1st_cross_over"]["two_shell"] = first_ts_co
+            self.curves_dict[id]["parameters"]["2nd_cross_over"]["two_shell"] = second_ts_co
 
-        # Generate the curve data
-        curve_data = self.generate_curve_data(self.curves_dict[id]["parameters"])
-        self.curves_dict[id]["curves"] = curve_data
-
-        # Calculate the cross over frequency
-        # Homogenous
-        first_ho_co, second_ho_co = self.get_cross_over_freq(self.curves_dict[id]["curves"]["frequencies"], self.curves_dict[id]["curves"]["recm_homogenous_particle"])
-        self.curves_dict[id]["parameters"]["1st_cross_over"]["homogenous"] = first_ho_co
-        self.curves_dict[id]["parameters"]["2nd_cross_over"]["homogenous"] = second_ho_co
-        # Single Shell
-        first_ss_co, second_ss_co = self.get_cross_over_freq(self.curves_dict[id]["curves"]["frequencies"], self.curves_dict[id]["curves"]["recm_single_shell"])
-        self.curves_dict[id]["parameters"]["1st_cross_over"]["single_shell"] = first_ss_co
-        self.curves_dict[id]["parameters"]["2nd_cross_over"]["single_shell"] = second_ss_co
-        ## TO ADD The Two-Shell model after is implemented fully
-        first_ts_co, second_ts_co = self.get_cross_over_freq(self.curves_dict[id]["curves"]["frequencies"], self.curves_dict[id]["curves"]["recm_two_shell"])
-        self.curves_dict[id]["parameters"]["1st_cross_over"]["two_shell"] = first_ts_co
-        self.curves_dict[id]["parameters"]["2nd_cross_over"]["two_shell"] = second_ts_co
-
-        # Refresh all graphs with new data
-        self.curves_dict[id]["widget"].update_crossover()
-        self.refresh_graph()
+            # Refresh all graphs with new data
+            if widget is not None:
+                widget.update_crossover()
+            if refresh:
+                self.refresh_graph()
 
     # Duplicate curve from the dictionary and refresh the graph
     def duplicate_curve(self, id):
-        # Create a new curve widget
-        new_curve_widget = CurveWidgetUI()
-
         # Create a new parameters list
         data_copy = self.curves_dict[id].copy()
-
-        # Create Random ID which wont be already in the dictionary keys
-        new_id = random.randint(0, 9999)
-        while new_id in self.curves_dict.keys():
-            new_id = random.randint(0, 9999)
+        data_copy["parameters"] = copy.deepcopy(data_copy["parameters"])
+        data_copy["widget"] = None
 
         # Create new name
-        name = f"{self.curves_dict[id]['name']} - Copy"
-
-        self.curves_dict[new_id] = data_copy
-        self.curves_dict[new_id]["widget"] = new_curve_widget
-        self.curves_dict[new_id]["name"] = name
-
-        # Populate the widget with the data
-        new_curve_widget.id = new_id
-        new_curve_widget.parent_widget = self
-        new_curve_widget.set_entries_with_data()
-
-        # Refresh all graphs with new data
-        self.modify_all_curves()
-
-        # Dock the widget at index 0 from the top
-        self.pyqt5_scrollarea_plots_curve_layout.insertWidget(0, new_curve_widget)
+        data_copy["name"] = f"{self.curves_dict[id]['name']} - Copy"
+
+        new_id = self.curves_dict.add(data_copy)
+
+        # Add the curve at the top of the list and refresh all graphs with new data
+        self.curve_list.add_curve(new_id)
+        self.modify_single_curve(new_id)
+
+    # Add a family of curves, copies of a curve with one parameter swept over a list of values
+    def add_curve_family(self, id, parameter, values):
+        base = self.curves_dict[id]
+        frequencies = self.curves_dict.frequencies
+
+        # All the curves of the family are evaluated in one batched call
+        family_data = sweep.sweep_curve_data(base["parameters"], frequencies, [(parameter, values)])
+        self.curves_dict.reserve(len(self.curves_dict.rows) + len(values))
+
+        new_ids = []
+        for index, value in enumerate(values):
+            parameters = copy.deepcopy(base["parameters"])
+            parameters[parameter] = float(value)
+
+            curve_data = {"frequencies": frequencies}
+            for model_name, cross_over_name in [("homogenous_particle", "homogenous"),
+                                                ("single_shell", "single_shell"),
+                                                ("two_shell", "two_shell")]:
+                for key in spectra.SPECTRA:
+                    curve_data[f"{key}_{model_name}"] = family_data[f"{key}_{model_name}"][index]
+                # Same cross-overs as modify_single_curve would find for the curve
+                first_co, second_co = self.get_cross_over_freq(frequencies, curve_data[f"recm_{model_name}"])
+                parameters["1st_cross_over"][cross_over_name] = first_co
+                parameters["2nd_cross_over"][cross_over_name] = second_co
+
+            new_id = self.curves_dict.add({"name": f"{base['name']} - {parameter} = {value:g}",
+                                           "color": general.get_random_color_hex(),
+                                           "line_style": base["line_style"],
+                                           "line_width": base["line_width"],
+                                           "visibility": True,
+                                           "model": base["model"],
+                                           "parameters": parameters,
+                                           "curves": curve_data,
+                                           "widget": None})
+            self.curve_list.add_curve(new_id)
+            new_ids.append(new_id)
+
+        # Refresh all graphs once, for the whole family
+        self.refresh_graph()
+        return new_ids
 
     # Delete curve from the dictionary and refresh the graph
-    def delete_curve(self, id):
-        # Remove the curve from the dictionary
+    def delete_curve(self, id, refresh=True):
+        # Remove the curve from the list, which takes its widget back, and from the dictionary
+        self.curve_list.remove_curve(id)
         del self.curves_dict[id]
 
+        self.cross_over_cache.pop(id, None)
+
+        # The dialogs opened from the widget of the curve must not point to it anymore
+        for dialog in [self.noise_widget, self.sweep_widget, self.ensemble_widget]:
+            if dialog.selected_curve_id == id:
+                dialog.selected_curve_id = None
+
         # Refresh the graph
-        self.refresh_graph()
+        if refresh:
+            self.refresh_graph()
 
     # Save curve to file
     def save_curve(self, id, file_path):
@@ -410,10 +465,28 @@ class MainUI(QMainWindow):
         data = self.curves_dict[id].copy()
         data["widget"] = None
 
-        with open(file_path, 'w') as file:
-            json.dump(data, file, cls=NumpyEncoder)
-
-        file.close()
+        files.save_to_json(file_path, data)
+
+    # Get the cross-over frequencies of a curve versus the conductivity of the medium
+    def get_cross_overs(self, id):
+        curve = self.curves_dict[id]
+        # Solved again only when the model or the parameters of the curve changed
+        parameters = {key: value for key, value in curve["parameters"].items() if not isinstance(value, dict)}
+        key = (curve["model"], tuple(sorted(parameters.items())))
+        if id not in self.cross_over_cache or self.cross_over_cache[id][0] != key:
+            result = crossover.solve_cross_overs(curve["parameters"], sweep.MODEL_NAMES[curve["model"]])
+            self.cross_over_cache[id] = (key, result)
+
+        return self.cross_over_cache[id][1]
+
+    # Save the cross-over frequencies of a curve versus the conductivity of the medium to an Excel table
+    def save_cross_over_table(self, id, file_path):
+        result = self.get_cross_overs(id)
+        cut_off = None if np.isnan(result["cut_off"]) else float(result["cut_off"])
+        excel.save_cross_over_table_to_excel(file_path,
+                                             plotting.X_LABELS[plotting.CROSS_OVER_INDEX],
+                                             crossover.get_cross_over_table(result),
+                                             cut_off=cut_off)
 
     # Load curve from file
     def load_curve(self, file_type="OpenDEP"):
@@ -424,14 +497,11 @@ class MainUI(QMainWindow):
             file_path, _ = QFileDialog.getOpenFileName(self, "Load curve", "", "Excel Curve (*.xlsx)")
 
         if file_path:
-            # Create a new curve widget
-            new_curve_widget = CurveWidgetUI()
-
             # Create a new parameters list
             if file_type == "OpenDEP":
-                with open(file_path, 'r') as file:
-                    data = json.load(file)
-                data_copy = data
+                data_copy = files.load_from_json(file_path)
+                # The spectra are computed again on the frequencies shared by all curves
+                data_copy["curves"] = self.generate_curve_data(data_copy["parameters"])
 
             elif file_type == "Excel":
                 parameters, model = excel.load_curve_from_excel(file_path)
@@ -444,35 +514,24 @@ class MainUI(QMainWindow):
                                  "model": model,
                                  "parameters": parameters,
                                  "curves": self.generate_curve_data(parameters),
-                                 "widget": new_curve_widget}
+                                 "widget": None}
                 else:
                     return
 
 
-            # Create Random ID which wont be already in the dictionary keys
-            new_id = random.randint(0, 9999)
-            while new_id in self.curves_dict.keys():
-                new_id = random.randint(0, 9999)
+            # Add the new data to the store, the widget is created when the curve is shown
+            data_copy["widget"] = None
+            new_id = self.curves_dict.add(data_copy)
 
-            # Update with the new widget and nwe data
-            self.curves_dict[new_id] = data_copy
-            self.curves_dict[new_id]["widget"] = new_curve_widget
-
-            # Populate the widget with the data
-            new_curve_widget.id = new_id
-            new_curve_widget.parent_widget = self
-            new_curve_widget.set_entries_with_data()
-
-            # Refresh all graphs with new data
-            self.modify_all_curves()
-
-            # Dock the widget at index 0 from the top
-            self.pyqt5_scrollarea_plots_curve_layout.insertWidget(0, new_curve_widget)
+            # Add the curve at the top of the list and refresh all graphs with new data
+            self.curve_list.add_curve(new_id)
+            self.modify_single_curve(new_id)
 
     # Multiple curve functionality - modify all
     def modify_all_curves(self):
         for key in self.curves_dict.keys():
-            self.modify_single_curve(key)
+            self.modify_single_curve(key, refresh=False)
+        self.refresh_graph()
 
 
     # Place holder parameters and data for when adding new curve
@@ -491,6 +550,10 @@ class MainUI(QMainWindow):
                       "2nd_shell_cond":0.00001,
                       "2nd_shell_thick": 6.0,
                       "electric_field":1.0,
+                      "aspect_ratio": 1.0,
+                      "wavelength": 100.0,
+                      "volume_fraction": 0.1,
+                      "cell_constant": 100.0,
                       "1st_cross_over": {"homogenous": 0.0,
                                          "single_shell": 0.0,
                                          "two_shell": 0.0},
@@ -504,110 +567,15 @@ class MainUI(QMainWindow):
     # Generate the curve data for the given parameters
     def generate_curve_data(self, parameters):
         # Generate the frequency list
-        start = np.log10(float(self.pyqt5_entry_param_freq_start.text())*(1000**self.pyqt5_combo_param_freq_start_unit.currentIndex()))
-        stop = np.log10(float(self.pyqt5_entry_param_freq_stop.text())*(1000**self.pyqt5_combo_param_freq_stop_unit.currentIndex()))
-        frequencies_list = np.logspace(start=start,
-                                       stop=stop,
-                                       num=self.no_curve_points,
-                                       endpoint=True,
-                                       dtype=int)
-        #print(frequencies_list)
-        # Initialize lists for homogenous particle model
-        recm_ho_list = []
-        imcm_ho_list = []
-        depforce_ho_list = []
-
-        # Initialize lists for single shell particle model
-        recm_ss_list = []
-        imcm_ss_list = []
-        depforce_ss_list = []
-
-        # Initialize lists for two shell particle model
-        recm_ts_list = []
-        imcm_ts_list = []
-        depforce_ts_list = []
-
-        for freq in frequencies_list:
-            # Generate all lists for homogenous particle
-            recm_ho, imcm_ho, depforce_ho = models.homogenous_particle_all(
-                                        freq=freq,
-                                        fitting_gen_fieldgrad=parameters["electric_field"],
-                                        fitting_hopa_particle_radius=parameters["core_radius"],
-                                        fitting_hopa_particle_perm=parameters["core_perm"],
-                                        fitting_hopa_particle_cond=parameters["core_cond"],
-                                        fitting_gen_buffer_perm=parameters["buffer_perm"],
-                                        fitting_gen_buffer_cond=parameters["buffer_cond"])
-
-            recm_ho_list.append(recm_ho)
-            imcm_ho_list.append(imcm_ho)
-            depforce_ho_list.append(depforce_ho)
-
-            # Generate all lists for single shell particle
-            recm_ss, imcm_ss, depforce_ss = models.single_shell_all(
-                        freq=freq,
-                        fitting_gen_fieldgrad=parameters["electric_field"],
-                        fitting_sish_particle_radius=parameters["core_radius"],
-                        fitting_sish_membrane_thickness=parameters["1st_shell_thick"],
-                        fitting_sish_membrane_perm=parameters["1st_shell_perm"],
-                        fitting_sish_membrane_cond=parameters["1st_shell_cond"],
-                        fitting_sish_cytoplasm_perm=parameters["core_perm"],
-                        fitting_sish_cytoplasm_cond=parameters["core_cond"],
-                        fitting_gen_buffer_perm=parameters["buffer_perm"],
-                        fitting_gen_buffer_cond=parameters["buffer_cond"])
-
-            recm_ss_list.append(recm_ss)
-            imcm_ss_list.append(imcm_ss)
-            depforce_ss_list.append(depforce_ss)
-
-            # Generate all lists for two shell particle
-            recm_ts, imcm_ts, depforce_ts = models.two_shell_all(
-                        freq=freq,
-                        field_grad=parameters["electric_field"],
-                        core_radius=parameters["core_radius"],
-                        inner_shell_thickness=parameters["1st_shell_thick"],
-                        inner_shell_perm=parameters["1st_shell_perm"],
-                        inner_shell_cond=parameters["1st_shell_cond"],
-                        outer_shell_thickness=parameters["2nd_shell_thick"],
-                        outer_shell_perm=parameters["2nd_shell_perm"],
-                        outer_shell_cond=parameters["2nd_shell_cond"],
-                        core_perm=parameters["core_perm"],
-                        core_cond=parameters["core_cond"],
-                        buffer_perm=parameters["buffer_perm"],
-                        buffer_cond=parameters["buffer_cond"])
-
-            recm_ts_list.append(recm_ts)
-            imcm_ts_list.append(imcm_ts)
-            depforce_ts_list.append(depforce_ts)
-
-        curve_data = {
-            "frequencies": frequencies_list,
-            "recm_homogenous_particle": recm_ho_list,
-            "imcm_homogenous_particle": imcm_ho_list,
-            "depforce_homogenous_particle": depforce_ho_list,
-            "recm_single_shell": recm_ss_list,
-            "imcm_single_shell": imcm_ss_list,
-            "depforce_single_shell": depforce_ss_list,
-            "recm_two_shell": recm_ts_list,
-            "imcm_two_shell": imcm_ts_list,
-            "depforce_two_shell": depforce_ts_list
-        }
+        start = float(self.pyqt5_entry_param_freq_start.text())*(1000**self.pyqt5_combo_param_freq_start_unit.currentIndex())
+        stop = float(self.pyqt5_entry_param_freq_stop.text())*(1000**self.pyqt5_combo_param_freq_stop_unit.currentIndex())
+        frequencies_list = spectra.generate_frequencies(start, stop, self.no_curve_points)
 
-        return curve_data
+        return spectra.generate_curve_data(parameters, frequencies_list)
 
     # Calculate the cross over frequency
     def get_cross_over_freq(self, freq_list, recm_list):
-        intersections = []
-        first_co = None
-        second_co = None
-        for i in range(len(recm_list)-1):
-            if recm_list[i] < 0 and recm_list[i+1] > 0:
-                first_co = freq_list[i]
-                intersections.append(freq_list[i])
-            elif recm_list[i] > 0 and recm_list[i+1] < 0:
-                second_co = freq_list[i]
-                intersections.append(freq_list[i])
-
-        return first_co, second_co
+        return spectra.get_cross_over_freq(freq_list, recm_list)
 
     # GRAPH METHODS
     # Get the styling of the graph
@@ -662,76 +630,112 @@ class MainUI(QMainWindow):
     # Update the styling of the graph
     def update_graph_styling(self):
         self.graph_style_parameters = self.get_graph_styling()
-        self.pyqt5_graph_widget.format_graph(y_index=self.graph_y_index, style_params=self.graph_style_parameters)
-        self.pyqt5_graph_widget.canvas.draw()
+        # Nothing is drawn when the style did not change
+        if self.pyqt5_graph_widget.format_graph(y_index=self.graph_y_index, style_params=self.graph_style_parameters):
+            self.pyqt5_graph_widget.draw()
+
+    # Get the index of the active graph content button (0 - Re[CM(f)], 1 - DEP force, 2 - ROT torque,
+    # 3 - twDEP force, 4 - Suspension permittivity, 5 - Suspension conductivity, 6 - Suspension impedance,
+    # 7 - Cross-over)
+    def get_graph_content_index(self):
+        for index, button in enumerate(self.pyqt5_frame_toolbar_graphcontent.findChildren(QPushButton)):
+            if button.property("customState"):
+                return index
+        return 0
+
+    # Get the curves and scatters displayed on the graph, with their styling, as a figure spec
+    # that can be rendered without the interface (see src/func/batch_render.py)
+    def get_figure_spec(self, file_path=None, width=None, height=None, dpi=100, grayscale=False):
+        content_index = self.get_graph_content_index()
+        y_index = GRAPH_CONTENT_Y_INDICES[content_index]
+
+        if self.pyqt5_button_display_experimental_stdev.property("customState"):
+            scatter_style = 'scatter'
+        else:
+            scatter_style = 'area'
+
+        figure_spec = {"file_path": file_path,
+                       "width": width or int(self.pyqt5_entry_graph_width.text()),
+                       "height": height or int(self.pyqt5_entry_graph_height.text()),
+                       "dpi": dpi,
+                       "grayscale": grayscale,
+                       "y_index": y_index,
+                       "scatter_style": scatter_style,
+                       "style_params": self.get_graph_styling(),
+                       "curves": [],
+                       "scatters": []}
+
+        # Add all visible curves
+        if self.pyqt5_checkbox_curves_visibility.isChecked() and y_index == plotting.CROSS_OVER_INDEX:
+            for id, curve in self.curves_dict.items():
+                if curve["visibility"]:
+                    # Both cross-overs versus the conductivity of the medium, the second one dashed
+                    result = self.get_cross_overs(id)
+                    for key, name, line_style in [("1st_cross_over", curve["name"], curve["line_style"]),
+                                                  ("2nd_cross_over", f"{curve['name']} - 2nd cross-over", "--")]:
+                        figure_spec["curves"].append({"name": name,
+                                                      "color": curve["color"],
+                                                      "line_style": line_style,
+                                                      "x_data": result["values"],
+                                                      "y_data": result[key],
+                                                      "line_width": curve["line_width"]})
+
+        elif self.pyqt5_checkbox_curves_visibility.isChecked():
+            for curve in self.curves_dict.values():
+                if curve["visibility"]:
+                    # Key of the data depending on selected model and type of graph content
+                    data_key = f"{plotting.Y_SPECTRA[y_index]}_{sweep.MODEL_NAMES[curve['model']]}"
+                    curve_data = curve["curves"]
+                    figure_spec["curves"].append({"name": curve["name"],
+                                                  "color": curve["color"],
+                                                  "line_style": curve["line_style"],
+                                                  "x_data": curve_data["frequencies"],
+                                                  "y_data": curve_data[data_key],
+                                                  "line_width": curve["line_width"],
+                                                  "evaluator": functools.partial(spectra.evaluate_curve,
+                                                                                 curve["parameters"],
+                                                                                 data_key)})
+
+        # Experimental data is only displayed as Re[CM(f)]
+        if self.pyqt5_checkbox_scatters_visibility.isChecked() and content_index == 0:
+            for scatter in self.scatter_dict.values():
+                if scatter["visibility"]:
+                    figure_spec["scatters"].append({"name": scatter["name"],
+                                                    "color": scatter["color"],
+                                                    "x_data": scatter["scatter"]["frequencies"],
+                                                    "y_data": scatter["scatter"]["recm_values"],
+                                                    "y_errors": scatter["scatter"]["recm_errors"],
+                                                    "point_style": scatter["point_style"],
+                                                    "point_size": scatter["point_size"]})
+
+        return figure_spec
 
     # Refresh the graph with new data
     def refresh_graph(self, focus_curve_id=None):
-        self.pyqt5_graph_widget.canvas.axes.clear()
-        # Some local_vars
-        self.graph_y_index = 0
-        curves = [
-            "frequencies",
-            "recm_homogenous_particle",
-            "depforce_homogenous_particle",
-            "imcm_homogenous_particle",
-            "recm_single_shell",
-            "depforce_single_shell",
-            "imcm_single_shell",
-            "recm_two_shell",
-            "depforce_two_shell",
-            "imcm_two_shell"]
-
-        # Add all curves to the graph
-        if self.pyqt5_checkbox_curves_visibility.isChecked():
-            for key in self.curves_dict.keys():
-                self.curves_dict[key]["widget"].setEnabled(True)
-                if self.curves_dict[key]["visibility"]:
-                    # Get index of the button that is active in type of graph content
-                    for index, button in enumerate(self.pyqt5_frame_toolbar_graphcontent.findChildren(QPushButton)):
-                        if button.property("customState"):
-                            # Calculate the index of data depending on selected model and type of graph content
-                            new_index = self.curves_dict[key]["model"] * 3 + index + 1
-                            self.pyqt5_graph_widget.update_curve(name=self.curves_dict[key]["name"],
-                                                                color=self.curves_dict[key]["color"],
-                                                                line_style=self.curves_dict[key]["line_style"],
-                                                                x_data=self.curves_dict[key]["curves"]["frequencies"],
-                                                                y_data=self.curves_dict[key]["curves"][curves[new_index]],
-                                                                line_width=self.curves_dict[key]["line_width"])
-                            self.graph_y_index = index
-                            break
-        else:
-            for key in self.curves_dict.keys():
-                self.curves_dict[key]["widget"].setEnabled(False)
+        with tracing.span("refresh_graph", category="render",
+                          curves=len(self.curves_dict), scatters=len(self.scatter_dict)):
+            self.pyqt5_graph_widget.clear()
 
-        if self.pyqt5_button_display_experimental_area.property("customState"):
-            self.pyqt5_graph_widget.scatter_style = 'area'
-        elif self.pyqt5_button_display_experimental_stdev.property("customState"):
-            self.pyqt5_graph_widget.scatter_style = 'scatter'
+            figure_spec = self.get_figure_spec()
+            self.graph_y_index = figure_spec["y_index"]
+            self.pyqt5_graph_widget.scatter_style = figure_spec["scatter_style"]
 
-        if self.pyqt5_checkbox_scatters_visibility.isChecked():
+            # Widgets of the hidden groups are disabled
+            self.pyqt5_listview_curves.setEnabled(self.pyqt5_checkbox_curves_visibility.isChecked())
+            self.curve_list.refresh()
             for key in self.scatter_dict.keys():
-                self.scatter_dict[key]["widget"].setEnabled(True)
-                if self.scatter_dict[key]["visibility"]:
-                    # Get index of the button that is active in type of graph content
-                    for index, button in enumerate(self.pyqt5_frame_toolbar_graphcontent.findChildren(QPushButton)):
-                        if button.property("customState"):
-                            button_index = index
-                    if button_index == 0:
-                        self.pyqt5_graph_widget.update_scatter(name=self.scatter_dict[key]["name"],
-                                                            color=self.scatter_dict[key]["color"],
-                                                            x_data=self.scatter_dict[key]["scatter"]["frequencies"],
-                                                            y_data=self.scatter_dict[key]["scatter"]["recm_values"],
-                                                            y_errors=self.scatter_dict[key]["scatter"]["recm_errors"],
-                                                            point_style=self.scatter_dict[key]["point_style"],
-                                                            point_size=self.scatter_dict[key]["point_size"])
+                self.scatter_dict[key]["widget"].setEnabled(self.pyqt5_checkbox_scatters_visibility.isChecked())
 
-        else:
-            for key in self.scatter_dict.keys():
-                self.scatter_dict[key]["widget"].setEnabled(False)
+            # Add all curves and scatters to the graph
+            for curve in figure_spec["curves"]:
+                self.pyqt5_graph_widget.update_curve(**curve)
+            for scatter in figure_spec["scatters"]:
+                self.pyqt5_graph_widget.update_scatter(**scatter)
 
-        # Format the graph and draw it
-        self.update_graph_styling()
+            # Format the graph and draw it
+            self.graph_style_parameters = figure_spec["style_params"]
+            self.pyqt5_graph_widget.format_graph(y_index=self.graph_y_index, style_params=self.graph_style_parameters)
+            self.pyqt5_graph_widget.draw()
 
     # When the window is resized, resize the graph
     def resizeEvent(self, event=None):
@@ -774,7 +778,7 @@ class MainUI(QMainWindow):
 
         # Apply tight layout if needed and redraw the canvas
         self.pyqt5_graph_widget.set_tight_layout()
-        self.pyqt5_graph_widget.canvas.draw()
+        self.pyqt5_graph_widget.draw()
 
         print("Resized")
 
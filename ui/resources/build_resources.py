@@ -0,0 +1,41 @@
+import struct
+
+# Build the binary Qt resource bundle (graphical_resources.rcc) from the
+# pyrcc5-generated Python module. The Python module already holds the compiled
+# data, names and tree blocks, so they only need to be written behind the
+# "qres" header that QResource.registerResource expects.
+#
+# Usage (from the root of the program, after regenerating the Python module):
+#   pyrcc5 ui/resources/graphical_resources.qrc -o ui/resources/graphical_resources.py
+#   python -m ui.resources.build_resources
+
+RCC_VERSION = 2
+RCC_HEADER_SIZE = 20
+RCC_PATH = "ui/resources/graphical_resources.rcc"
+
+
+def build_rcc(rcc_path=RCC_PATH):
+    from ui.resources import graphical_resources
+
+    data = graphical_resources.qt_resource_data
+    names = graphical_resources.qt_resource_name
+    tree = graphical_resources.qt_resource_struct_v2
+
+    # Blocks are laid out as data, names, tree - the same order rcc -binary uses
+    data_offset = RCC_HEADER_SIZE
+    names_offset = data_offset + len(data)
+    tree_offset = names_offset + len(names)
+
+    header = b"qres" + struct.pack(">IIII", RCC_VERSION, tree_offset, data_offset, names_offset)
+
+    with open(rcc_path, "wb") as file:
+        file.write(header)
+        file.write(data)
+        file.write(names)
+        file.write(tree)
+
+    return rcc_path
+
+
+if __name__ == "__main__":
+    print(f"Written {build_rcc()}")
@@ -0,0 +1,26 @@
+import os
+
+from PyQt5.QtCore import QResource
+
+RCC_PATH = "ui/resources/graphical_resources.rcc"
+
+
+def register_graphical_resources(rcc_path=RCC_PATH):
+    """
+    Registers the icons and images used by the .ui files under ":/ui/qt/resources".
+
+    The binary .rcc bundle is preferred, as Qt memory-maps it instead of
+    unmarshalling the large bytes literals of graphical_resources.py. The Python
+    module is only imported when the bundle is missing or cannot be registered.
+
+    Args:
+        rcc_path (str): Path of the binary resource bundle.
+
+    Returns:
+        str: "rcc" or "python", depending on which source was registered.
+    """
+    if os.path.isfile(rcc_path) and QResource.registerResource(rcc_path):
+        return "rcc"
+
+    from ui.resources import graphical_resources  # noqa: F401 - registers on import
+    return "python"